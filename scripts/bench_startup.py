@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Startup-time benchmark for the thunder-forge CLI.
+#
+# Each scenario runs in a fresh interpreter; we report the best and median
+# wall time and the overhead over a bare `python -c pass`. `status` runs
+# against an empty inventory so no probe time is included, only imports and
+# config loading (the second run onwards hits the compiled config cache).
+
+_EMPTY_CONFIG = """\
+telegram:
+  bot_token: bench
+nodes:
+  items: []
+"""
+
+_CLI = "import sys; from thunder_forge.cli import main; sys.argv[0] = 'thunder-forge'; main()"
+
+SCENARIOS: dict[str, list[str]] = {
+    "python": ["-c", "pass"],
+    "cli --help": ["-c", _CLI, "--help"],
+    "status --help": ["-c", _CLI, "status", "--help"],
+    "status (empty fleet)": ["-c", _CLI, "status", "--config", "{config}"],
+}
+
+
+def _run(argv: list[str], env: dict[str, str]) -> float:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *argv], env=env, capture_output=True, text=True, check=False
+    )
+    elapsed = time.perf_counter() - started
+    # argparse exits 0 for --help; anything else is a broken scenario.
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"{' '.join(argv)} failed: rc={proc.returncode}\n{proc.stderr}"
+        )
+    return elapsed
+
+
+def _importtime(
+    argv: list[str], env: dict[str, str], top: int
+) -> list[tuple[int, str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:  <self us> | <cumulative us> | <indented module>"
+        self_us, _, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench-startup")
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument(
+        "--importtime",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Also print the N slowest imports (self time) per scenario",
+    )
+    p.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Fail if any CLI scenario's median overhead over bare python exceeds this",
+    )
+    args = p.parse_args()
+
+    repo = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp) / "tf.yml"
+        config.write_text(_EMPTY_CONFIG, encoding="utf-8")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(repo / "src"), env.get("PYTHONPATH")])
+        )
+        env["XDG_CACHE_HOME"] = str(Path(tmp) / "cache")
+
+        medians: dict[str, float] = {}
+        print(f"{'scenario':<24} {'best':>8} {'median':>8} {'overhead':>9}")
+        for name, template in SCENARIOS.items():
+            argv = [a.format(config=config) for a in template]
+            _run(argv, env)  # warm-up (page cache, compiled config)
+            times = [_run(argv, env) for _ in range(max(1, args.runs))]
+            medians[name] = statistics.median(times)
+            overhead = medians[name] - medians["python"]
+            print(
+                f"{name:<24} {min(times) * 1000:>6.1f}ms {medians[name] * 1000:>6.1f}ms"
+                f" {overhead * 1000:>7.1f}ms"
+            )
+            if args.importtime and name != "python":
+                for self_us, module in _importtime(argv, env, args.importtime):
+                    print(f"    {self_us / 1000:>7.1f}ms  {module}")
+
+    if args.budget_ms is not None:
+        over = {
+            name: (median - medians["python"]) * 1000
+            for name, median in medians.items()
+            if name != "python" and (median - medians["python"]) * 1000 > args.budget_ms
+        }
+        if over:
+            for name, ms in over.items():
+                print(
+                    f"[error] {name}: {ms:.1f}ms overhead exceeds budget {args.budget_ms:.0f}ms"
+                )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
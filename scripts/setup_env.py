@@ -5,10 +5,29 @@ import socket
 import subprocess
 from pathlib import Path
 
-from services.hosts_service import build_hosts_block, upsert_managed_hosts_block
-from services.config_service import iter_nodes, load_config
-from services.ssh_service import run_ssh
-from services.fabricnet_service import configure_fabric_ipv4, require_macos_tahoe_26_2_plus
+from services.hosts_service import (
+    build_hosts_block,
+    build_hosts_write_command,
+    managed_block_digest,
+    upsert_managed_hosts_block,
+)
+from services.config_service import (
+    Inventory,
+    Node,
+    get_inventory,
+    load_config,
+    user_cache_dir,
+)
+from services.facts_service import FactsCache, gather_facts
+from services.fabricnet_service import (
+    check_macos_version,
+    configure_fabric_ipv4,
+    fabric_ipv4_matches,
+    verify_fabric_ipv4,
+)
+from services.ssh_service import run_ssh_fanout, run_ssh_sudo
+
+_FABRICNET_FACTS = ("os_version", "network_services", "ipv4")
 
 
 def _write_text(path: Path, content: str) -> None:
@@ -16,23 +35,34 @@ def _write_text(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
+def _select_nodes(index: Inventory, args: argparse.Namespace) -> list[Node] | None:
+    # Every node, or the --only selection; None (after printing why) if invalid.
+    raw = getattr(args, "only", None)
+    if not raw:
+        return list(index.nodes)
+    try:
+        nodes = index.select(str(raw))
+    except ValueError as e:
+        print(f"[error] --only={raw!r}: {e}")
+        return None
+    if not nodes:
+        print(f"[error] no nodes matched --only={raw!r}")
+        return None
+    return nodes
+
+
 def _cmd_configure_fabric(args: argparse.Namespace) -> int:
     inventory = load_config(args.config)
     ssh = inventory.settings.ssh
-    nodes = iter_nodes(inventory)
+    index = get_inventory(inventory)
     ssh_port = inventory.settings.monitor.ssh_port
     # Reachability checks should not reuse the SSH connect timeout. Users often
     # tune SSH timeout very low (e.g. 0.05s) which would create false negatives.
     probe_timeout_seconds = max(1.0, float(inventory.settings.ssh.connect_timeout_seconds))
 
-    only: set[str] | None = None
-    if getattr(args, "only", None):
-        raw = str(args.only)
-        only = {p.strip() for p in raw.split(",") if p.strip()}
-        nodes = [n for n in nodes if n.name in only]
-        if not nodes:
-            print(f"[error] no nodes matched --only={raw!r}")
-            return 2
+    nodes = _select_nodes(index, args)
+    if nodes is None:
+        return 2
 
     fabricnet = inventory.fabricnet
     if fabricnet is None:
@@ -55,7 +85,7 @@ def _cmd_configure_fabric(args: argparse.Namespace) -> int:
         )
         return 2
 
-    fabric_addr_by_name = {n.name: n.address for n in fabricnet.nodes}
+    fabric_addr_by_name = index.fabric_addr_by_name
     total = len(nodes)
 
     # Quick local validation: ensure every node has a fabricnet address configured.
@@ -79,39 +109,40 @@ def _cmd_configure_fabric(args: argparse.Namespace) -> int:
             )
             return 2
 
-    attempted: list[str] = []
-    for idx, node in enumerate(nodes):
-        if idx > 0:
-            print()
-        address = fabric_addr_by_name[node.name]
-
+    for node in nodes:
         if node.service_manager != "brew":
             print(
                 f"[error] {node.name}: fabricnet automation only supports macOS/brew nodes for now"
             )
             return 2
 
-        # One pass per node:
+    # Pre-flight: one composite facts round trip per node, all nodes in parallel.
+    # Facts still fresh in the on-disk cache need no round trip at all.
+    facts_settings = inventory.settings.facts
+    cache = FactsCache(facts_settings.cache_path or user_cache_dir() / "facts-cache.json")
+    preflight = gather_facts(
+        nodes=nodes,
+        settings=ssh,
+        facts=_FABRICNET_FACTS,
+        cache=cache,
+        ttl_seconds=facts_settings.ttl_seconds,
+        refresh=bool(getattr(args, "refresh_facts", False)),
+    )
+    if preflight.failed:
+        for name, result in preflight.failed.items():
+            print(f"[error] {name}: SSH failed: rc={result.returncode}")
+            if result.stderr.strip():
+                print(result.stderr.strip())
+        return 2
+
+    pending: list[Node] = []
+    for node in nodes:
+        facts = preflight.facts[node.name]
         # 1) version check
-        require_macos_tahoe_26_2_plus(node=node, ssh=ssh)
+        check_macos_version(node_name=node.name, version_text=facts.os_version)
 
         # 2) validate the macOS network service exists on the node
-        # Suppress the full services list output unless there is an error.
-        services_out = run_ssh(
-            node=node,
-            settings=ssh,
-            remote_command="networksetup -listallnetworkservices",
-            log_command=False,
-            log_output=False,
-        ).stdout
-        services = [
-            line.strip().lstrip("*").strip()
-            for line in services_out.splitlines()
-            if line.strip()
-        ]
-        if services and services[0].lower().startswith("an asterisk"):
-            services = services[1:]
-
+        services = facts.network_services
         if fabricnet.service_name not in services:
             available = "\n".join(f"- {s}" for s in services) or "(none detected)"
             print(
@@ -128,10 +159,33 @@ def _cmd_configure_fabric(args: argparse.Namespace) -> int:
             )
             return 2
 
+        # Already converged nodes need no sudo round trip.
+        address = fabric_addr_by_name[node.name]
+        if fabric_ipv4_matches(
+            facts.ipv4.get(fabricnet.service_name),
+            address=address,
+            ipv4_defaults=fabricnet.ipv4_defaults,
+            ipv4_mode=fabricnet.ipv4_mode,
+        ):
+            print(f"[fabricnet] {node.name}: already {address} ({fabricnet.service_name})")
+            continue
+        pending.append(node)
+
+    attempted: list[str] = []
+    for idx, node in enumerate(pending):
+        if idx > 0:
+            print()
+        address = fabric_addr_by_name[node.name]
+
         # 3) apply config
         print()
         print(f"[fabricnet] {node.name}: setting {address} ({fabricnet.service_name})")
 
+        # Mutating the node makes its cached ipv4 fact stale; persist that
+        # before the change, so an interrupted run cannot leave it cached.
+        cache.invalidate(node.name, ("ipv4",))
+        cache.save()
+
         # Always allocate a TTY and let sudo prompt on the remote.
         # This keeps output clean (no failed `sudo -n ...` first) and is the
         # most compatible mode across sudo policies.
@@ -145,6 +199,7 @@ def _cmd_configure_fabric(args: argparse.Namespace) -> int:
                 ipv4_mode=fabricnet.ipv4_mode,
                 enforce_macos_version_check=False,
                 sudo_interactive=True,
+                verify_readback=False,
             )
         except RuntimeError as e:
             msg = str(e)
@@ -169,7 +224,34 @@ def _cmd_configure_fabric(args: argparse.Namespace) -> int:
             return 2
         attempted.append(node.name)
 
-    print(f"Configured fabricnet on {len(attempted)}/{total} nodes: {', '.join(attempted)}")
+    print(
+        f"Configured fabricnet on {len(attempted)}/{total} nodes: {', '.join(attempted) or '-'}"
+        f" ({total - len(pending)} already configured)"
+    )
+
+    # 4) read back the applied addresses, again one parallel round trip.
+    if attempted:
+        # The cache was invalidated for these nodes, so this re-gathers ipv4.
+        readback = gather_facts(
+            nodes=[n for n in nodes if n.name in attempted],
+            settings=ssh,
+            facts=("ipv4",),
+            cache=cache,
+            ttl_seconds=facts_settings.ttl_seconds,
+        )
+        for name in attempted:
+            facts = readback.facts.get(name)
+            try:
+                verify_fabric_ipv4(
+                    node_name=name,
+                    service_name=fabricnet.service_name,
+                    address=fabric_addr_by_name[name],
+                    observed=facts.service_address(fabricnet.service_name) if facts else None,
+                )
+            except RuntimeError as e:
+                print()
+                print(f"[error] {e}")
+                return 2
 
     def _tcp_probe(host: str, port: int, timeout: float) -> bool:
         try:
@@ -220,13 +302,19 @@ def _cmd_generate_hosts(args: argparse.Namespace) -> int:
     local_out = Path(args.out)
     _write_text(local_out, artifacts.block)
 
-    # Apply to local /etc/hosts (hub). This usually requires sudo.
+    # Apply to local /etc/hosts (hub). This usually requires sudo, so skip it
+    # entirely when the managed block is already current.
     hosts_path = Path("/etc/hosts")
     current = hosts_path.read_text(encoding="utf-8")
+    settings = inventory.settings.hosts_sync
+    digest = managed_block_digest(hosts_file_text=current, settings=settings)
+    if digest == artifacts.digest:
+        print(f"wrote {local_out}; local /etc/hosts already up to date")
+        return 0
     updated = upsert_managed_hosts_block(
         hosts_file_text=current,
         managed_block=artifacts.block,
-        settings=inventory.settings.hosts_sync,
+        settings=settings,
     )
 
     proc = subprocess.run(
@@ -243,6 +331,112 @@ def _cmd_generate_hosts(args: argparse.Namespace) -> int:
     return 0
 
 
+def _cmd_push_hosts(args: argparse.Namespace) -> int:
+    inventory = load_config(args.config)
+    ssh = inventory.settings.ssh
+    settings = inventory.settings.hosts_sync
+    index = get_inventory(inventory)
+    nodes = _select_nodes(index, args)
+    if nodes is None:
+        return 2
+
+    # Build once; the start marker carries the block's content hash.
+    artifacts = build_hosts_block(inventory)
+    local_out = Path(args.out)
+    _write_text(local_out, artifacts.block)
+
+    # One cheap read per node, all in parallel. Nodes whose block hash already
+    # matches need nothing else (no sudo, no write).
+    reads = run_ssh_fanout(
+        nodes=nodes,
+        settings=ssh,
+        remote_command="cat /etc/hosts",
+        log_command=False,
+        log_output=False,
+    ).results
+    failures: list[str] = []
+    writes: dict[str, str] = {}
+    for node in nodes:
+        result = reads[node.name]
+        if result.returncode != 0:
+            print(
+                f"[error] {node.name}: reading /etc/hosts failed: "
+                f"rc={result.returncode}"
+            )
+            if result.stderr.strip():
+                print(result.stderr.strip())
+            failures.append(node.name)
+            continue
+        current = result.stdout
+        digest = managed_block_digest(hosts_file_text=current, settings=settings)
+        if digest == artifacts.digest:
+            print(f"[hosts] {node.name}: up to date")
+            continue
+        updated = upsert_managed_hosts_block(
+            hosts_file_text=current, managed_block=artifacts.block, settings=settings
+        )
+        writes[node.name] = build_hosts_write_command(updated)
+
+    # Changed nodes are written concurrently with non-interactive sudo (temp
+    # file + rename on the node). Nodes where sudo wants a password are then
+    # retried one at a time with a TTY so sudo can prompt.
+    prompt: list[Node] = []
+    if writes:
+        results = run_ssh_fanout(
+            nodes=nodes,
+            settings=ssh,
+            remote_command={name: f"sudo -n {cmd}" for name, cmd in writes.items()},
+            log_command=False,
+            log_output=False,
+        ).results
+        for node in nodes:
+            result = results.get(node.name)
+            if result is None:
+                continue
+            if result.returncode == 0:
+                print(f"[hosts] {node.name}: updated")
+            elif "password is required" in result.stderr:
+                prompt.append(node)
+            else:
+                print(
+                    f"[error] {node.name}: writing /etc/hosts failed: "
+                    f"rc={result.returncode}"
+                )
+                if result.stderr.strip():
+                    print(result.stderr.strip())
+                failures.append(node.name)
+
+    for node in prompt:
+        print(
+            f"[hosts] {node.name}: sudo needs a password; "
+            "you'll be prompted in your terminal."
+        )
+        result = run_ssh_sudo(
+            node=node,
+            settings=ssh,
+            remote_command=writes[node.name],
+            check=False,
+            interactive=True,
+        )
+        if result.returncode == 0:
+            print(f"[hosts] {node.name}: updated")
+        else:
+            print(
+                f"[error] {node.name}: writing /etc/hosts failed: "
+                f"rc={result.returncode}"
+            )
+            failures.append(node.name)
+
+    print(f"wrote {local_out}; {len(writes)} of {len(nodes)} node(s) needed an update")
+    if failures:
+        print(
+            f"[error] /etc/hosts push failed for {len(failures)} node(s): "
+            f"{', '.join(failures)}"
+        )
+        return 2
+    return 0
+
+
 def main() -> int:
     p = argparse.ArgumentParser(prog="setup-env")
     p.add_argument(
@@ -259,7 +453,12 @@ def main() -> int:
     fn.add_argument(
         "--only",
         default=None,
-        help="Configure only these node names (comma-separated), e.g. --only msm2",
+        help="Configure only these nodes (comma-separated names or @group), e.g. --only msm2",
+    )
+    fn.add_argument(
+        "--refresh-facts",
+        action="store_true",
+        help="Ignore cached node facts and gather them again over SSH",
     )
     fn.set_defaults(func=_cmd_configure_fabric)
 
@@ -270,6 +469,18 @@ def main() -> int:
     lh.add_argument("--out", default="artifacts/hosts.block")
     lh.set_defaults(func=_cmd_generate_hosts)
 
+    ph = sub.add_parser(
+        "push-hosts",
+        help="Push the managed /etc/hosts block to all nodes (only those that changed)",
+    )
+    ph.add_argument("--out", default="artifacts/hosts.block")
+    ph.add_argument(
+        "--only",
+        default=None,
+        help="Push only to these nodes (comma-separated names or @group)",
+    )
+    ph.set_defaults(func=_cmd_push_hosts)
+
     args = p.parse_args()
     return int(args.func(args))
 
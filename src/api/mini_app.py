@@ -1,20 +1,172 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import math
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Literal
 
-from services.auth_service import TelegramUser, get_authenticated_user
-from services.config_service import load_config
-from services.monitor_service import cluster_status_as_dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from services.auth_service import (
+    TelegramUser,
+    get_authenticated_user,
+    get_init_data_user,
+    issue_session_token,
+)
+from services.config_service import get_config_snapshot, load_config
+from services.monitor_service import diff_cluster_status
+from services.poller_service import get_status_poller
+from services.ratelimit_service import get_rate_limiter
 
 router = APIRouter()
 
+_STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def _enforce_rate_limit(user: TelegramUser) -> TelegramUser:
+    # Keyed by Telegram user id, after auth: anonymous junk never gets a bucket.
+    server = load_config().server
+    retry_after = get_rate_limiter().check(
+        user.id, rate=server.api_rate_per_second, burst=server.api_rate_burst
+    )
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    return user
+
+
+async def limited_user(
+    user: TelegramUser = Depends(get_authenticated_user),
+) -> TelegramUser:
+    return _enforce_rate_limit(user)
+
+
+async def limited_init_data_user(
+    user: TelegramUser = Depends(get_init_data_user),
+) -> TelegramUser:
+    return _enforce_rate_limit(user)
+
+
+@router.post("/session")
+async def post_session(user: TelegramUser = Depends(limited_init_data_user)):
+    # Exchange verified initData for a short-lived Bearer token; later calls
+    # then cost one HMAC and never need the request body.
+    snapshot = get_config_snapshot()
+    cfg = snapshot.config
+    token, expires_at = issue_session_token(
+        user_id=user.id,
+        is_admin=user.id in snapshot.admin_ids,
+        bot_token=cfg.telegram.bot_token,
+        ttl_seconds=cfg.session_ttl_seconds,
+    )
+    return {
+        "token": token,
+        "token_type": "Bearer",
+        "expires_at": expires_at,
+        "user": user.model_dump(),
+    }
+
 
 @router.post("/me")
-async def post_me(user: TelegramUser = Depends(get_authenticated_user)):
+async def post_me(user: TelegramUser = Depends(limited_user)):
     return {"user": user.model_dump()}
 
 
-@router.post("/status")
-async def post_status(_: TelegramUser = Depends(get_authenticated_user)):
-    cfg = load_config()
-    return cluster_status_as_dict(cfg)
+@router.api_route("/status", methods=["GET", "POST"])
+async def post_status(
+    request: Request,
+    fresh: bool = False,
+    max_age: float | None = None,
+    _: TelegramUser = Depends(limited_user),
+):
+    # Served from the background poller's snapshot; `fresh=1` forces a
+    # (coalesced) probe round unless the snapshot is younger than
+    # fresh_min_interval_seconds, `max_age` overrides the stale threshold.
+    # The snapshot is encoded once per version; a matching If-None-Match
+    # costs a 304 with no body.
+    monitor = load_config().settings.monitor
+    if max_age is None:
+        max_age = monitor.stale_after_seconds
+    poller = get_status_poller()
+    await poller.get(
+        fresh=fresh,
+        max_age=max_age,
+        min_fresh_age=monitor.fresh_min_interval_seconds,
+    )
+    etag = poller.etag()
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+    age = json.dumps(poller.age_seconds()).encode()
+    body = poller.status_json()[:-1] + b',"age_seconds":' + age + b"}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _parse_if_none_match(value: str | None) -> set[str]:
+    if not value:
+        return set()
+    tags = {tag.strip() for tag in value.split(",")}
+    # Weak comparison: W/"x" and "x" match (RFC 9110, If-None-Match).
+    return tags | {t[2:] if t.startswith("W/") else "W/" + t for t in tags}
+
+
+@router.post("/status/history")
+async def post_status_history(
+    node: str | None = None,
+    iface: Literal["mgmt", "fabric"] | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    buckets: int = Query(60, ge=1, le=1000),
+    _: TelegramUser = Depends(limited_user),
+):
+    # Window bounds are epoch seconds; default is the last hour.
+    until = until or time.time()
+    since = since or until - 3600
+    history = await get_status_poller().history(load_config())
+    return history.query(
+        since=since, until=until, buckets=buckets, node=node, iface=iface
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _status_events(request: Request) -> AsyncIterator[str]:
+    poller = get_status_poller()
+    queue = poller.subscribe()
+    try:
+        prev = await poller.get()
+        yield f"event: snapshot\ndata: {poller.status_json().decode()}\n\n"
+        while not await request.is_disconnected():
+            try:
+                cur = await asyncio.wait_for(
+                    queue.get(), timeout=_STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            delta = diff_cluster_status(prev, cur)
+            prev = cur
+            if delta is not None:
+                yield _sse("delta", delta)
+    finally:
+        poller.unsubscribe(queue)
+
+
+@router.post("/status/stream")
+async def post_status_stream(request: Request, _: TelegramUser = Depends(limited_user)):
+    # Server-Sent Events: one `snapshot`, then `delta` events carrying only the
+    # nodes whose reachability changed (plus `removed` node names).
+    return StreamingResponse(
+        _status_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    brotli = None  # type: ignore
+
+# Content-hashed assets (`?v=<hash>` matching the current content) may be
+# cached for a year; anything else, index.html included, revalidates with its
+# ETag, which costs one round trip and no body when nothing changed.
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_REVALIDATE = "no-cache"
+_INDEX = "index.html"
+
+
+@dataclass(frozen=True)
+class _Asset:
+    content_type: str
+    digest: str
+    # Content-Encoding ("identity", "br", "gzip") -> body.
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+
+def _compress(data: bytes) -> dict[str, bytes]:
+    bodies = {"identity": data}
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    # Keep a variant only when it actually saves bytes.
+    bodies.update(
+        {enc: body for enc, body in variants.items() if len(body) < len(data)}
+    )
+    return bodies
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    accepted: set[str] = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles:
+    """Serves a small static directory from memory.
+
+    Files are read, hashed and compressed (gzip, plus brotli when installed)
+    once at startup. index.html is rewritten so it references the other files
+    with `?v=<content hash>`, which lets browsers keep them for good.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        raw = {
+            path.name: path.read_bytes()
+            for path in sorted(directory.iterdir())
+            if path.is_file()
+        }
+        digests = {
+            name: hashlib.sha256(data).hexdigest()[:16] for name, data in raw.items()
+        }
+        if _INDEX in raw:
+            raw[_INDEX] = self._pin_asset_urls(raw[_INDEX], digests)
+            digests[_INDEX] = hashlib.sha256(raw[_INDEX]).hexdigest()[:16]
+
+        self.assets: dict[str, _Asset] = {}
+        for name, data in raw.items():
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type in (
+                "application/javascript",
+                "application/json",
+            ):
+                content_type += "; charset=utf-8"
+            self.assets[name] = _Asset(content_type, digests[name], _compress(data))
+
+    @staticmethod
+    def _pin_asset_urls(index: bytes, digests: dict[str, str]) -> bytes:
+        text = index.decode("utf-8")
+        for name, digest in digests.items():
+            if name != _INDEX:
+                for quote in ('"', "'"):
+                    text = text.replace(
+                        f"{quote}/mini-app/{name}{quote}",
+                        f"{quote}/mini-app/{name}?v={digest}{quote}",
+                    )
+        return text.encode("utf-8")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = self._respond(scope)
+        await response(scope, receive, send)
+
+    def _respond(self, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return PlainTextResponse(
+                "Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"}
+            )
+        path, root = scope["path"], scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root) :]
+        name = path.lstrip("/") or _INDEX
+        asset = self.assets.get(name)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        headers = Headers(scope=scope)
+        accepted = _accepted_encodings(headers.get("accept-encoding"))
+        encoding = next(
+            (enc for enc in ("br", "gzip") if enc in accepted and enc in asset.bodies),
+            "identity",
+        )
+        # One ETag per representation; the content hash is shared.
+        etag = (
+            f'"{asset.digest}"'
+            if encoding == "identity"
+            else f'"{asset.digest}-{encoding}"'
+        )
+        query = scope.get("query_string", b"").decode("latin-1")
+        pinned = f"v={asset.digest}" in query.split("&")
+        out = {
+            "ETag": etag,
+            "Cache-Control": _IMMUTABLE if pinned else _REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+            return Response(status_code=304, headers=out)
+
+        if encoding != "identity":
+            out["Content-Encoding"] = encoding
+        body = asset.bodies[encoding]
+        if scope["method"] == "HEAD":
+            out["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=out, media_type=asset.content_type)
+        return Response(body, headers=out, media_type=asset.content_type)
@@ -1,19 +1,69 @@
 from __future__ import annotations
 
+import logging
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 
 from api.mini_app import router as mini_app_router
+from api.static_files import PrecompressedStaticFiles
+from bot.outbox import Outbox
+from bot.status import get_status_watcher
+from services.config_service import load_config
+from services.metrics_service import get_metrics_registry, is_metrics_client_allowed
+from services.poller_service import get_status_poller
+from services.webhook_service import UpdateQueue
 
 try:
     from telegram import Update  # type: ignore
 except Exception:  # pragma: no cover
     Update = None  # type: ignore
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    global _bot_ready
+    poller = get_status_poller()
+    poller.start()
+    watcher = get_status_watcher()
+    if _bot_app is not None:
+        # initialize() calls getMe: a bad token or no network must not take
+        # the API down with it. The webhook answers 503 until a restart.
+        try:
+            await _bot_app.initialize()
+        except Exception:
+            logger.exception("Telegram bot failed to initialize; serving without it")
+        else:
+            _bot_ready = True
+            _outbox.start(_bot_app.bot)
+            watcher.start(_send_text)
+            if _update_queue is not None:
+                _update_queue.start()
+    try:
+        yield
+    finally:
+        if _bot_ready:
+            _bot_ready = False
+            if _update_queue is not None:
+                await _update_queue.stop()
+            await watcher.stop()
+            await _outbox.stop()
+            await _bot_app.shutdown()
+        await poller.stop()
+
+
+async def _send_text(chat_id: int, text: str) -> None:
+    # Paced and merged per chat by the outbox; never blocks the watcher.
+    _outbox.submit(chat_id, text, parse_mode="HTML")
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,34 +75,99 @@ app.add_middleware(
 
 STATIC_DIR = (Path(__file__).resolve().parents[1] / "static" / "mini_app").resolve()
 if STATIC_DIR.exists():
-    app.mount(
-        "/mini-app", StaticFiles(directory=str(STATIC_DIR), html=True), name="mini-app"
-    )
+    # Read, hashed and compressed once here; served from memory.
+    app.mount("/mini-app", PrecompressedStaticFiles(STATIC_DIR), name="mini-app")
 
 app.include_router(mini_app_router, prefix="/api/mini-app")
 
 
+@app.middleware("http")
+async def _observe_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # call_next returns once headers are ready, so a stream's duration would
+    # only be its time to first byte: SSE routes are not observed.
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        return response
+    # Label by route template (not raw path) to keep cardinality bounded.
+    route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+    get_metrics_registry().observe_request(
+        method=request.method,
+        route=route,
+        status_code=response.status_code,
+        seconds=time.perf_counter() - started,
+    )
+    return response
+
+
 @app.get("/health")
 async def health():
     return {"ok": True}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    server = load_config().server
+    if not server.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    client_host = request.client.host if request.client else None
+    if not is_metrics_client_allowed(client_host, server.metrics_allow_ips):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    poller = get_status_poller()
+    body = get_metrics_registry().render(
+        status=poller.status,
+        latency=poller.latency,
+        webhook_queue_depth=_update_queue.depth if _update_queue is not None else None,
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 _bot_app = None
+# Set once _bot_app.initialize() succeeded in the lifespan.
+_bot_ready = False
+_update_queue: UpdateQueue | None = None
+_outbox: Outbox | None = None
 
 
 def setup_bot_app(bot_app) -> None:
-    global _bot_app
+    global _bot_app, _update_queue, _outbox
     _bot_app = bot_app
+    cfg = load_config()
+    _outbox = Outbox.from_config(cfg.telegram)
+    server = cfg.server
+    _update_queue = UpdateQueue(
+        bot_app.process_update,
+        workers=server.webhook_workers,
+        max_pending=server.webhook_max_pending,
+        dedup_window=server.webhook_dedup_window,
+        overload=server.webhook_overload,
+    )
 
 
 @app.post("/webhook/telegram")
 async def telegram_webhook(request: Request):
-    if _bot_app is None:
+    if not _bot_ready or _update_queue is None:
         raise HTTPException(status_code=503, detail="Bot not initialized")
     if Update is None:
         raise HTTPException(status_code=500, detail="python-telegram-bot missing")
 
-    payload = await request.json()
-    update = Update.de_json(payload, _bot_app.bot)
-    await _bot_app.process_update(update)
+    try:
+        payload = await request.json()
+        update = Update.de_json(payload, _bot_app.bot)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid update") from None
+    if update is None:
+        raise HTTPException(status_code=400, detail="Invalid update")
+
+    # Acknowledge right away; handlers run on the queue's workers, so a slow
+    # handler never makes Telegram time out and redeliver.
+    chat = update.effective_chat
+    outcome = _update_queue.submit(
+        update.update_id, chat.id if chat is not None else None, update
+    )
+    if outcome == "rejected":
+        raise HTTPException(
+            status_code=503, detail="Overloaded", headers={"Retry-After": "1"}
+        )
     return {"ok": True}
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from telegram import Update
+from telegram.constants import ParseMode
 from telegram.ext import Application, CommandHandler, ContextTypes
 
+from bot.status import format_status_table, get_status_watcher
 from services.access_service import is_admin_telegram_id
 from services.config_service import load_config
+from services.poller_service import get_status_poller
 
 
 async def _start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -33,7 +36,60 @@ async def _help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     await update.effective_message.reply_text(
-        "/start - show Mini App URL\n/help - show this help\n"
+        "/start - show Mini App URL\n"
+        "/status - fleet status (cached, no probing)\n"
+        "/watch - push node/interface state changes to this chat\n"
+        "/unwatch - stop pushing state changes\n"
+        "/help - show this help\n"
+    )
+
+
+async def _status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user = update.effective_user
+    if user is None:
+        return
+
+    if not is_admin_telegram_id(user.id):
+        await update.effective_message.reply_text("Forbidden")
+        return
+
+    # The poller's last snapshot; never triggers a probe round.
+    await update.effective_message.reply_text(
+        format_status_table(get_status_poller().status), parse_mode=ParseMode.HTML
+    )
+
+
+async def _watch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user = update.effective_user
+    chat = update.effective_chat
+    if user is None or chat is None:
+        return
+
+    if not is_admin_telegram_id(user.id):
+        await update.effective_message.reply_text("Forbidden")
+        return
+
+    debounce = load_config().settings.monitor.alert_debounce_seconds
+    added = get_status_watcher().watch(chat.id, user.id)
+    await update.effective_message.reply_text(
+        ("Watching" if added else "Already watching")
+        + f": state changes are pushed here, batched per {debounce:g}s. /unwatch stops."
+    )
+
+
+async def _unwatch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user = update.effective_user
+    chat = update.effective_chat
+    if user is None or chat is None:
+        return
+
+    if not is_admin_telegram_id(user.id):
+        await update.effective_message.reply_text("Forbidden")
+        return
+
+    removed = get_status_watcher().unwatch(chat.id)
+    await update.effective_message.reply_text(
+        "Stopped watching." if removed else "This chat was not watching."
     )
 
 
@@ -43,4 +99,7 @@ def create_bot_app() -> Application:
     app = Application.builder().token(token).build()
     app.add_handler(CommandHandler("start", _start))
     app.add_handler(CommandHandler("help", _help))
+    app.add_handler(CommandHandler("status", _status))
+    app.add_handler(CommandHandler("watch", _watch))
+    app.add_handler(CommandHandler("unwatch", _unwatch))
     return app
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+import warnings
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+from telegram.warnings import PTBDeprecationWarning
+
+from services.config_service import TelegramConfig
+from services.metrics_service import get_metrics_registry
+from services.ratelimit_service import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+# Telegram's hard limit for one text message.
+MAX_MESSAGE_LENGTH = 4096
+_MAX_ATTEMPTS = 3
+_GLOBAL = "global"
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    # int or timedelta depending on PTB_TIMEDELTA; the int form warns.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        value = error.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+@dataclass
+class _Message:
+    seq: int
+    chat_id: int
+    text: str
+    parse_mode: str | None
+    critical: bool
+    attempts: int = 0
+
+
+class Outbox:
+    """Paced outbound queue for bot messages (alerts, reports).
+
+    submit() only enqueues; one sender task delivers messages while keeping
+    each chat and the bot as a whole within token-bucket limits. Messages
+    still pending for a chat are merged into one, chats are served round
+    robin, and a 429 pauses all sending for the `retry_after` Telegram asks
+    for, while a transient network error only backs off the chat it hit.
+    Past `max_pending` the oldest non-critical message is dropped. Direct
+    replies to commands do not go through here.
+    """
+
+    def __init__(
+        self,
+        *,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: int = 3,
+        global_rate: float = 25.0,
+        max_pending: int = 200,
+    ) -> None:
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.global_rate = global_rate
+        self.max_pending = max_pending
+        # chat id -> its pending messages; chats in round-robin order.
+        self._pending: OrderedDict[int, deque[_Message]] = OrderedDict()
+        self._count = 0
+        self._seq = itertools.count()
+        self._chat_buckets = TokenBucketLimiter()
+        self._global_bucket = TokenBucketLimiter(max_keys=1)
+        self._paused_until = 0.0
+        # chat id -> monotonic time its retry after a network error is due.
+        self._chat_paused_until: dict[int, float] = {}
+        self._in_flight = 0
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_config(cls, telegram: TelegramConfig) -> Outbox:
+        return cls(
+            per_chat_rate=telegram.send_per_chat_per_second,
+            per_chat_burst=telegram.send_per_chat_burst,
+            global_rate=telegram.send_global_per_second,
+            max_pending=telegram.send_max_pending,
+        )
+
+    @property
+    def depth(self) -> int:
+        # Queued plus the message being sent right now.
+        return self._count + self._in_flight
+
+    def submit(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        parse_mode: str | None = None,
+        critical: bool = False,
+    ) -> bool:
+        """Queue a message; False when it was dropped right away."""
+
+        metrics = get_metrics_registry()
+        queue = self._pending.get(chat_id)
+        if queue:
+            last = queue[-1]
+            if (
+                last.parse_mode == parse_mode
+                and len(last.text) + 2 + len(text) <= MAX_MESSAGE_LENGTH
+            ):
+                last.text += "\n\n" + text
+                last.critical = last.critical or critical
+                metrics.inc_telegram_sends("merged")
+                return True
+
+        # Full: make room by dropping the oldest notice. Critical messages are
+        # queued even when only critical ones are pending.
+        full = self._count >= self.max_pending
+        if full and not self._drop_oldest_notice() and not critical:
+            metrics.inc_telegram_sends("dropped")
+            return False
+        message = _Message(next(self._seq), chat_id, text, parse_mode, critical)
+        self._pending.setdefault(chat_id, deque()).append(message)
+        self._count += 1
+        if self._wake is not None:
+            self._wake.set()
+        return True
+
+    def _drop_oldest_notice(self) -> bool:
+        oldest: _Message | None = None
+        for queue in self._pending.values():
+            for message in queue:
+                if not message.critical and (
+                    oldest is None or message.seq < oldest.seq
+                ):
+                    oldest = message
+        if oldest is None:
+            return False
+        queue = self._pending[oldest.chat_id]
+        queue.remove(oldest)
+        if not queue:
+            del self._pending[oldest.chat_id]
+            self._chat_paused_until.pop(oldest.chat_id, None)
+        self._count -= 1
+        get_metrics_registry().inc_telegram_sends("dropped")
+        return True
+
+    def start(self, bot: Any) -> None:
+        # `bot` needs `send_message(chat_id=..., text=..., parse_mode=...)`.
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    async def stop(self, *, drain_seconds: float = 2.0) -> None:
+        if self._task is None:
+            return
+        deadline = time.monotonic() + drain_seconds
+        while self.depth and time.monotonic() < deadline and not self._task.done():
+            await asyncio.sleep(0.05)
+        if self.depth:
+            logger.warning("dropping %d unsent bot messages on shutdown", self.depth)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _sleep(self, seconds: float) -> None:
+        # Wakes early on submit(), so a newly ready chat is not held up.
+        assert self._wake is not None
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+
+    def _next_ready(self, now: float) -> tuple[_Message | None, float]:
+        # First chat (round robin) whose bucket has a token and that is not
+        # backing off, else the wait.
+        wait = float("inf")
+        for chat_id in self._pending:
+            paused_until = self._chat_paused_until.get(chat_id, 0.0)
+            if now < paused_until:
+                wait = min(wait, paused_until - now)
+                continue
+            w = self._chat_buckets.check(
+                chat_id,
+                rate=self.per_chat_rate,
+                burst=self.per_chat_burst,
+                now=now,
+                consume=False,
+            )
+            if w == 0:
+                return self._pending[chat_id][0], 0.0
+            wait = min(wait, w)
+        return None, wait
+
+    async def _run(self, bot: Any) -> None:
+        assert self._wake is not None
+        global_burst = max(1, int(self.global_rate))
+        while True:
+            self._wake.clear()
+            if not self._pending:
+                await self._wake.wait()
+                continue
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            wait = self._global_bucket.check(
+                _GLOBAL, rate=self.global_rate, burst=global_burst, consume=False
+            )
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            message, wait = self._next_ready(now)
+            if message is None:
+                await self._sleep(wait)
+                continue
+
+            self._global_bucket.check(
+                _GLOBAL, rate=self.global_rate, burst=global_burst
+            )
+            self._chat_buckets.check(
+                message.chat_id,
+                rate=self.per_chat_rate,
+                burst=self.per_chat_burst,
+                now=now,
+            )
+            queue = self._pending[message.chat_id]
+            queue.popleft()
+            if queue:
+                self._pending.move_to_end(message.chat_id)
+            else:
+                del self._pending[message.chat_id]
+            self._count -= 1
+            self._chat_paused_until.pop(message.chat_id, None)
+            self._in_flight += 1
+            try:
+                await self._deliver(bot, message)
+            finally:
+                self._in_flight -= 1
+
+    async def _deliver(self, bot: Any, message: _Message) -> None:
+        metrics = get_metrics_registry()
+        try:
+            await bot.send_message(
+                chat_id=message.chat_id,
+                text=message.text,
+                parse_mode=message.parse_mode,
+            )
+        except RetryAfter as e:
+            retry_after = _retry_after_seconds(e)
+            self._paused_until = time.monotonic() + retry_after
+            metrics.inc_telegram_sends("retry_after")
+            logger.warning("telegram flood control: pausing sends for %ss", retry_after)
+            self._requeue(message)
+        except NetworkError as e:
+            # Timeouts and connection errors are transient; BadRequest is a
+            # NetworkError subclass too, but retrying it cannot help.
+            message.attempts += 1
+            if not isinstance(e, BadRequest) and message.attempts < _MAX_ATTEMPTS:
+                # Back off this chat only; other chats keep sending.
+                retry_at = time.monotonic() + float(message.attempts)
+                self._chat_paused_until[message.chat_id] = retry_at
+                self._requeue(message)
+                return
+            metrics.inc_telegram_sends("failed")
+            logger.warning("failed to send message to chat %s: %s", message.chat_id, e)
+        except TelegramError as e:
+            # Permanent (bot blocked, chat not found, bad markup): drop it.
+            metrics.inc_telegram_sends("failed")
+            logger.warning("failed to send message to chat %s: %s", message.chat_id, e)
+        else:
+            metrics.inc_telegram_sends("sent")
+
+    def _requeue(self, message: _Message) -> None:
+        # Back to the head of its chat so per-chat order is kept.
+        self._pending.setdefault(message.chat_id, deque()).appendleft(message)
+        self._pending.move_to_end(message.chat_id, last=False)
+        self._count += 1
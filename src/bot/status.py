@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import html
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from services.access_service import is_admin_telegram_id
+from services.config_service import load_config
+from services.monitor_service import ClusterStatus, NodeStatus, PortStatus
+from services.poller_service import get_status_poller
+
+logger = logging.getLogger(__name__)
+
+# Chat text for the bot: a compact table rendered from the poller's cached
+# snapshot, and state-transition alerts pushed to watching admin chats.
+# Nothing here probes; everything reads what the background poller has.
+
+# (node, "node" | "mgmt" | "fabric", old, new)
+Transition = tuple[str, str, str, str]
+
+
+def _ports(port: PortStatus) -> str:
+    return ("S" if port.ssh else "-") + ("O" if port.ollama else "-")
+
+
+def _age(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.0f}h"
+
+
+def format_status_table(
+    status: ClusterStatus | None, *, now: float | None = None
+) -> str:
+    """Monospace fleet table (Telegram HTML) from a cached snapshot."""
+
+    if status is None:
+        return "No status yet: the background poller has not finished a round."
+    now = time.time() if now is None else now
+    up = sum(1 for n in status.nodes if n.state == "up")
+    rows = [("node", "state", "mgmt", "fabric", "models")]
+    for node in sorted(status.nodes, key=lambda n: n.name):
+        models = "-"
+        if node.ollama is not None and node.ollama.ok:
+            models = f"{len(node.ollama.models)}/{len(node.ollama.loaded)}"
+        rows.append(
+            (
+                node.name,
+                node.state,
+                _ports(node.mgmt),
+                _ports(node.fabric) if node.fabric_ip else "n/a",
+                models,
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip() for row in rows
+    ]
+    header = (
+        f"<b>{up}/{len(status.nodes)} up</b>, "
+        f"snapshot {_age(max(0.0, now - status.ts))} old"
+    )
+    legend = "S/O: ssh/ollama port reachable; models: installed/loaded"
+    return f"{header}\n<pre>{html.escape(chr(10).join(lines))}</pre>\n{legend}"
+
+
+def _iface_state(node: NodeStatus, iface: str) -> str:
+    port = node.mgmt if iface == "mgmt" else node.fabric
+    return "up" if port.ssh or port.ollama else "down"
+
+
+def status_transitions(prev: ClusterStatus, cur: ClusterStatus) -> list[Transition]:
+    # Node state (after hysteresis) and per-interface reachability changes.
+    # Nodes leaving "unknown" (first rounds after start) are not transitions.
+    prev_by_name = {n.name: n for n in prev.nodes}
+    out: list[Transition] = []
+    for node in cur.nodes:
+        old = prev_by_name.get(node.name)
+        if old is None:
+            continue
+        if old.state != node.state and old.state != "unknown":
+            out.append((node.name, "node", old.state, node.state))
+        for iface in ("mgmt", "fabric"):
+            if iface == "fabric" and not (node.fabric_ip and old.fabric_ip):
+                continue
+            before, after = _iface_state(old, iface), _iface_state(node, iface)
+            if before != after:
+                out.append((node.name, iface, before, after))
+    return out
+
+
+def collapse_transitions(transitions: list[Transition]) -> list[Transition]:
+    # Net change per (node, what) over a batch; a flap that settles back to
+    # where it started is dropped.
+    net: dict[tuple[str, str], list[str]] = {}
+    for node, what, old, new in transitions:
+        if (node, what) in net:
+            net[(node, what)][1] = new
+        else:
+            net[(node, what)] = [old, new]
+    return [
+        (node, what, old, new) for (node, what), (old, new) in net.items() if old != new
+    ]
+
+
+def format_transitions(transitions: list[Transition]) -> str:
+    lines = []
+    for node, what, old, new in transitions:
+        icon = "🟢" if new == "up" else "🔴"
+        subject = node if what == "node" else f"{node} {what}"
+        lines.append(f"{icon} {html.escape(subject)}: {old} → {new}")
+    return "\n".join(lines)
+
+
+SendText = Callable[[int, str], Awaitable[object]]
+
+
+class StatusWatcher:
+    """Pushes fleet state transitions to subscribed admin chats.
+
+    Follows the poller's snapshots; the first transition opens a debounce
+    window, and everything that changed within it goes out as one message.
+    """
+
+    def __init__(self) -> None:
+        # chat id -> user id that subscribed it (re-checked against the
+        # admin list on every push, so config reloads revoke access).
+        self._chats: dict[int, int] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def chats(self) -> dict[int, int]:
+        return dict(self._chats)
+
+    def watch(self, chat_id: int, user_id: int) -> bool:
+        added = chat_id not in self._chats
+        self._chats[chat_id] = user_id
+        return added
+
+    def unwatch(self, chat_id: int) -> bool:
+        return self._chats.pop(chat_id, None) is not None
+
+    def start(self, send: SendText) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(send))
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self, send: SendText) -> None:
+        poller = get_status_poller()
+        queue = poller.subscribe()
+        prev = poller.status
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                cur = await queue.get()
+                pending = status_transitions(prev, cur) if prev is not None else []
+                prev = cur
+                if not pending:
+                    continue
+                debounce = load_config().settings.monitor.alert_debounce_seconds
+                deadline = loop.time() + debounce
+                while (remaining := deadline - loop.time()) > 0:
+                    try:
+                        cur = await asyncio.wait_for(queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    pending += status_transitions(prev, cur)
+                    prev = cur
+                await self._push(send, collapse_transitions(pending))
+        finally:
+            poller.unsubscribe(queue)
+
+    async def _push(self, send: SendText, transitions: list[Transition]) -> None:
+        if not transitions:
+            return
+        text = format_transitions(transitions)
+        for chat_id, user_id in list(self._chats.items()):
+            if not is_admin_telegram_id(user_id):
+                self._chats.pop(chat_id, None)
+                continue
+            try:
+                await send(chat_id, text)
+            except Exception:
+                logger.exception("failed to push status alert to chat %s", chat_id)
+
+
+_watcher = StatusWatcher()
+
+
+def get_status_watcher() -> StatusWatcher:
+    return _watcher
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from services.config_service import load_config
+from services.config_service import get_config_snapshot
 
 
-def get_admin_telegram_ids() -> set[int]:
-    cfg = load_config()
-    return set(cfg.access.admin_telegram_ids or [])
+def get_admin_telegram_ids() -> frozenset[int]:
+    return get_config_snapshot().admin_ids
 
 
 def is_admin_telegram_id(user_id: int) -> bool:
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+import base64
 import hashlib
 import hmac
 import json
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Optional
 from urllib.parse import parse_qsl
 
 from fastapi import HTTPException, Request
 from pydantic import BaseModel
 
-from services.access_service import get_admin_telegram_ids
-from services.config_service import load_config
+from services.config_service import get_config_snapshot
 
 
 class TelegramUser(BaseModel):
@@ -45,24 +48,32 @@ def _extract_init_data_raw_from_body(body: Any) -> Optional[str]:
     return None
 
 
-def _compute_telegram_hash(init_data_raw: str, bot_token: str) -> str:
-    pairs = parse_qsl(init_data_raw, keep_blank_values=True)
-    data: dict[str, str] = {k: v for (k, v) in pairs}
+def _parse_init_data(init_data_raw: str) -> dict[str, str]:
+    # Parsed once per request; every check below reads from this dict.
+    return dict(parse_qsl(init_data_raw, keep_blank_values=True))
 
-    received_hash = data.pop("hash", None)
-    if not received_hash:
-        raise HTTPException(status_code=401, detail="Missing init data hash")
-
-    data_check_string = "\n".join(f"{k}={data[k]}" for k in sorted(data.keys()))
 
-    secret_key = hmac.new(
+@lru_cache(maxsize=8)
+def _secret_key(bot_token: str) -> bytes:
+    # HMAC-SHA256("WebAppData", bot_token), fixed for a given token.
+    return hmac.new(
         key=b"WebAppData",
         msg=bot_token.encode("utf-8"),
         digestmod=hashlib.sha256,
     ).digest()
 
+
+def _compute_telegram_hash(data: dict[str, str], bot_token: str) -> str:
+    received_hash = data.get("hash")
+    if not received_hash:
+        raise HTTPException(status_code=401, detail="Missing init data hash")
+
+    data_check_string = "\n".join(
+        f"{k}={data[k]}" for k in sorted(data.keys()) if k != "hash"
+    )
+
     calculated_hash = hmac.new(
-        key=secret_key,
+        key=_secret_key(bot_token),
         msg=data_check_string.encode("utf-8"),
         digestmod=hashlib.sha256,
     ).hexdigest()
@@ -73,8 +84,7 @@ def _compute_telegram_hash(init_data_raw: str, bot_token: str) -> str:
     return received_hash
 
 
-def _parse_user_from_init_data(init_data_raw: str) -> TelegramUser:
-    data = dict(parse_qsl(init_data_raw, keep_blank_values=True))
+def _parse_user_from_init_data(data: dict[str, str]) -> TelegramUser:
     user_json = data.get("user")
     if not user_json:
         raise HTTPException(status_code=401, detail="Missing user in init data")
@@ -94,21 +104,20 @@ def _parse_user_from_init_data(init_data_raw: str) -> TelegramUser:
         ) from exc
 
 
-def _enforce_auth_date(init_data_raw: str) -> None:
-    data = dict(parse_qsl(init_data_raw, keep_blank_values=True))
+def _parse_auth_date(data: dict[str, str]) -> int:
     auth_date_raw = data.get("auth_date")
     if not auth_date_raw:
         raise HTTPException(status_code=401, detail="Missing auth_date in init data")
 
     try:
-        auth_date = int(auth_date_raw)
+        return int(auth_date_raw)
     except ValueError as exc:
         raise HTTPException(
             status_code=401, detail="Invalid auth_date in init data"
         ) from exc
 
-    max_age_seconds = int(load_config().tma_max_age_seconds)
-    now = int(time.time())
+
+def _enforce_auth_date(auth_date: int, *, max_age_seconds: int, now: int) -> None:
     if auth_date > now + 60:
         raise HTTPException(
             status_code=401, detail="init data auth_date is in the future"
@@ -117,9 +126,173 @@ def _enforce_auth_date(init_data_raw: str) -> None:
         raise HTTPException(status_code=401, detail="init data is too old")
 
 
+class _VerifiedInitData:
+    """Bounded LRU of initData strings whose signature was already checked.
+
+    The Mini App sends the same initData on every call; a hit skips parsing,
+    HMAC and user validation. Entries are tied to the bot token they were
+    verified with, and age is re-checked on every hit against the current
+    tma_max_age_seconds, so config reloads take effect immediately.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._token: str | None = None
+        self._entries: OrderedDict[str, tuple[int, TelegramUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, init_data_raw: str, *, bot_token: str, max_age_seconds: int, now: int
+    ) -> TelegramUser | None:
+        with self._lock:
+            if bot_token != self._token:
+                return None
+            entry = self._entries.get(init_data_raw)
+            if entry is None:
+                return None
+            auth_date, user = entry
+            if now - auth_date > max_age_seconds:
+                # Expired: drop it and let the full path produce the 401.
+                del self._entries[init_data_raw]
+                return None
+            self._entries.move_to_end(init_data_raw)
+            return user
+
+    def put(
+        self, init_data_raw: str, *, bot_token: str, auth_date: int, user: TelegramUser
+    ) -> None:
+        with self._lock:
+            if bot_token != self._token:
+                self._entries.clear()
+                self._token = bot_token
+            self._entries[init_data_raw] = (auth_date, user)
+            self._entries.move_to_end(init_data_raw)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_verified = _VerifiedInitData()
+
+
+def verify_init_data(
+    init_data_raw: str, *, bot_token: str, max_age_seconds: int
+) -> TelegramUser:
+    """Signature, age and user checks for Telegram initData (no admin check)."""
+
+    now = int(time.time())
+    user = _verified.get(
+        init_data_raw,
+        bot_token=bot_token,
+        max_age_seconds=max_age_seconds,
+        now=now,
+    )
+    if user is not None:
+        return user
+
+    data = _parse_init_data(init_data_raw)
+    _compute_telegram_hash(data, bot_token)
+    auth_date = _parse_auth_date(data)
+    _enforce_auth_date(auth_date, max_age_seconds=max_age_seconds, now=now)
+    user = _parse_user_from_init_data(data)
+
+    _verified.put(init_data_raw, bot_token=bot_token, auth_date=auth_date, user=user)
+    return user
+
+
+_SESSION_VERSION = "v1"
+
+
+@lru_cache(maxsize=8)
+def _session_key(bot_token: str) -> bytes:
+    # Derived from the bot token: rotating the token revokes every session.
+    return hmac.new(
+        key=b"ThunderForgeSession",
+        msg=bot_token.encode("utf-8"),
+        digestmod=hashlib.sha256,
+    ).digest()
+
+
+def _session_signature(payload: str, bot_token: str) -> str:
+    digest = hmac.new(
+        key=_session_key(bot_token),
+        msg=payload.encode("utf-8"),
+        digestmod=hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def issue_session_token(
+    *,
+    user_id: int,
+    is_admin: bool,
+    bot_token: str,
+    ttl_seconds: int,
+    now: int | None = None,
+) -> tuple[str, int]:
+    """Compact signed token: "v1.<user_id>.<admin 0|1>.<expires_at>.<sig>"."""
+
+    expires_at = int(now if now is not None else time.time()) + int(ttl_seconds)
+    payload = f"{_SESSION_VERSION}.{user_id}.{int(is_admin)}.{expires_at}"
+    return f"{payload}.{_session_signature(payload, bot_token)}", expires_at
+
+
+def verify_session_token(
+    token: str, *, bot_token: str, now: int | None = None
+) -> tuple[int, bool]:
+    # One HMAC, no parsing beyond a split. Returns (user_id, is_admin).
+    payload, _, signature = token.rpartition(".")
+    expected = _session_signature(payload, bot_token)
+    # Compared as bytes: compare_digest rejects non-ASCII str with TypeError.
+    if not payload or not hmac.compare_digest(
+        signature.encode("utf-8", "surrogateescape"), expected.encode("ascii")
+    ):
+        raise HTTPException(status_code=401, detail="Invalid session token")
+
+    version, user_id, is_admin, expires_at = (payload.split(".") + [""] * 4)[:4]
+    try:
+        uid, exp = int(user_id), int(expires_at)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid session token") from None
+    if version != _SESSION_VERSION:
+        raise HTTPException(status_code=401, detail="Invalid session token")
+    if exp <= int(now if now is not None else time.time()):
+        raise HTTPException(status_code=401, detail="Session token expired")
+    return uid, is_admin == "1"
+
+
+def _authenticate_session(token: str) -> TelegramUser:
+    snapshot = get_config_snapshot()
+    user_id, is_admin = verify_session_token(
+        token, bot_token=snapshot.config.telegram.bot_token
+    )
+    # Admin membership is re-checked against the live config: removing an id
+    # from access.admin_telegram_ids revokes its sessions on the next reload.
+    if not is_admin or user_id not in snapshot.admin_ids:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return TelegramUser.model_construct(id=user_id)
+
+
 async def get_authenticated_user(request: Request) -> TelegramUser:
     """FastAPI dependency.
 
+    - `Authorization: Bearer <session token>` (see /api/mini-app/session):
+      one HMAC plus the admin allowlist, the request body is never read.
+    - Otherwise falls back to Telegram init data (see get_init_data_user).
+    """
+
+    auth = request.headers.get("Authorization")
+    if auth and auth[:7].lower() == "bearer ":
+        return _authenticate_session(auth[7:].strip())
+    return await get_init_data_user(request)
+
+
+async def get_init_data_user(request: Request) -> TelegramUser:
+    """FastAPI dependency.
+
     - Extracts Telegram init data in the required precedence.
     - Verifies signature using config.telegram.bot_token.
     - Enforces admin allowlist via config.access.admin_telegram_ids.
@@ -137,14 +310,18 @@ async def get_authenticated_user(request: Request) -> TelegramUser:
     if not init_data_raw:
         raise HTTPException(status_code=401, detail="Missing Telegram init data")
 
-    bot_token = load_config().telegram.bot_token
-
-    _compute_telegram_hash(init_data_raw, bot_token)
-    _enforce_auth_date(init_data_raw)
+    # One snapshot for the whole request: token, max age and admins agree
+    # even if tf.yml is reloaded concurrently.
+    snapshot = get_config_snapshot()
+    cfg = snapshot.config
 
-    user = _parse_user_from_init_data(init_data_raw)
+    user = verify_init_data(
+        init_data_raw,
+        bot_token=cfg.telegram.bot_token,
+        max_age_seconds=int(cfg.tma_max_age_seconds),
+    )
 
-    admins = get_admin_telegram_ids()
+    admins = snapshot.admin_ids
     if not admins or user.id not in admins:
         raise HTTPException(status_code=403, detail="Forbidden")
 
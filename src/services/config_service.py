@@ -1,54 +1,187 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Literal, Optional
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Literal, Optional, Union, get_args, get_origin
 
-import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from pydantic import field_validator
 
+logger = logging.getLogger(__name__)
 
-class ServerConfig(BaseModel):
+
+class _Model(BaseModel):
+    # Build validators on first validation rather than at import, so code
+    # that only imports the models (type hints, --help) stays cheap.
+    model_config = ConfigDict(defer_build=True)
+
+
+class ServerConfig(_Model):
     bind: str = "127.0.0.1"
     port: int = 8000
     reload: bool = True
 
+    # Prometheus /metrics: client IPs/CIDRs allowed to scrape (empty = any).
+    metrics_enabled: bool = True
+    metrics_allow_ips: list[str] = Field(default_factory=lambda: ["127.0.0.1", "::1"])
+
+    # Mini App API: per Telegram user token bucket (refill rate per second and
+    # burst size); over the limit answers 429 with Retry-After. 0 disables.
+    api_rate_per_second: float = 2.0
+    api_rate_burst: int = 20
+
+    # Telegram webhook: updates are acknowledged at once and handled by a pool
+    # of workers (one chat always maps to the same worker, keeping its order).
+    # update_ids seen within the last webhook_dedup_window updates are ignored.
+    # When a worker's queue is full: "reject" answers 503 so Telegram retries
+    # later, "drop" acknowledges and discards the update.
+    webhook_workers: int = 4
+    webhook_max_pending: int = 1000
+    webhook_dedup_window: int = 10000
+    webhook_overload: Literal["drop", "reject"] = "reject"
+
+    @field_validator("metrics_allow_ips")
+    @classmethod
+    def _validate_metrics_allow_ips(cls, v: list[str]) -> list[str]:
+        # A typo here must fail at load time, not turn /metrics into a 500.
+        import ipaddress
+
+        for entry in v:
+            ipaddress.ip_network(entry, strict=False)
+        return v
+
 
-class TelegramConfig(BaseModel):
+class TelegramConfig(_Model):
     bot_token: str
 
+    # Outbound pacing for bot notifications. Telegram allows about one
+    # message per second per chat and 30 per second overall; pending messages
+    # to one chat are merged, and past send_max_pending the oldest
+    # non-critical notice is dropped.
+    send_per_chat_per_second: float = 1.0
+    send_per_chat_burst: int = 3
+    send_global_per_second: float = 25.0
+    send_max_pending: int = 200
 
-class SSHSettings(BaseModel):
+    # Set on configs rebuilt from the compiled cache, which never stores the
+    # token: it is read from this tf.yml on first access instead.
+    _token_source: str | None = PrivateAttr(default=None)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "bot_token" and self._token_source is not None:
+            token = _read_bot_token(self._token_source)
+            self.__dict__["bot_token"] = token
+            return token
+        return super().__getattr__(name)
+
+
+class SSHSettings(_Model):
     connect_timeout_seconds: float = 1.0
     batch_mode: bool = True
 
+    # Reuse one OpenSSH ControlMaster connection per node across commands;
+    # an idle master exits after control_persist_seconds.
+    multiplex: bool = True
+    control_persist_seconds: int = 60
 
-class MonitorSettings(BaseModel):
+    # Fleet-wide fan-out: nodes handled concurrently.
+    max_parallel: int = 8
+
+
+class MonitorSettings(_Model):
     ssh_port: int = 22
     ollama_port: int = 11434
 
-
-class HostsSyncSettings(BaseModel):
+    # Probe engine: all probes run concurrently, capped by this limit.
+    max_concurrent_probes: int = 64
+    # One deadline for a whole status round: probes still queued or running
+    # when it passes are cancelled and reported down. Each probe is already
+    # capped by its own timeout. Defaults to the slowest probe timeout + 1s.
+    probe_deadline_seconds: float | None = None
+
+    # Ollama API probe (/api/version, /api/tags, /api/ps) on the mgmt address,
+    # over one pooled keep-alive connection per node; the timeout covers all
+    # three requests.
+    ollama_api: bool = True
+    ollama_api_timeout_seconds: float = 2.0
+
+    # Background poller (server only): refresh interval for the shared
+    # snapshot, and the age after which readers trigger a refresh. A forced
+    # refresh (`?fresh=1`) is served the current snapshot if it is younger
+    # than fresh_min_interval_seconds.
+    poll_interval_seconds: float = 5.0
+    stale_after_seconds: float = 15.0
+    fresh_min_interval_seconds: float = 2.0
+
+    # Adaptive scheduling (server poller): per-node jitter, hysteresis before
+    # a node flips up/down, quick re-checks while a flip is pending, and
+    # exponential backoff for nodes that stay down.
+    probe_jitter_ratio: float = 0.1
+    up_after: int = 2
+    down_after: int = 3
+    recheck_seconds: float = 1.0
+    backoff_max_seconds: float = 300.0
+
+    # Reachability history: samples kept per node and interface (5 bytes each;
+    # the default is two weeks at a 5s poll interval), and where the server
+    # periodically saves it for `thunder-forge history` (null: memory only).
+    history_capacity: int = 241920
+    history_path: str | None = None
+    history_flush_seconds: float = 60.0
+
+    # Connect-latency percentiles cover the last one to two windows.
+    latency_window_seconds: float = 300.0
+
+    # Bot /watch alerts: transitions within this window go out as one message.
+    alert_debounce_seconds: float = 10.0
+
+
+class HostsSyncSettings(_Model):
     managed_block_start: str = "# BEGIN thunder-forge"
     managed_block_end: str = "# END thunder-forge"
 
 
-class AccessSettings(BaseModel):
+class FactsSettings(_Model):
+    # On-disk cache of remote node facts (scripts/setup_env.py). Null keeps it
+    # in $XDG_CACHE_HOME/thunder-forge/facts-cache.json; an empty ttl_seconds
+    # effectively disables it.
+    cache_path: str | None = None
+    # Seconds a cached fact stays fresh; facts not listed are always re-gathered.
+    ttl_seconds: dict[str, float] = Field(
+        default_factory=lambda: {
+            "os_version": 86400.0,
+            "hostname": 86400.0,
+            "network_services": 3600.0,
+            "ipv4": 600.0,
+            "ollama_service": 0.0,
+        }
+    )
+
+
+class AccessSettings(_Model):
     admin_telegram_ids: list[int] = Field(default_factory=list)
 
 
-class FabricIPv4Defaults(BaseModel):
+class FabricIPv4Defaults(_Model):
     netmask: str = "255.255.255.252"
     router: str = ""
 
 
-class FabricNetNode(BaseModel):
+class FabricNetNode(_Model):
     name: str
     address: str
 
 
-class FabricNetConfig(BaseModel):
+class FabricNetConfig(_Model):
     # macOS network service name as shown by:
     #   networksetup -listallnetworkservices
     service_name: str = "Thunderbolt Bridge"
@@ -68,7 +201,7 @@ class FabricNetConfig(BaseModel):
         return [] if v is None else v
 
 
-class NodeDefaults(BaseModel):
+class NodeDefaults(_Model):
     ssh_user: str | None = None
     service_manager: Literal["brew", "systemd"] | None = None
 
@@ -79,7 +212,7 @@ class NodeDefaults(BaseModel):
     models: list[str] | None = None
 
 
-class NodeItem(BaseModel):
+class NodeItem(_Model):
     name: str
     mgmt_ip: str
 
@@ -90,8 +223,11 @@ class NodeItem(BaseModel):
     ollama_service: str | None = None
     models: list[str] | None = None
 
+    # Selection labels, e.g. [m3-ultra, rack-a]; select with "@m3-ultra".
+    groups: list[str] | None = None
 
-class NodesConfig(BaseModel):
+
+class NodesConfig(_Model):
     defaults: NodeDefaults = Field(default_factory=NodeDefaults)
     items: list[NodeItem] = Field(default_factory=list)
 
@@ -101,7 +237,7 @@ class NodesConfig(BaseModel):
         return [] if v is None else v
 
 
-class Node(BaseModel):
+class Node(_Model):
     name: str
     ssh_user: str
     mgmt_ip: str
@@ -112,6 +248,7 @@ class Node(BaseModel):
 
     ollama_service: str = "ollama"
     models: list[str] = Field(default_factory=list)
+    groups: list[str] = Field(default_factory=list)
 
 
 def _resolve_nodes(nodes: NodesConfig) -> list[Node]:
@@ -126,13 +263,96 @@ def _resolve_nodes(nodes: NodesConfig) -> list[Node]:
     return resolved
 
 
-class FleetSettings(BaseModel):
+class Inventory:
+    """Resolved nodes plus lookups, built once per config (see get_inventory).
+
+    Node models are shared; treat them as read-only.
+    """
+
+    def __init__(
+        self, nodes: Iterable[Node], fabric_addr_by_name: Mapping[str, str]
+    ) -> None:
+        self.nodes: tuple[Node, ...] = tuple(nodes)
+        self.by_name: Mapping[str, Node] = MappingProxyType(
+            {n.name: n for n in self.nodes}
+        )
+        # Only entries for inventory nodes; fabricnet entries for unknown names are ignored.
+        self.fabric_addr_by_name: Mapping[str, str] = MappingProxyType(
+            {
+                name: addr
+                for name, addr in fabric_addr_by_name.items()
+                if name in self.by_name
+            }
+        )
+        groups: dict[str, list[str]] = {}
+        for node in self.nodes:
+            for group in node.groups:
+                groups.setdefault(group, []).append(node.name)
+        self.groups: Mapping[str, tuple[str, ...]] = MappingProxyType(
+            {group: tuple(names) for group, names in groups.items()}
+        )
+
+    @classmethod
+    def from_config(
+        cls, cfg: TFConfig, *, nodes: Iterable[Node] | None = None
+    ) -> Inventory:
+        # `nodes`: already resolved (compiled cache), else resolved from cfg.
+        fabric: dict[str, str] = {}
+        if cfg.fabricnet is not None:
+            fabric = {n.name: n.address for n in cfg.fabricnet.nodes}
+        return cls(_resolve_nodes(cfg.nodes) if nodes is None else nodes, fabric)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, name: str) -> Node | None:
+        return self.by_name.get(name)
+
+    def fabric_ip(self, name: str) -> str | None:
+        return self.fabric_addr_by_name.get(name)
+
+    def names(self) -> list[str]:
+        return [node.name for node in self.nodes]
+
+    def select(self, selector: str | Iterable[str] | None) -> list[Node]:
+        """Nodes matching node names and/or "@group" tokens, in inventory order.
+
+        A string selector is comma-separated ("msm1,@rack-a"); None or "all"
+        selects every node. Unknown names or groups raise ValueError.
+        """
+
+        if selector is None:
+            return list(self.nodes)
+        tokens = selector.split(",") if isinstance(selector, str) else list(selector)
+        tokens = [t.strip() for t in tokens if t.strip()]
+        if tokens == ["all"]:
+            return list(self.nodes)
+        wanted: set[str] = set()
+        unknown: list[str] = []
+        for token in tokens:
+            if token.startswith("@"):
+                members = self.groups.get(token[1:])
+                if members is None:
+                    unknown.append(token)
+                else:
+                    wanted.update(members)
+            elif token in self.by_name:
+                wanted.add(token)
+            else:
+                unknown.append(token)
+        if unknown:
+            raise ValueError(f"Unknown nodes/groups: {', '.join(unknown)}")
+        return [node for node in self.nodes if node.name in wanted]
+
+
+class FleetSettings(_Model):
     ssh: SSHSettings = Field(default_factory=SSHSettings)
     monitor: MonitorSettings = Field(default_factory=MonitorSettings)
     hosts_sync: HostsSyncSettings = Field(default_factory=HostsSyncSettings)
+    facts: FactsSettings = Field(default_factory=FactsSettings)
 
 
-class TFConfig(BaseModel):
+class TFConfig(_Model):
     server: ServerConfig = Field(default_factory=ServerConfig)
     telegram: TelegramConfig
     access: AccessSettings = Field(default_factory=AccessSettings)
@@ -146,6 +366,13 @@ class TFConfig(BaseModel):
 
     # Security: Telegram initData max age
     tma_max_age_seconds: int = 86400
+    # Lifetime of Mini App session tokens (POST /api/mini-app/session).
+    session_ttl_seconds: int = 3600
+
+    # Derived, see get_inventory(); stored with the source sections it was built from.
+    _inventory: tuple[NodesConfig, FabricNetConfig | None, Inventory] | None = (
+        PrivateAttr(default=None)
+    )
 
 
 def get_config_path() -> str:
@@ -153,19 +380,268 @@ def get_config_path() -> str:
     return os.environ.get("TF_CONFIG_PATH", "tf.yml")
 
 
+def user_cache_dir() -> Path:
+    # Per-user cache for thunder-forge (compiled configs, node facts).
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "thunder-forge"
+
+
 @lru_cache(maxsize=1)
-def load_config(path: Optional[str] = None) -> TFConfig:
-    path = path or get_config_path()
+def _schema_fingerprint() -> str:
+    # Compiled entries are only valid for the exact model code that made them.
+    import pydantic
+
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(pydantic.VERSION.encode())
+    return digest.hexdigest()
+
+
+def _compiled_cache_file(path: str) -> Path:
+    name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    return user_cache_dir() / f"config-{name}.json"
+
+
+def _read_bot_token(path: str) -> str:
+    import yaml
+
+    data = yaml.safe_load(Path(path).read_bytes()) or {}
+    return TelegramConfig.model_validate(data.get("telegram")).bot_token
+
+
+def _construct(model: type[BaseModel], data: dict[str, Any]) -> BaseModel:
+    # Rebuild a model from its own model_dump(mode="json") without validating:
+    # only nested models (plain, optional or in lists) need converting back.
+    values: dict[str, Any] = {}
+    for name, value in data.items():
+        field = model.model_fields.get(name)
+        if field is None:
+            continue
+        annotation = field.annotation
+        if get_origin(annotation) is Union:
+            annotation = next(
+                (a for a in get_args(annotation) if a is not type(None)), annotation
+            )
+        if get_origin(annotation) is list and isinstance(value, list):
+            (item,) = get_args(annotation)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                value = [_construct(item, v) for v in value]
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if isinstance(value, dict):
+                value = _construct(annotation, value)
+        values[name] = value
+    return model.model_construct(**values)
+
+
+def _load_compiled(path: str, content_hash: str) -> TFConfig | None:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        entry = json.loads(_compiled_cache_file(path).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.debug("Ignoring unreadable compiled config for %s: %s", path, exc)
+        return None
+    if (
+        not isinstance(entry, dict)
+        or entry.get("content") != content_hash
+        or entry.get("schema") != _schema_fingerprint()
+    ):
+        return None
+    # Written by _store_compiled from an already validated config, for this
+    # exact content and model code: rebuilt as-is, no validation.
+    try:
+        config = _construct(TFConfig, entry["config"])
+        nodes = [_construct(Node, n) for n in entry["inventory"]]
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        logger.debug("Ignoring malformed compiled config for %s: %s", path, exc)
+        return None
+    config.telegram._token_source = path
+    inventory = Inventory.from_config(config, nodes=nodes)
+    config._inventory = (config.nodes, config.fabricnet, inventory)
+    return config
+
+
+def _store_compiled(path: str, content_hash: str, config: TFConfig) -> None:
+    target = _compiled_cache_file(path)
+    entry = {
+        "content": content_hash,
+        "schema": _schema_fingerprint(),
+        # The bot token stays in tf.yml only (see TelegramConfig).
+        "config": config.model_dump(mode="json", exclude={"telegram": {"bot_token"}}),
+        "inventory": [n.model_dump(mode="json") for n in get_inventory(config).nodes],
+    }
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError as exc:
+        logger.debug("Could not write compiled config for %s: %s", path, exc)
+
+
+def _read_config_file(path: str) -> TFConfig:
+    # Validated configs (and their resolved inventory) are cached on disk as
+    # plain JSON without the bot token, keyed by the file's content hash, so
+    # repeated CLI runs skip YAML parsing and validation.
+    try:
+        raw = Path(path).read_bytes()
     except FileNotFoundError as exc:
         raise RuntimeError(
             f"Missing config file: {path}. Create tf.yml (or set TF_CONFIG_PATH)."
         ) from exc
-    return TFConfig.model_validate(data)
+    content_hash = hashlib.sha256(raw).hexdigest()
+    config = _load_compiled(path, content_hash)
+    if config is not None:
+        return config
+
+    import yaml
+
+    config = TFConfig.model_validate(yaml.safe_load(raw) or {})
+    _store_compiled(path, content_hash, config)
+    return config
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One parsed tf.yml plus indexes derived from it, built once per load.
+
+    Treat it (including `config`) as read-only: readers share it across
+    requests and a reload swaps in a new snapshot instead of mutating this one.
+    """
+
+    path: str
+    # Increments on every successful (re)load of this path.
+    version: int
+    # (st_mtime_ns, st_size) of the file that was parsed.
+    stamp: tuple[int, int]
+    config: TFConfig
+    inventory: Inventory
+    admin_ids: frozenset[int]
+
+    @classmethod
+    def build(
+        cls, *, path: str, version: int, stamp: tuple[int, int], config: TFConfig
+    ) -> ConfigSnapshot:
+        return cls(
+            path=path,
+            version=version,
+            stamp=stamp,
+            config=config,
+            inventory=get_inventory(config),
+            admin_ids=frozenset(config.access.admin_telegram_ids or []),
+        )
+
+
+# How often a snapshot re-checks its file's mtime; readers in between get the
+# current snapshot with no syscalls at all.
+_RELOAD_CHECK_SECONDS = 1.0
+
+
+class _ConfigStore:
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._snapshot: ConfigSnapshot | None = None
+        self._checked_at = 0.0
+        # Stamp of a file version that failed validation; not retried until it changes.
+        self._failed_stamp: tuple[int, int] | None = None
+
+    def _stamp(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self) -> ConfigSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < _RELOAD_CHECK_SECONDS:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - self._checked_at < _RELOAD_CHECK_SECONDS:
+                return snapshot
+            self._checked_at = now
+            stamp = self._stamp()
+            if snapshot is not None and stamp in (
+                snapshot.stamp,
+                self._failed_stamp,
+                None,
+            ):
+                # Unchanged, known-bad, or temporarily missing: keep serving.
+                return snapshot
+            try:
+                config = _read_config_file(self._path)
+            except Exception as exc:
+                if snapshot is None:
+                    raise
+                self._failed_stamp = stamp
+                logger.warning(
+                    "Config reload of %s failed; keeping the last good config: %s",
+                    self._path,
+                    exc,
+                )
+                return snapshot
+            self._snapshot = ConfigSnapshot.build(
+                path=self._path,
+                version=(snapshot.version + 1) if snapshot is not None else 1,
+                stamp=stamp or (0, 0),
+                config=config,
+            )
+            self._failed_stamp = None
+            if snapshot is not None:
+                logger.info("Reloaded config %s", self._path)
+            return self._snapshot
+
+
+_stores: dict[str, _ConfigStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_snapshot(path: Optional[str] = None) -> ConfigSnapshot:
+    """Current snapshot of the config file, reloaded when the file changes.
+
+    Edits are picked up within about a second; a file that fails to parse or
+    validate is logged and the last good snapshot keeps being served.
+    """
+
+    path = path or get_config_path()
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, _ConfigStore(path))
+    return store.get()
+
+
+def load_config(path: Optional[str] = None) -> TFConfig:
+    return get_config_snapshot(path).config
+
+
+def _clear_config_cache() -> None:
+    # Drop all snapshots; the next read parses the file again.
+    with _stores_lock:
+        _stores.clear()
+
+
+# Kept from the lru_cache era: tests and scripts call load_config.cache_clear().
+load_config.cache_clear = _clear_config_cache  # type: ignore[attr-defined]
+
+
+def get_inventory(cfg: TFConfig) -> Inventory:
+    # Built on first use and kept on the config object. It is rebuilt if the
+    # `nodes`/`fabricnet` sections were swapped (e.g. model_copy(update=...)).
+    cached = cfg._inventory
+    if cached is not None and cached[0] is cfg.nodes and cached[1] is cfg.fabricnet:
+        return cached[2]
+    inventory = Inventory.from_config(cfg)
+    cfg._inventory = (cfg.nodes, cfg.fabricnet, inventory)
+    return inventory
 
 
 def iter_nodes(cfg: TFConfig) -> list[Node]:
     # Single place for consumers to get resolved nodes.
-    return _resolve_nodes(cfg.nodes)
+    return list(get_inventory(cfg).nodes)
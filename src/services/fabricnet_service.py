@@ -1,20 +1,25 @@
 from __future__ import annotations
 
-import re
 from typing import Literal
 
+from pydantic import BaseModel
+
 from services.config_service import FabricIPv4Defaults, Node, SSHSettings
 from services.ssh_service import run_ssh, run_ssh_sudo
 
 
 def require_macos_tahoe_26_2_plus(*, node: Node, ssh: SSHSettings) -> None:
+    out = run_ssh(node=node, settings=ssh, remote_command="sw_vers -productVersion").stdout
+    check_macos_version(node_name=node.name, version_text=out)
+
+
+def check_macos_version(*, node_name: str, version_text: str | None) -> None:
     # Policy: we support macOS Tahoe 26.2+ only for fabricnet automation.
     # This is a pragmatic guardrail around `networksetup` behavior.
-    out = run_ssh(node=node, settings=ssh, remote_command="sw_vers -productVersion").stdout
-    version_text = (out or "").strip()
+    version_text = (version_text or "").strip()
     if not version_text:
         raise RuntimeError(
-            f"{node.name}: failed to detect macOS version (empty sw_vers output); "
+            f"{node_name}: failed to detect macOS version (empty sw_vers output); "
             "fabricnet requires macOS Tahoe 26.2+"
         )
 
@@ -24,34 +29,116 @@ def require_macos_tahoe_26_2_plus(*, node: Node, ssh: SSHSettings) -> None:
         minor = int(parts[1]) if len(parts) > 1 else 0
     except ValueError as exc:
         raise RuntimeError(
-            f"{node.name}: unexpected macOS version string from sw_vers: {version_text!r}; "
+            f"{node_name}: unexpected macOS version string from sw_vers: {version_text!r}; "
             "fabricnet requires macOS Tahoe 26.2+"
         ) from exc
 
     if (major, minor) < (26, 2):
         raise RuntimeError(
-            f"{node.name}: unsupported macOS {version_text}; fabricnet requires macOS Tahoe 26.2+"
+            f"{node_name}: unsupported macOS {version_text}; fabricnet requires macOS Tahoe 26.2+"
         )
 
 
+def parse_network_services(text: str) -> list[str]:
+    # `networksetup -listallnetworkservices`: a header line, then one service
+    # per line; disabled services are prefixed with "*".
+    services = [line.strip().lstrip("*").strip() for line in text.splitlines() if line.strip()]
+    if services and services[0].lower().startswith("an asterisk"):
+        services = services[1:]
+    return services
+
+
+class ServiceIPv4(BaseModel):
+    # Parsed `networksetup -getinfo <service>`; missing/"none" values are None.
+    configuration: str | None = None
+    address: str | None = None
+    subnet_mask: str | None = None
+    router: str | None = None
+
+
+def parse_service_ipv4(text: str) -> ServiceIPv4:
+    # Example:
+    #   Manual Configuration
+    #   IP address: 169.254.10.1
+    #   Subnet mask: 255.255.255.252
+    #   Router: (null)
+    fields: dict[str, str | None] = {}
+    configuration: str | None = None
+    for raw in (text or "").splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            if configuration is None and not fields:
+                configuration = line
+            continue
+        value = value.strip()
+        fields[key.strip().lower()] = None if value.lower() in {"", "none", "(null)"} else value
+    return ServiceIPv4(
+        configuration=configuration,
+        address=fields.get("ip address"),
+        subnet_mask=fields.get("subnet mask"),
+        router=fields.get("router"),
+    )
+
+
+# `networksetup -getinfo` header line for each ipv4_mode.
+_IPV4_MODE_CONFIGURATION = {
+    "manual": "Manual Configuration",
+    "dhcp_with_manual_address": "Manually Using DHCP Router Configuration",
+}
+
+
+def fabric_ipv4_matches(
+    current: ServiceIPv4 | None,
+    *,
+    address: str,
+    ipv4_defaults: FabricIPv4Defaults,
+    ipv4_mode: Literal["dhcp_with_manual_address", "manual"],
+) -> bool:
+    # True only when every field configure_fabric_ipv4 would set already
+    # matches; anything unexpected means "reconfigure".
+    if current is None:
+        return False
+    router = ipv4_defaults.router or None
+    observed_router = None if current.router in (None, "0.0.0.0") else current.router
+    return (
+        current.configuration == _IPV4_MODE_CONFIGURATION.get(ipv4_mode)
+        and current.address == address
+        and current.subnet_mask == ipv4_defaults.netmask
+        and observed_router == router
+    )
+
+
 def _get_service_ipv4_address(*, node: Node, ssh: SSHSettings, service_name: str) -> str | None:
     out = run_ssh(
         node=node,
         settings=ssh,
         remote_command=f"networksetup -getinfo {service_name!r}",
     ).stdout
-    text = (out or "").strip()
-    if not text:
-        return None
+    return parse_service_ipv4(out).address
 
-    # Example line: "IP address: 169.254.10.1"
-    m = re.search(r"^IP address:\s*(.+?)\s*$", text, flags=re.MULTILINE)
-    if not m:
-        return None
-    value = m.group(1).strip()
-    if not value or value.lower() in {"none"}:
-        return None
-    return value
+
+def verify_fabric_ipv4(
+    *, node_name: str, service_name: str, address: str, observed: str | None
+) -> None:
+    # Read-back verification: `networksetup` sometimes returns success but the
+    # service may still show a self-assigned IP if the change didn't stick.
+    if observed != address:
+        raise RuntimeError(
+            "\n".join(
+                [
+                    f"{node_name}: fabricnet IP did not apply for service {service_name!r}",
+                    f"Expected: {address}",
+                    f"Observed: {observed or '(unknown)'}",
+                    "What to check:",
+                    "- Verify the exact service name: networksetup -listallnetworkservices",
+                    "- Inspect service state: networksetup -getinfo <service>",
+                    "- Ensure the Thunderbolt link is up and no bridging is enabled",
+                ]
+            )
+        )
 
 
 def configure_fabric_ipv4(
@@ -65,7 +152,10 @@ def configure_fabric_ipv4(
     enforce_macos_version_check: bool = True,
     sudo_password: str | None = None,
     sudo_interactive: bool = False,
+    verify_readback: bool = True,
 ) -> None:
+    # verify_readback=False lets callers batch the read-back (e.g. one parallel
+    # facts gather after configuring many nodes, see facts_service).
     if enforce_macos_version_check:
         require_macos_tahoe_26_2_plus(node=node, ssh=ssh)
 
@@ -89,20 +179,9 @@ def configure_fabric_ipv4(
         interactive=sudo_interactive,
     )
 
-    # Read-back verification: `networksetup` sometimes returns success but the
-    # service may still show a self-assigned IP if the change didn't stick.
+    if not verify_readback:
+        return
     applied = _get_service_ipv4_address(node=node, ssh=ssh, service_name=service_name)
-    if applied != address:
-        raise RuntimeError(
-            "\n".join(
-                [
-                    f"{node.name}: fabricnet IP did not apply for service {service_name!r}",
-                    f"Expected: {address}",
-                    f"Observed: {applied or '(unknown)'}",
-                    "What to check:",
-                    "- Verify the exact service name: networksetup -listallnetworkservices",
-                    "- Inspect service state: networksetup -getinfo <service>",
-                    "- Ensure the Thunderbolt link is up and no bridging is enabled",
-                ]
-            )
-        )
+    verify_fabric_ipv4(
+        node_name=node.name, service_name=service_name, address=address, observed=applied
+    )
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shlex
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from services.config_service import Node, SSHSettings
+from services.fabricnet_service import (
+    ServiceIPv4,
+    parse_network_services,
+    parse_service_ipv4,
+)
+from services.ssh_service import SSHResult, run_ssh_fanout
+
+logger = logging.getLogger(__name__)
+
+# Everything setup steps want to know about a node, gathered by one composite
+# remote script per node (one SSH round trip) instead of one command per fact.
+
+FACT_NAMES: tuple[str, ...] = (
+    "os_version",
+    "hostname",
+    "network_services",
+    "ipv4",
+    "ollama_service",
+)
+
+_MARKER = "@@tf-fact"
+_CACHE_VERSION = 1
+
+# One POSIX snippet per fact. Each section starts with a marker line so the
+# output can be split back apart; failures inside a snippet just leave the
+# section empty. stdin is closed for commands run inside `while read` loops.
+_FACT_SCRIPTS: dict[str, str] = {
+    "os_version": f"echo '{_MARKER} os_version'; sw_vers -productVersion 2>/dev/null",
+    "hostname": f"echo '{_MARKER} hostname'; hostname 2>/dev/null",
+    "network_services": (
+        f"echo '{_MARKER} network_services'; networksetup -listallnetworkservices 2>/dev/null"
+    ),
+    "ipv4": (
+        "networksetup -listallnetworkservices 2>/dev/null | sed '1d; s/^\\*//' | "
+        f'while IFS= read -r svc; do echo "{_MARKER} ipv4 $svc"; '
+        'networksetup -getinfo "$svc" </dev/null 2>/dev/null; done'
+    ),
+    "ollama_service": (
+        f"echo '{_MARKER} ollama_service'; "
+        'PATH="$PATH:/opt/homebrew/bin:/usr/local/bin"; '
+        "if command -v brew >/dev/null 2>&1; then "
+        "brew services list 2>/dev/null | awk -v s={service} '$1==s{{print $2}}'; "
+        "elif command -v systemctl >/dev/null 2>&1; then "
+        "systemctl is-active {service} 2>/dev/null; fi"
+    ),
+}
+
+
+class NodeFacts(BaseModel):
+    node: str
+    os_version: str | None = None
+    hostname: str | None = None
+    network_services: list[str] = Field(default_factory=list)
+    # Service name -> parsed `networksetup -getinfo`.
+    ipv4: dict[str, ServiceIPv4] = Field(default_factory=dict)
+    # brew services status ("started", "stopped", "none", ...) or systemd
+    # is-active ("active", "inactive", ...); None when not detectable.
+    ollama_service: str | None = None
+
+    def service_address(self, service_name: str) -> str | None:
+        info = self.ipv4.get(service_name)
+        return info.address if info else None
+
+
+@dataclass(frozen=True)
+class FactsResult:
+    facts: dict[str, NodeFacts]
+    # Nodes whose SSH round trip failed (connection/auth), with the raw result.
+    failed: dict[str, SSHResult] = field(default_factory=dict)
+
+
+def build_facts_script(
+    facts: Iterable[str] = FACT_NAMES, *, ollama_service: str = "ollama"
+) -> str:
+    wanted = list(dict.fromkeys(facts))
+    unknown = [name for name in wanted if name not in _FACT_SCRIPTS]
+    if unknown:
+        raise ValueError(f"Unknown facts: {', '.join(unknown)}")
+    snippets = [_FACT_SCRIPTS[name] for name in wanted]
+    if "ollama_service" in wanted:
+        i = wanted.index("ollama_service")
+        snippets[i] = snippets[i].format(service=shlex.quote(ollama_service))
+    # Always exit 0: a missing tool is an empty fact, only SSH itself can fail.
+    return "; ".join(snippets + ["exit 0"])
+
+
+def parse_facts(node_name: str, text: str) -> NodeFacts:
+    sections: dict[str, list[str]] = {}
+    ipv4_sections: dict[str, list[str]] = {}
+    current: list[str] | None = None
+    for line in (text or "").splitlines():
+        if line.startswith(_MARKER + " "):
+            name, _, arg = line[len(_MARKER) + 1 :].partition(" ")
+            if name == "ipv4":
+                current = ipv4_sections.setdefault(arg.strip(), [])
+            else:
+                current = sections.setdefault(name, [])
+            continue
+        if current is not None:
+            current.append(line)
+
+    def _scalar(name: str) -> str | None:
+        value = "\n".join(sections.get(name, [])).strip()
+        return value or None
+
+    return NodeFacts(
+        node=node_name,
+        os_version=_scalar("os_version"),
+        hostname=_scalar("hostname"),
+        network_services=parse_network_services(
+            "\n".join(sections.get("network_services", []))
+        ),
+        ipv4={
+            svc: parse_service_ipv4("\n".join(lines))
+            for svc, lines in ipv4_sections.items()
+        },
+        ollama_service=_scalar("ollama_service"),
+    )
+
+
+class FactsCache:
+    """Per node/fact cache of gathered facts, persisted as one JSON file.
+
+    Entries are keyed by node name and remember the SSH target they were
+    gathered from, so a node whose address changed is never served stale facts.
+    """
+
+    def __init__(self, path: str | Path | None) -> None:
+        self._path = Path(path).expanduser() if path else None
+        self._nodes: dict[str, dict[str, Any]] | None = None
+        self._dirty = False
+
+    def _entries(self) -> dict[str, dict[str, Any]]:
+        if self._nodes is None:
+            self._nodes = {}
+            if self._path is not None and self._path.exists():
+                try:
+                    data = json.loads(self._path.read_text(encoding="utf-8"))
+                    if data.get("version") == _CACHE_VERSION:
+                        # Drop malformed node entries; bad facts are misses.
+                        self._nodes = {
+                            name: entry
+                            for name, entry in (data.get("nodes") or {}).items()
+                            if isinstance(entry, dict)
+                            and isinstance(entry.get("facts"), dict)
+                        }
+                except (OSError, ValueError, AttributeError) as e:
+                    logger.warning(
+                        "Ignoring unreadable facts cache %s: %s", self._path, e
+                    )
+        return self._nodes
+
+    def get(
+        self,
+        node: Node,
+        facts: Iterable[str],
+        *,
+        ttl_seconds: Mapping[str, float],
+        now: float,
+    ) -> dict[str, Any]:
+        # Fresh cached values for the requested facts; missing/expired are omitted.
+        entry = self._entries().get(node.name)
+        if not entry or entry.get("target") != _target(node):
+            return {}
+        fresh: dict[str, Any] = {}
+        for name in facts:
+            try:
+                cached = entry["facts"][name]
+                if now - float(cached["ts"]) < ttl_seconds.get(name, 0.0):
+                    fresh[name] = cached["value"]
+            except (KeyError, TypeError, ValueError):
+                # Missing, truncated or hand-edited entry: a miss.
+                continue
+        return fresh
+
+    def put(self, node: Node, values: Mapping[str, Any], *, now: float) -> None:
+        entries = self._entries()
+        entry = entries.get(node.name)
+        if not entry or entry.get("target") != _target(node):
+            entry = entries[node.name] = {"target": _target(node), "facts": {}}
+        for name, value in values.items():
+            entry["facts"][name] = {"ts": now, "value": value}
+        self._dirty = True
+
+    def invalidate(self, node_name: str, facts: Iterable[str] | None = None) -> None:
+        # Call after anything that mutates a node (e.g. configure_fabric_ipv4).
+        entries = self._entries()
+        if node_name not in entries:
+            return
+        if facts is None:
+            del entries[node_name]
+        else:
+            for name in facts:
+                entries[node_name]["facts"].pop(name, None)
+        self._dirty = True
+
+    def save(self) -> None:
+        if self._path is None or not self._dirty:
+            return
+        payload = json.dumps(
+            {"version": _CACHE_VERSION, "nodes": self._entries()}, sort_keys=True
+        )
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(self._path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self._path)
+        self._dirty = False
+
+
+def _target(node: Node) -> str:
+    return f"{node.ssh_user}@{node.ssh_host or node.mgmt_ip}"
+
+
+def gather_facts(
+    *,
+    nodes: Iterable[Node],
+    settings: SSHSettings,
+    facts: Iterable[str] = FACT_NAMES,
+    max_parallel: int | None = None,
+    cache: FactsCache | None = None,
+    ttl_seconds: Mapping[str, float] | None = None,
+    refresh: bool = False,
+) -> FactsResult:
+    """Gather facts from all nodes in parallel, one SSH round trip per node.
+
+    With a cache, facts still within their TTL are served from it and only
+    the rest are gathered (nodes with nothing to gather make no SSH call);
+    refresh=True ignores cached values but still updates the cache.
+    """
+
+    wanted = list(dict.fromkeys(facts))
+    build_facts_script(wanted)  # validate names up front
+    nodes = list(nodes)
+    now = time.time()
+
+    cached: dict[str, dict[str, Any]] = {}
+    scripts: dict[str, str] = {}
+    for node in nodes:
+        hits = {}
+        if cache is not None and not refresh:
+            hits = cache.get(node, wanted, ttl_seconds=ttl_seconds or {}, now=now)
+        cached[node.name] = hits
+        missing = [name for name in wanted if name not in hits]
+        if missing:
+            scripts[node.name] = build_facts_script(
+                missing, ollama_service=node.ollama_service
+            )
+
+    results: dict[str, SSHResult] = {}
+    if scripts:
+        results = run_ssh_fanout(
+            nodes=nodes,
+            settings=settings,
+            remote_command=scripts,
+            max_parallel=max_parallel,
+            log_command=False,
+            log_output=False,
+        ).results
+
+    gathered: dict[str, NodeFacts] = {}
+    failed: dict[str, SSHResult] = {}
+    for node in nodes:
+        values = dict(cached[node.name])
+        result = results.get(node.name)
+        if result is not None:
+            if result.returncode != 0:
+                failed[node.name] = result
+                continue
+            missing = [name for name in wanted if name not in values]
+            fresh = parse_facts(node.name, result.stdout).model_dump(
+                mode="json", include=set(missing)
+            )
+            if cache is not None:
+                cache.put(node, fresh, now=now)
+            values.update(fresh)
+        gathered[node.name] = NodeFacts.model_validate({"node": node.name, **values})
+
+    if cache is not None:
+        cache.save()
+    return FactsResult(facts=gathered, failed=failed)
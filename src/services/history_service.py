@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from services.monitor_service import ClusterStatus, PortStatus
+
+# One byte of flags per sample; timestamps are whole epoch seconds (uint32).
+_SSH = 0x01
+_OLLAMA = 0x02
+
+# bytes.translate() tables mapping a flags byte to 0/1 for one bit, so a
+# bucket's "up" count is a C-level translate + count instead of a Python loop.
+_SSH_TABLE = bytes(1 if b & _SSH else 0 for b in range(256))
+_OLLAMA_TABLE = bytes(1 if b & _OLLAMA else 0 for b in range(256))
+
+_FILE_MAGIC = b"thunder-forge-history/1\n"
+
+
+def _flags(port: PortStatus) -> int:
+    return (_SSH if port.ssh else 0) | (_OLLAMA if port.ollama else 0)
+
+
+class _Ring:
+    """Fixed-capacity ring of (ts, flags) samples, oldest first.
+
+    Grows by appending until full, then overwrites the oldest sample, so
+    memory is bounded by capacity * 5 bytes.
+    """
+
+    __slots__ = ("capacity", "flags", "start", "ts")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.ts = array("I")
+        self.flags = bytearray()
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def append(self, ts: int, flags: int) -> None:
+        if len(self.flags) < self.capacity:
+            self.ts.append(ts)
+            self.flags.append(flags)
+            return
+        self.ts[self.start] = ts
+        self.flags[self.start] = flags
+        self.start = (self.start + 1) % self.capacity
+
+    def _ts_at(self, i: int) -> int:
+        return self.ts[(self.start + i) % len(self.ts)]
+
+    def bisect_left(self, ts: float) -> int:
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts_at(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def flag_segments(self, lo: int, hi: int) -> Iterator[bytearray]:
+        # Logical [lo, hi) may wrap around the physical end of the buffer.
+        n = len(self)
+        count = hi - lo
+        if count <= 0:
+            return
+        a = (self.start + lo) % n
+        if a + count <= n:
+            yield self.flags[a : a + count]
+        else:
+            yield self.flags[a:]
+            yield self.flags[: a + count - n]
+
+
+class StatusHistory:
+    """In-memory reachability history, one ring per (node, interface).
+
+    record() runs on the event loop while to_bytes() may run in a worker
+    thread; a lock keeps each saved ring consistent with its header entry.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self._rings: dict[tuple[str, str], _Ring] = {}
+        self._lock = threading.Lock()
+
+    def _ring(self, node: str, iface: str) -> _Ring:
+        key = (node, iface)
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _Ring(self.capacity)
+        return ring
+
+    def record(self, status: ClusterStatus) -> None:
+        ts = int(status.ts)
+        with self._lock:
+            for node in status.nodes:
+                self._ring(node.name, "mgmt").append(ts, _flags(node.mgmt))
+                if node.fabric_ip:
+                    self._ring(node.name, "fabric").append(ts, _flags(node.fabric))
+
+    def query(
+        self,
+        *,
+        since: float,
+        until: float,
+        buckets: int,
+        node: str | None = None,
+        iface: str | None = None,
+    ) -> dict[str, Any]:
+        """Downsample [since, until) into `buckets` equal-width buckets.
+
+        Each bucket reports its sample count and the fraction of samples with
+        ssh/ollama up (None when the bucket has no samples).
+        """
+
+        buckets = max(1, int(buckets))
+        width = max(until - since, 1e-9) / buckets
+        series = []
+        for (name, kind), ring in sorted(self._rings.items()):
+            if (node and name != node) or (iface and kind != iface):
+                continue
+            points = []
+            lo = ring.bisect_left(since)
+            for i in range(buckets):
+                start = since + i * width
+                hi = ring.bisect_left(start + width)
+                samples = hi - lo
+                ssh_up = ollama_up = 0
+                for seg in ring.flag_segments(lo, hi):
+                    ssh_up += seg.translate(_SSH_TABLE).count(1)
+                    ollama_up += seg.translate(_OLLAMA_TABLE).count(1)
+                points.append(
+                    {
+                        "ts": start,
+                        "samples": samples,
+                        "ssh_up": ssh_up / samples if samples else None,
+                        "ollama_up": ollama_up / samples if samples else None,
+                    }
+                )
+                lo = hi
+            series.append({"node": name, "iface": kind, "points": points})
+        return {"since": since, "until": until, "buckets": buckets, "series": series}
+
+    def to_bytes(self) -> bytes:
+        # Header line (JSON) followed by the raw arrays. Native byte order:
+        # the file is only meant to be read back on this host.
+        meta = []
+        chunks: list[bytes] = []
+        with self._lock:
+            for (name, kind), ring in list(self._rings.items()):
+                meta.append(
+                    {
+                        "node": name,
+                        "iface": kind,
+                        "size": len(ring),
+                        "start": ring.start,
+                    }
+                )
+                chunks += [ring.ts.tobytes(), bytes(ring.flags)]
+        header = json.dumps({"capacity": self.capacity, "series": meta})
+        return b"".join([_FILE_MAGIC, header.encode("utf-8"), b"\n", *chunks])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, capacity: int | None = None) -> StatusHistory:
+        if not data.startswith(_FILE_MAGIC):
+            raise ValueError("not a thunder-forge history file")
+        header_end = data.index(b"\n", len(_FILE_MAGIC))
+        header = json.loads(data[len(_FILE_MAGIC) : header_end])
+        history = cls(capacity or header["capacity"])
+
+        offset = header_end + 1
+        itemsize = array("I").itemsize
+        for item in header["series"]:
+            size = item["size"]
+            ts = array("I")
+            ts.frombytes(data[offset : offset + size * itemsize])
+            offset += size * itemsize
+            flags = data[offset : offset + size]
+            offset += size
+
+            # Unroll oldest-first and keep the newest `capacity` samples, so a
+            # changed capacity is honoured; slices keep this at C speed.
+            start = item["start"] % size if size else 0
+            keep = min(size, history.capacity)
+            ring = history._ring(item["node"], item["iface"])
+            ring.ts[:] = (ts[start:] + ts[:start])[size - keep :]
+            ring.flags[:] = (flags[start:] + flags[:start])[size - keep :]
+            ring.start = 0
+        return history
+
+
+def save_history_bytes(path: str | Path, data: bytes) -> None:
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_history(path: str | Path, *, capacity: int | None = None) -> StatusHistory:
+    data = Path(path).expanduser().read_bytes()
+    return StatusHistory.from_bytes(data, capacity=capacity)
@@ -1,36 +1,100 @@
 from __future__ import annotations
 
+import hashlib
+import shlex
 from dataclasses import dataclass
 
-from services.config_service import HostsSyncSettings, TFConfig, iter_nodes
+from services.config_service import HostsSyncSettings, TFConfig, get_inventory
+
+# The start marker carries a hash of the block's entries, so a node's copy can
+# be checked against the desired block without diffing (or rewriting) it.
+_DIGEST_PREFIX = "sha256="
+_HEREDOC_EOF = "TF_HOSTS_EOF"
+_HOSTS_PATH = "/etc/hosts"
 
 
 @dataclass(frozen=True)
 class HostsArtifacts:
     block: str
+    digest: str
+
+
+def _entries_digest(lines: list[str]) -> str:
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()[:16]
 
 
 def build_hosts_block(inventory: TFConfig) -> HostsArtifacts:
     start = inventory.settings.hosts_sync.managed_block_start
     end = inventory.settings.hosts_sync.managed_block_end
 
-    fabric_addr_by_name: dict[str, str] = {}
-    if inventory.fabricnet is not None:
-        fabric_addr_by_name = {n.name: n.address for n in inventory.fabricnet.nodes}
+    index = get_inventory(inventory)
 
-    lines: list[str] = [start]
-    for node in iter_nodes(inventory):
+    lines: list[str] = []
+    for node in index.nodes:
         # DRY/KISS: only one stable hostname per node.
         # - <name>-mgmt maps to the management interface.
         lines.append(f"{node.mgmt_ip} {node.name}-mgmt")
 
-        fabric_ip = fabric_addr_by_name.get(node.name)
+        fabric_ip = index.fabric_ip(node.name)
         if fabric_ip:
             # Stable fabric hostname for direct Thunderbolt networking.
             lines.append(f"{fabric_ip} {node.name}-fabric")
-    lines.append(end)
 
-    return HostsArtifacts(block="\n".join(lines) + "\n")
+    digest = _entries_digest(lines)
+    block = "\n".join([f"{start} {_DIGEST_PREFIX}{digest}", *lines, end]) + "\n"
+    return HostsArtifacts(block=block, digest=digest)
+
+
+def managed_block_digest(
+    *, hosts_file_text: str, settings: HostsSyncSettings
+) -> str | None:
+    # Hash from the start marker, or None when there is no block, it predates
+    # hashed markers, or its entries were edited by hand since it was written.
+    lines = hosts_file_text.splitlines()
+    start = next(
+        (
+            i
+            for i, line in enumerate(lines)
+            if line.startswith(settings.managed_block_start)
+        ),
+        None,
+    )
+    if start is None:
+        return None
+    end = next(
+        (
+            i
+            for i in range(start + 1, len(lines))
+            if lines[i].startswith(settings.managed_block_end)
+        ),
+        None,
+    )
+    if end is None:
+        return None
+    claimed = lines[start][len(settings.managed_block_start) :].strip()
+    if not claimed.startswith(_DIGEST_PREFIX):
+        return None
+    digest = claimed[len(_DIGEST_PREFIX) :]
+    return digest if _entries_digest(lines[start + 1 : end]) == digest else None
+
+
+def build_hosts_write_command(hosts_file_text: str, *, path: str = _HOSTS_PATH) -> str:
+    """Shell command (to run under sudo) that replaces /etc/hosts atomically.
+
+    The new content travels inside the command as a quoted here-document, is
+    written to a temp file next to /etc/hosts and renamed over it, so readers
+    never see a partial file.
+    """
+
+    if f"\n{_HEREDOC_EOF}\n" in f"\n{hosts_file_text}":
+        raise ValueError(f"hosts file content contains the {_HEREDOC_EOF} delimiter")
+    tmp = shlex.quote(f"{path}.thunder-forge.tmp")
+    script = (
+        f"umask 022 && cat > {tmp} && chmod 644 {tmp} "
+        f"&& mv -f {tmp} {shlex.quote(path)}"
+    )
+    text = hosts_file_text.rstrip("\n") + "\n"
+    return f"sh -c {shlex.quote(script)} <<'{_HEREDOC_EOF}'\n{text}{_HEREDOC_EOF}\n"
 
 
 def upsert_managed_hosts_block(
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from services.monitor_service import ClusterStatus
+
+# Log-spaced buckets (HDR-style): 10us .. ~170s with ~5% relative error,
+# so every histogram is a fixed list of ~340 counters regardless of samples.
+_MIN_SECONDS = 1e-5
+_GROWTH = 1.05
+_LOG_GROWTH = math.log(_GROWTH)
+_BUCKETS = int(math.log(170.0 / _MIN_SECONDS) / _LOG_GROWTH) + 1
+
+PATHS = ("mgmt.ssh", "mgmt.ollama", "fabric.ssh", "fabric.ollama")
+
+
+def bucket_upper_bound(index: int) -> float:
+    return _MIN_SECONDS * _GROWTH ** (index + 1)
+
+
+class LatencyHistogram:
+    __slots__ = ("count", "counts", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds <= _MIN_SECONDS:
+            index = 0
+        else:
+            index = min(
+                _BUCKETS - 1, int(math.log(seconds / _MIN_SECONDS) / _LOG_GROWTH)
+            )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                # Geometric midpoint of the bucket.
+                return bucket_upper_bound(i) / math.sqrt(_GROWTH)
+        return bucket_upper_bound(_BUCKETS - 1)
+
+
+class LatencyStats(BaseModel):
+    samples: int
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+
+
+class _PathLatency:
+    """Cumulative histogram plus two rotating windows for recent percentiles."""
+
+    __slots__ = ("current", "previous", "rotated_at", "total")
+
+    def __init__(self, now: float) -> None:
+        self.total = LatencyHistogram()
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+        self.rotated_at = now
+
+    def record(self, seconds: float, *, now: float, window_seconds: float) -> None:
+        if now - self.rotated_at >= window_seconds:
+            stale = now - self.rotated_at >= 2 * window_seconds
+            self.previous = LatencyHistogram() if stale else self.current
+            self.current = LatencyHistogram()
+            self.rotated_at = now
+        self.total.record(seconds)
+        self.current.record(seconds)
+
+    def stats(self) -> LatencyStats:
+        recent = LatencyHistogram()
+        recent.merge(self.previous)
+        recent.merge(self.current)
+
+        def _ms(q: float) -> float | None:
+            value = recent.quantile(q)
+            return None if value is None else round(value * 1000, 3)
+
+        return LatencyStats(
+            samples=recent.count, p50_ms=_ms(0.5), p95_ms=_ms(0.95), p99_ms=_ms(0.99)
+        )
+
+
+class LatencyTracker:
+    """Connect-latency percentiles per node and path (e.g. "fabric.ssh").
+
+    Percentiles cover the last one to two `window_seconds`; the cumulative
+    histograms and failed-probe counts are kept for metrics export.
+    """
+
+    def __init__(self, window_seconds: float = 300.0) -> None:
+        self.window_seconds = window_seconds
+        self._paths: dict[tuple[str, str], _PathLatency] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+
+    def record(self, node: str, path: str, seconds: float) -> None:
+        now = time.monotonic()
+        entry = self._paths.get((node, path))
+        if entry is None:
+            entry = self._paths[(node, path)] = _PathLatency(now)
+        entry.record(seconds, now=now, window_seconds=self.window_seconds)
+
+    def observe(self, status: ClusterStatus) -> None:
+        """Record every measured probe in `status` and attach percentiles."""
+
+        for node in status.nodes:
+            for iface, port in (("mgmt", node.mgmt), ("fabric", node.fabric)):
+                if iface == "fabric" and not node.fabric_ip:
+                    continue
+                for kind, ms in (("ssh", port.ssh_ms), ("ollama", port.ollama_ms)):
+                    key = (node.name, f"{iface}.{kind}")
+                    if ms is not None:
+                        self.record(*key, ms / 1000)
+                    else:
+                        self._errors[key] = self._errors.get(key, 0) + 1
+            node.latency = {
+                path: self._paths[(node.name, path)].stats()
+                for path in PATHS
+                if (node.name, path) in self._paths
+            }
+
+    def histograms(self) -> dict[tuple[str, str], LatencyHistogram]:
+        return {key: entry.total for key, entry in self._paths.items()}
+
+    def errors(self) -> dict[tuple[str, str], int]:
+        return dict(self._errors)
+
+    def retain(self, node_names: set[str]) -> None:
+        for table in (self._paths, self._errors):
+            for key in [k for k in table if k[0] not in node_names]:
+                del table[key]
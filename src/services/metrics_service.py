@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import ipaddress
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from services.latency_service import (
+    LatencyHistogram,
+    LatencyTracker,
+    bucket_upper_bound,
+)
+from services.monitor_service import ClusterStatus
+
+# Prometheus bucket bounds (seconds) shared by probe and request latency.
+_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+_PREFIX = "thunder_forge"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _le_labels(labels: str, le: str) -> str:
+    if not labels:
+        return f'{{le="{le}"}}'
+    return labels[:-1] + ("," if len(labels) > 2 else "") + f'le="{le}"' + "}"
+
+
+class _Histogram:
+    __slots__ = ("count", "counts", "total")
+
+    def __init__(self) -> None:
+        # One counter per bound plus +Inf (non-cumulative; summed on render).
+        self.counts = [0] * (len(_LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(_LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+def _export_counts(hist: LatencyHistogram) -> list[int]:
+    # Fold the fine log buckets into the coarse export buckets. A fine bucket
+    # lands in the first export bucket whose bound covers its upper edge.
+    out = [0] * (len(_LATENCY_BUCKETS) + 1)
+    for i, c in enumerate(hist.counts):
+        if c:
+            out[bisect_left(_LATENCY_BUCKETS, bucket_upper_bound(i) * (1 - 1e-9))] += c
+    return out
+
+
+def _render_histogram(
+    lines: list[str], name: str, labels: str, counts: list[int], total: float
+) -> None:
+    cumulative = 0
+    for bound, c in zip(_LATENCY_BUCKETS, counts):
+        cumulative += c
+        lines.append(f"{name}_bucket{_le_labels(labels, repr(bound))} {cumulative}")
+    cumulative += counts[-1]
+    lines.append(f"{name}_bucket{_le_labels(labels, '+Inf')} {cumulative}")
+    lines.append(f"{name}_sum{labels} {total}")
+    lines.append(f"{name}_count{labels} {cumulative}")
+
+
+class MetricsRegistry:
+    """Counters kept by the server itself; fleet metrics come from the poller."""
+
+    def __init__(self) -> None:
+        self._requests: dict[tuple[str, str, str], _Histogram] = {}
+        self._webhook_updates: dict[str, int] = {}
+        self._webhook_handler = _Histogram()
+        self._telegram_sends: dict[str, int] = {}
+
+    def observe_request(
+        self, *, method: str, route: str, status_code: int, seconds: float
+    ) -> None:
+        key = (method, route, str(status_code))
+        hist = self._requests.get(key)
+        if hist is None:
+            hist = self._requests[key] = _Histogram()
+        hist.observe(seconds)
+
+    def inc_webhook_updates(self, outcome: str = "processed") -> None:
+        self._webhook_updates[outcome] = self._webhook_updates.get(outcome, 0) + 1
+
+    def observe_webhook_handler(self, seconds: float) -> None:
+        self._webhook_handler.observe(seconds)
+
+    def inc_telegram_sends(self, outcome: str) -> None:
+        self._telegram_sends[outcome] = self._telegram_sends.get(outcome, 0) + 1
+
+    def render(
+        self,
+        *,
+        status: ClusterStatus | None,
+        latency: LatencyTracker,
+        webhook_queue_depth: int | None = None,
+    ) -> str:
+        """Prometheus text exposition; reads cached state only, never probes."""
+
+        lines: list[str] = []
+
+        if status is not None:
+            name = f"{_PREFIX}_node_up"
+            lines += [
+                f"# HELP {name} Node state after hysteresis (1 up, 0 down).",
+                f"# TYPE {name} gauge",
+            ]
+            for node in status.nodes:
+                if node.state != "unknown":
+                    value = 1 if node.state == "up" else 0
+                    lines.append(f"{name}{_labels(node=node.name)} {value}")
+
+            name = f"{_PREFIX}_port_reachable"
+            lines += [
+                f"# HELP {name} Last probe result per node, interface and port.",
+                f"# TYPE {name} gauge",
+            ]
+            for node in status.nodes:
+                for iface, port in (("mgmt", node.mgmt), ("fabric", node.fabric)):
+                    if iface == "fabric" and not node.fabric_ip:
+                        continue
+                    for kind, ok in (("ssh", port.ssh), ("ollama", port.ollama)):
+                        labels = _labels(node=node.name, iface=iface, port=kind)
+                        lines.append(f"{name}{labels} {int(ok)}")
+
+            name = f"{_PREFIX}_snapshot_timestamp_seconds"
+            lines += [
+                f"# HELP {name} Time of the latest status snapshot.",
+                f"# TYPE {name} gauge",
+                f"{name} {status.ts}",
+            ]
+
+        name = f"{_PREFIX}_probe_latency_seconds"
+        lines += [
+            f"# HELP {name} TCP connect latency of successful probes.",
+            f"# TYPE {name} histogram",
+        ]
+        for (node, path), hist in sorted(latency.histograms().items()):
+            iface, kind = path.split(".", 1)
+            labels = _labels(node=node, iface=iface, port=kind)
+            _render_histogram(lines, name, labels, _export_counts(hist), hist.total)
+
+        name = f"{_PREFIX}_probe_errors_total"
+        lines += [
+            f"# HELP {name} Probes that failed to connect.",
+            f"# TYPE {name} counter",
+        ]
+        for (node, path), count in sorted(latency.errors().items()):
+            iface, kind = path.split(".", 1)
+            lines.append(f"{name}{_labels(node=node, iface=iface, port=kind)} {count}")
+
+        name = f"{_PREFIX}_http_request_duration_seconds"
+        lines += [
+            f"# HELP {name} API request latency (streaming responses excluded).",
+            f"# TYPE {name} histogram",
+        ]
+        for (method, route, code), hist in sorted(self._requests.items()):
+            labels = _labels(method=method, route=route, status=code)
+            _render_histogram(lines, name, labels, hist.counts, hist.total)
+
+        name = f"{_PREFIX}_webhook_updates_total"
+        lines += [
+            f"# HELP {name} Telegram webhook updates by outcome (queued, duplicate,"
+            " dropped, rejected, processed, failed).",
+            f"# TYPE {name} counter",
+        ]
+        for outcome, count in sorted(self._webhook_updates.items()):
+            lines.append(f"{name}{_labels(outcome=outcome)} {count}")
+
+        name = f"{_PREFIX}_webhook_handler_duration_seconds"
+        lines += [
+            f"# HELP {name} Time spent handling one queued webhook update.",
+            f"# TYPE {name} histogram",
+        ]
+        hist = self._webhook_handler
+        _render_histogram(lines, name, "", hist.counts, hist.total)
+
+        name = f"{_PREFIX}_telegram_messages_total"
+        lines += [
+            f"# HELP {name} Outbound bot messages by outcome (sent, merged, dropped,"
+            " retry_after, failed).",
+            f"# TYPE {name} counter",
+        ]
+        for outcome, count in sorted(self._telegram_sends.items()):
+            lines.append(f"{name}{_labels(outcome=outcome)} {count}")
+
+        if webhook_queue_depth is not None:
+            name = f"{_PREFIX}_webhook_queue_depth"
+            lines += [
+                f"# HELP {name} Webhook updates waiting for a worker.",
+                f"# TYPE {name} gauge",
+                f"{name} {webhook_queue_depth}",
+            ]
+
+        return "\n".join(lines) + "\n"
+
+
+def is_metrics_client_allowed(host: str | None, allow: Iterable[str]) -> bool:
+    # Entries are IPs or CIDR networks; an empty list allows everyone.
+    allow = list(allow)
+    if not allow:
+        return True
+    if host is None:
+        return False
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(addr in ipaddress.ip_network(entry, strict=False) for entry in allow)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
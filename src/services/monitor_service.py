@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-import socket
+import asyncio
+import random
 import time
-from typing import Any
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from services.config_service import Node, TFConfig, iter_nodes
+from services.config_service import MonitorSettings, Node, TFConfig, get_inventory
+from services.latency_service import LatencyStats
+from services.ollama_service import (
+    OllamaClientPool,
+    OllamaDetail,
+    ollama_base_url,
+    probe_ollama,
+)
 
 
 class PortStatus(BaseModel):
     ssh: bool
     ollama: bool
+    # Connect latency of this round's probes (None when unreachable).
+    ssh_ms: float | None = None
+    ollama_ms: float | None = None
 
 
 class NodeStatus(BaseModel):
@@ -20,6 +34,18 @@ class NodeStatus(BaseModel):
     fabric_ip: str | None
     mgmt: PortStatus
     fabric: PortStatus
+    # Ollama API detail from the mgmt address (None when API probing is off).
+    ollama: OllamaDetail | None = None
+    # Recent connect-latency percentiles per path ("mgmt.ssh", "fabric.ollama", ...).
+    latency: dict[str, LatencyStats] = Field(default_factory=dict)
+
+    # Node is "up" when any port answers. One-shot probes report the raw
+    # observation; the server's ProbeScheduler applies hysteresis and fills
+    # in since (epoch seconds of the last transition) and the flap count.
+    state: Literal["unknown", "up", "down"] = "unknown"
+    since: float | None = None
+    flaps: int = 0
+    checked_at: float | None = None
 
 
 class ClusterStatus(BaseModel):
@@ -27,12 +53,37 @@ class ClusterStatus(BaseModel):
     nodes: list[NodeStatus]
 
 
-def _tcp_probe(host: str, port: int, timeout_seconds: float) -> bool:
+async def _tcp_probe_async(
+    host: str, port: int, timeout_seconds: float
+) -> float | None:
+    # Returns the connect latency in seconds, or None when unreachable.
+    started = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=timeout_seconds
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    elapsed = time.perf_counter() - started
+    writer.close()
     try:
-        with socket.create_connection((host, port), timeout=timeout_seconds):
-            return True
+        await writer.wait_closed()
     except OSError:
-        return False
+        pass
+    return elapsed
+
+
+def _port_status(
+    results: dict[Hashable, Any], host: str, *, ssh_port: int, ollama_port: int
+) -> PortStatus:
+    ssh = results.get((host, ssh_port))
+    ollama = results.get((host, ollama_port))
+    return PortStatus(
+        ssh=ssh is not None,
+        ollama=ollama is not None,
+        ssh_ms=None if ssh is None else round(ssh * 1000, 3),
+        ollama_ms=None if ollama is None else round(ollama * 1000, 3),
+    )
 
 
 def _node_status(
@@ -41,16 +92,14 @@ def _node_status(
     fabric_ip: str | None,
     ssh_port: int,
     ollama_port: int,
-    timeout_seconds: float,
+    results: dict[Hashable, Any],
 ) -> NodeStatus:
-    mgmt = PortStatus(
-        ssh=_tcp_probe(node.mgmt_ip, ssh_port, timeout_seconds),
-        ollama=_tcp_probe(node.mgmt_ip, ollama_port, timeout_seconds),
+    mgmt = _port_status(
+        results, node.mgmt_ip, ssh_port=ssh_port, ollama_port=ollama_port
     )
     if fabric_ip:
-        fabric = PortStatus(
-            ssh=_tcp_probe(fabric_ip, ssh_port, timeout_seconds),
-            ollama=_tcp_probe(fabric_ip, ollama_port, timeout_seconds),
+        fabric = _port_status(
+            results, fabric_ip, ssh_port=ssh_port, ollama_port=ollama_port
         )
     else:
         fabric = PortStatus(ssh=False, ollama=False)
@@ -64,26 +113,289 @@ def _node_status(
     )
 
 
-def get_cluster_status(inventory: TFConfig) -> ClusterStatus:
-    ssh_port = inventory.settings.monitor.ssh_port
-    ollama_port = inventory.settings.monitor.ollama_port
+async def _run_bounded(
+    jobs: dict[Hashable, Callable[[], Awaitable[Any]]],
+    *,
+    max_concurrency: int,
+    deadline_seconds: float,
+) -> dict[Hashable, Any]:
+    # All probes start at once (bounded by the semaphore) and share one
+    # deadline for the whole round, so a round never outlasts it whatever the
+    # fleet size. Jobs still queued or running at the deadline are cancelled
+    # and left out of the result (callers report them as down).
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _bounded(job: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await job()
+
+    tasks = {key: asyncio.ensure_future(_bounded(job)) for key, job in jobs.items()}
+    if not tasks:
+        return {}
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return {key: task.result() for key, task in tasks.items() if not task.cancelled()}
+
+
+async def get_cluster_status_async(
+    inventory: TFConfig,
+    *,
+    ollama_pool: OllamaClientPool | None = None,
+    only: set[str] | None = None,
+) -> ClusterStatus:
+    """Probe every node (or just the `only` names) and path concurrently.
+
+    Pass a long-lived `ollama_pool` to reuse Ollama HTTP connections across
+    rounds; without one a temporary pool is used and closed.
+    """
+
+    monitor = inventory.settings.monitor
+    ssh_port = monitor.ssh_port
+    ollama_port = monitor.ollama_port
     timeout_seconds = inventory.settings.ssh.connect_timeout_seconds
+    deadline_seconds = monitor.probe_deadline_seconds or (
+        max(
+            timeout_seconds,
+            monitor.ollama_api_timeout_seconds if monitor.ollama_api else 0,
+        )
+        + 1.0
+    )
+
+    index = get_inventory(inventory)
+    nodes = list(index.nodes)
+    if only is not None:
+        nodes = [node for node in nodes if node.name in only]
+
+    # Dedupe (host, port) pairs: the same address may appear on several paths.
+    jobs: dict[Hashable, Callable[[], Awaitable[Any]]] = {}
+    for node in nodes:
+        hosts = [node.mgmt_ip, index.fabric_ip(node.name)]
+        for host in filter(None, hosts):
+            for port in (ssh_port, ollama_port):
+                jobs[(host, port)] = partial(
+                    _tcp_probe_async, host, port, timeout_seconds
+                )
 
-    fabric_addr_by_name: dict[str, str] = {}
-    if inventory.fabricnet is not None:
-        fabric_addr_by_name = {n.name: n.address for n in inventory.fabricnet.nodes}
+    pool = ollama_pool or OllamaClientPool()
+    ollama_urls: dict[str, str] = {}
+    if monitor.ollama_api:
+        for node in nodes:
+            url = ollama_urls[node.name] = ollama_base_url(node.mgmt_ip, ollama_port)
+            jobs[url] = partial(
+                probe_ollama,
+                pool,
+                url,
+                timeout_seconds=monitor.ollama_api_timeout_seconds,
+            )
 
-    nodes = [
-        _node_status(
+    try:
+        results = await _run_bounded(
+            jobs,
+            max_concurrency=monitor.max_concurrent_probes,
+            deadline_seconds=deadline_seconds,
+        )
+    finally:
+        if ollama_pool is None:
+            await pool.aclose()
+        else:
+            await pool.retain(set(ollama_urls.values()))
+
+    checked_at = time.time()
+    statuses = []
+    for node in nodes:
+        status = _node_status(
             node,
-            fabric_ip=fabric_addr_by_name.get(node.name),
+            fabric_ip=index.fabric_ip(node.name),
             ssh_port=ssh_port,
             ollama_port=ollama_port,
-            timeout_seconds=timeout_seconds,
+            results=results,
         )
-        for node in iter_nodes(inventory)
+        url = ollama_urls.get(node.name)
+        if url is not None:
+            status.ollama = results.get(url) or OllamaDetail(
+                ok=False, error="probe deadline exceeded"
+            )
+        status.state = "up" if _observed_up(status) else "down"
+        status.checked_at = checked_at
+        statuses.append(status)
+    return ClusterStatus(ts=checked_at, nodes=statuses)
+
+
+def _observed_up(node: NodeStatus) -> bool:
+    return any((node.mgmt.ssh, node.mgmt.ollama, node.fabric.ssh, node.fabric.ollama))
+
+
+@dataclass
+class _NodeSchedule:
+    next_due: float
+    state: Literal["unknown", "up", "down"] = "unknown"
+    since: float | None = None
+    flaps: int = 0
+    # Consecutive observations disagreeing with `state` (pending transition).
+    streak: int = 0
+    # Consecutive rounds observed down since the state flipped to down.
+    down_rounds: int = 0
+    # Per-port reachability ("mgmt.ssh", ...) after the same hysteresis, and
+    # the pending-flip streak of each.
+    ports: dict[str, bool] = field(default_factory=dict)
+    port_streaks: dict[str, int] = field(default_factory=dict)
+    last: NodeStatus | None = None
+
+
+class ProbeScheduler:
+    """Decides which nodes to probe when, and smooths their up/down state.
+
+    - New nodes are probed right away, then settle on a random phase within
+      the poll interval so probes from the hub do not fire in bursts.
+    - A state flip needs `up_after`/`down_after` agreeing observations; while
+      a flip is pending the node is re-checked after `recheck_seconds`. The
+      per-port ssh/ollama flags are smoothed the same way.
+    - Nodes that stay down back off exponentially up to `backoff_max_seconds`,
+      counting from the round the state flipped.
+    """
+
+    def __init__(self, rng: random.Random | None = None) -> None:
+        self._rng = rng or random.Random()
+        self._nodes: dict[str, _NodeSchedule] = {}
+
+    def due(self, names: Iterable[str], *, now: float) -> set[str]:
+        due: set[str] = set()
+        for name in names:
+            entry = self._nodes.get(name)
+            if entry is None:
+                entry = self._nodes[name] = _NodeSchedule(next_due=now)
+            if entry.next_due <= now:
+                due.add(name)
+        return due
+
+    def next_due(self) -> float | None:
+        return min((e.next_due for e in self._nodes.values()), default=None)
+
+    def last(self, name: str) -> NodeStatus | None:
+        entry = self._nodes.get(name)
+        return entry.last if entry is not None else None
+
+    def retain(self, names: set[str]) -> None:
+        for name in [n for n in self._nodes if n not in names]:
+            del self._nodes[name]
+
+    def _jittered(self, seconds: float, settings: MonitorSettings) -> float:
+        ratio = settings.probe_jitter_ratio
+        return seconds * self._rng.uniform(1 - ratio, 1 + ratio)
+
+    def observe(
+        self, status: NodeStatus, *, now: float, settings: MonitorSettings
+    ) -> None:
+        """Fold one probe result into the node's state; annotates `status`."""
+
+        entry = self._nodes.get(status.name)
+        if entry is None:
+            entry = self._nodes[status.name] = _NodeSchedule(next_due=now)
+        observed = "up" if _observed_up(status) else "down"
+        interval = settings.poll_interval_seconds
+
+        if entry.state == "unknown":
+            entry.state, entry.since = observed, status.checked_at
+            # First sighting: settle on a random phase within the interval.
+            entry.next_due = now + self._rng.uniform(0, interval)
+        elif observed == entry.state:
+            entry.streak = 0
+        else:
+            entry.streak += 1
+            needed = settings.up_after if observed == "up" else settings.down_after
+            if entry.streak >= needed:
+                entry.state, entry.since = observed, status.checked_at
+                entry.flaps += 1
+                entry.streak = 0
+
+        ports_pending = self._smooth_ports(entry, status, settings)
+        if entry.state == "down" and observed == "down":
+            entry.down_rounds += 1
+        else:
+            entry.down_rounds = 0
+        if entry.last is not None:
+            if entry.streak or ports_pending:
+                entry.next_due = now + settings.recheck_seconds
+            elif entry.state == "down":
+                backoff = interval * 2 ** min(entry.down_rounds - 1, 16)
+                entry.next_due = now + self._jittered(
+                    min(backoff, settings.backoff_max_seconds), settings
+                )
+            else:
+                entry.next_due = now + self._jittered(interval, settings)
+
+        status.state, status.since, status.flaps = entry.state, entry.since, entry.flaps
+        entry.last = status
+
+    @staticmethod
+    def _smooth_ports(
+        entry: _NodeSchedule, status: NodeStatus, settings: MonitorSettings
+    ) -> bool:
+        # Rewrites status.mgmt/fabric flags to their smoothed values; True
+        # while any port flip is pending.
+        pending = False
+        for iface in ("mgmt", "fabric"):
+            port = getattr(status, iface)
+            for kind in ("ssh", "ollama"):
+                key, raw = f"{iface}.{kind}", getattr(port, kind)
+                accepted = entry.ports.setdefault(key, raw)
+                streak = 0
+                if raw != accepted:
+                    streak = entry.port_streaks.get(key, 0) + 1
+                    if streak >= (settings.up_after if raw else settings.down_after):
+                        entry.ports[key], streak = raw, 0
+                entry.port_streaks[key] = streak
+                pending = pending or streak > 0
+                setattr(port, kind, entry.ports[key])
+        return pending
+
+
+def _node_signature(node: NodeStatus) -> tuple[Any, ...]:
+    # Fields whose change is worth pushing to live dashboards.
+    ollama = None
+    if node.ollama is not None:
+        ollama = (
+            node.ollama.ok,
+            tuple(node.ollama.models),
+            tuple(m.name for m in node.ollama.loaded),
+        )
+    return (
+        node.mgmt_ip,
+        node.fabric_ip,
+        node.state,
+        (node.mgmt.ssh, node.mgmt.ollama),
+        (node.fabric.ssh, node.fabric.ollama),
+        ollama,
+    )
+
+
+def diff_cluster_status(
+    prev: ClusterStatus, cur: ClusterStatus
+) -> dict[str, Any] | None:
+    """Per-node delta between two snapshots, or None when nothing changed."""
+
+    prev_by_name = {n.name: n for n in prev.nodes}
+    changed = [
+        n.model_dump()
+        for n in cur.nodes
+        if n.name not in prev_by_name
+        or _node_signature(prev_by_name[n.name]) != _node_signature(n)
     ]
-    return ClusterStatus(ts=time.time(), nodes=nodes)
+    cur_names = {n.name for n in cur.nodes}
+    removed = [name for name in prev_by_name if name not in cur_names]
+    if not changed and not removed:
+        return None
+    return {"ts": cur.ts, "nodes": changed, "removed": removed}
+
+
+def get_cluster_status(inventory: TFConfig) -> ClusterStatus:
+    # Sync entry point for the CLI; async callers use get_cluster_status_async.
+    return asyncio.run(get_cluster_status_async(inventory))
 
 
 def cluster_status_as_dict(inventory: TFConfig) -> dict[str, Any]:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    import httpx
+
+# Keep idle connections open well past the poll interval so every round
+# reuses the same socket instead of reconnecting.
+_KEEPALIVE_EXPIRY_SECONDS = 120.0
+
+
+class OllamaLoadedModel(BaseModel):
+    name: str
+    size_vram: int | None = None
+    expires_at: str | None = None
+
+
+class OllamaDetail(BaseModel):
+    ok: bool
+    version: str | None = None
+    # Installed models (/api/tags) and models loaded in memory (/api/ps).
+    models: list[str] = Field(default_factory=list)
+    loaded: list[OllamaLoadedModel] = Field(default_factory=list)
+    error: str | None = None
+
+
+class OllamaClientPool:
+    """One keep-alive HTTP client per Ollama endpoint, reused across rounds.
+
+    Clients are bound to the event loop they first run on; long-lived owners
+    (the server poller) keep one pool, one-shot callers close theirs.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        # httpx is imported on first use: CLI runs with ollama_api disabled
+        # (and everything that only imports the models) skip its import cost.
+        import httpx
+
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                limits=httpx.Limits(
+                    max_connections=1,
+                    max_keepalive_connections=1,
+                    keepalive_expiry=_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                trust_env=False,
+            )
+            self._clients[base_url] = client
+        return client
+
+    async def retain(self, base_urls: set[str]) -> None:
+        # Drop clients for endpoints no longer in the inventory.
+        for base_url in [u for u in self._clients if u not in base_urls]:
+            await self._clients.pop(base_url).aclose()
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+def ollama_base_url(host: str, port: int) -> str:
+    return f"http://{host}:{port}"
+
+
+async def _get_json(client: httpx.AsyncClient, path: str, timeout: float) -> dict:
+    res = await client.get(path, timeout=timeout)
+    res.raise_for_status()
+    data = res.json()
+    return data if isinstance(data, dict) else {}
+
+
+async def probe_ollama(
+    pool: OllamaClientPool, base_url: str, *, timeout_seconds: float
+) -> OllamaDetail:
+    """Query /api/version, /api/tags and /api/ps over the pooled connection.
+
+    `timeout_seconds` bounds the three requests together, so a probe never
+    outlives the probe deadline derived from it.
+    """
+
+    import httpx
+
+    client = pool.client(base_url)
+
+    async def _fetch() -> tuple[dict, dict, dict]:
+        version = await _get_json(client, "/api/version", timeout_seconds)
+        tags = await _get_json(client, "/api/tags", timeout_seconds)
+        ps = await _get_json(client, "/api/ps", timeout_seconds)
+        return version, tags, ps
+
+    try:
+        version, tags, ps = await asyncio.wait_for(_fetch(), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        return OllamaDetail(ok=False, error=f"timed out after {timeout_seconds:g}s")
+    except (httpx.HTTPError, ValueError) as exc:
+        return OllamaDetail(ok=False, error=str(exc) or type(exc).__name__)
+
+    return OllamaDetail(
+        ok=True,
+        version=version.get("version"),
+        models=[m["name"] for m in tags.get("models") or [] if m.get("name")],
+        loaded=[
+            OllamaLoadedModel(
+                name=m["name"],
+                size_vram=m.get("size_vram"),
+                expires_at=m.get("expires_at"),
+            )
+            for m in ps.get("models") or []
+            if m.get("name")
+        ],
+    )
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+
+from services.config_service import TFConfig, get_inventory, load_config
+from services.history_service import StatusHistory, load_history, save_history_bytes
+from services.latency_service import LatencyTracker
+from services.monitor_service import (
+    ClusterStatus,
+    ProbeScheduler,
+    get_cluster_status_async,
+)
+from services.ollama_service import OllamaClientPool
+from services.ratelimit_service import Coalescer
+
+logger = logging.getLogger(__name__)
+
+
+class StatusPoller:
+    """Keeps a shared ClusterStatus snapshot fresh in the background.
+
+    Readers get the latest snapshot immediately; concurrent refresh requests
+    share a single probe round.
+    """
+
+    def __init__(self) -> None:
+        self._status: ClusterStatus | None = None
+        self._version = 0
+        # Snapshot serialized once per version (see status_json()); the epoch
+        # keeps ETags from one process run from matching another's.
+        self._status_json: tuple[int, bytes] | None = None
+        self._epoch = os.urandom(4).hex()
+        self._refresh: Coalescer[ClusterStatus] = Coalescer()
+        self._revalidate: Coalescer[ClusterStatus | None] = Coalescer()
+        self._history_load: Coalescer[StatusHistory] = Coalescer()
+        self._loop_task: asyncio.Task[None] | None = None
+        self._subscribers: set[asyncio.Queue[ClusterStatus]] = set()
+        self._history: StatusHistory | None = None
+        self.latency = LatencyTracker()
+        self.scheduler = ProbeScheduler()
+        self._history_flushed_at = 0.0
+        # Keep-alive Ollama clients, bound to the loop the poller runs on.
+        self._ollama_pool: OllamaClientPool | None = None
+        self._ollama_pool_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def status(self) -> ClusterStatus | None:
+        return self._status
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def etag(self) -> str:
+        # Weak: bodies carry a per-request age_seconds, the snapshot is the same.
+        return f'W/"{self._epoch}-{self._version}"'
+
+    def status_json(self) -> bytes | None:
+        """The current snapshot as JSON, encoded once per version."""
+
+        if self._status is None:
+            return None
+        cached = self._status_json
+        if cached is None or cached[0] != self._version:
+            cached = (self._version, self._status.model_dump_json().encode())
+            self._status_json = cached
+        return cached[1]
+
+    def age_seconds(self) -> float | None:
+        if self._status is None:
+            return None
+        return max(0.0, time.time() - self._status.ts)
+
+    async def history(self, cfg: TFConfig) -> StatusHistory:
+        # Loaded once, in a thread: a saved history can be megabytes.
+        if self._history is None:
+            self._history = await self._history_load.run(
+                "history", lambda: self._load_history(cfg)
+            )
+        return self._history
+
+    async def _load_history(self, cfg: TFConfig) -> StatusHistory:
+        monitor = cfg.settings.monitor
+        if monitor.history_path:
+            try:
+                return await asyncio.to_thread(
+                    load_history,
+                    monitor.history_path,
+                    capacity=monitor.history_capacity,
+                )
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logger.exception("ignoring unreadable status history")
+        return StatusHistory(monitor.history_capacity)
+
+    async def _flush_history(self, cfg: TFConfig, *, force: bool = False) -> None:
+        monitor = cfg.settings.monitor
+        if self._history is None or not monitor.history_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._history_flushed_at < monitor.history_flush_seconds:
+            return
+        self._history_flushed_at = now
+        history = self._history
+
+        def _save() -> None:
+            save_history_bytes(monitor.history_path, history.to_bytes())
+
+        await asyncio.to_thread(_save)
+
+    async def _probe(self, only: set[str] | None = None) -> ClusterStatus:
+        cfg = load_config()
+        monitor = cfg.settings.monitor
+        pool = None
+        if self._ollama_pool_loop is asyncio.get_running_loop():
+            pool = self._ollama_pool
+        probed = await get_cluster_status_async(cfg, ollama_pool=pool, only=only)
+
+        now = time.monotonic()
+        for node in probed.nodes:
+            self.scheduler.observe(node, now=now, settings=monitor)
+        (await self.history(cfg)).record(probed)
+        self.latency.window_seconds = monitor.latency_window_seconds
+        self.latency.observe(probed)
+
+        # Nodes skipped this round (backoff, phase) keep their last result.
+        names = get_inventory(cfg).names()
+        self.scheduler.retain(set(names))
+        self.latency.retain(set(names))
+        nodes = [self.scheduler.last(name) for name in names]
+        status = ClusterStatus(ts=probed.ts, nodes=[n for n in nodes if n is not None])
+
+        self._status = status
+        self._version += 1
+        self._publish(status)
+        return status
+
+    def _publish(self, status: ClusterStatus) -> None:
+        # Latest-wins: a slow subscriber only ever sees the newest snapshot.
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(status)
+
+    def subscribe(self) -> asyncio.Queue[ClusterStatus]:
+        queue: asyncio.Queue[ClusterStatus] = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[ClusterStatus]) -> None:
+        self._subscribers.discard(queue)
+
+    async def refresh(self) -> ClusterStatus:
+        return await self._refresh.run("status", self._probe)
+
+    async def get(
+        self,
+        *,
+        fresh: bool = False,
+        max_age: float | None = None,
+        min_fresh_age: float = 0.0,
+    ) -> ClusterStatus:
+        # A forced refresh of a snapshot younger than `min_fresh_age` gets that
+        # snapshot: clients cannot force probe rounds faster than that.
+        age = self.age_seconds()
+        if fresh and age is not None and age < min_fresh_age:
+            fresh = False
+        if fresh or self._status is None:
+            return await self.refresh()
+
+        if max_age is not None and age is not None and age > max_age:
+            # Stale-while-revalidate: answer now, refresh for the next caller.
+            # Only due nodes are probed, so backed-off nodes stay backed off.
+            self._revalidate.start("due", self._probe_due)
+        return self._status
+
+    async def _probe_due(self) -> ClusterStatus | None:
+        # Probes only the nodes the scheduler says are due (None: none are).
+        names = get_inventory(load_config()).names()
+        due = self.scheduler.due(names, now=time.monotonic())
+        return await self._probe(only=due) if due else None
+
+    async def _run(self) -> None:
+        while True:
+            interval = 5.0
+            try:
+                cfg = load_config()
+                interval = cfg.settings.monitor.poll_interval_seconds
+                await self._probe_due()
+                await self._flush_history(cfg)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("status poll failed")
+            next_due = self.scheduler.next_due()
+            delay = interval if next_due is None else next_due - time.monotonic()
+            await asyncio.sleep(min(max(0.05, delay), interval))
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            loop = asyncio.get_running_loop()
+            self._ollama_pool = OllamaClientPool()
+            self._ollama_pool_loop = loop
+            self._loop_task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = (
+            self._loop_task,
+            *self._refresh.tasks(),
+            *self._revalidate.tasks(),
+            *self._history_load.tasks(),
+        )
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._loop_task = None
+        if self._ollama_pool is not None:
+            await self._ollama_pool.aclose()
+        self._ollama_pool = None
+        self._ollama_pool_loop = None
+        try:
+            await self._flush_history(load_config(), force=True)
+        except Exception:
+            logger.exception("failed to save status history")
+
+
+_poller = StatusPoller()
+
+
+def get_status_poller() -> StatusPoller:
+    return _poller
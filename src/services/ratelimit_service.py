@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets in a fixed amount of memory.
+
+    Buckets live in an LRU ordered dict capped at `max_keys`. Idle buckets are
+    dropped lazily: a bucket that has refilled completely is indistinguishable
+    from a new one, so each check discards such entries from the cold end.
+    Rate and burst are passed per call so config reloads apply immediately.
+    """
+
+    def __init__(self, max_keys: int = 4096) -> None:
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at); most recently used last.
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def check(
+        self,
+        key: Hashable,
+        *,
+        rate: float,
+        burst: int,
+        cost: float = 1.0,
+        now: float | None = None,
+        consume: bool = True,
+    ) -> float:
+        """Take `cost` tokens for `key`; return 0 when allowed, else seconds to wait.
+
+        With consume=False the bucket is only inspected (nothing is taken).
+        """
+
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._evict_idle(rate=rate, burst=burst, now=now)
+
+        tokens, updated = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        if tokens >= cost:
+            if consume:
+                tokens -= cost
+            retry_after = 0.0
+        else:
+            retry_after = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def _evict_idle(self, *, rate: float, burst: int, now: float) -> None:
+        refill_seconds = burst / rate
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < refill_seconds:
+                break
+            del self._buckets[key]
+
+
+class Coalescer(Generic[T]):
+    """Shares one in-flight execution per key among concurrent callers.
+
+    A burst of N identical requests costs one run; once it finishes, the next
+    caller starts a new one (results are not cached).
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task[T]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+
+    def start(
+        self, key: Hashable, factory: Callable[[], Awaitable[T]]
+    ) -> asyncio.Task[T]:
+        # Reuse the running task, unless it belongs to another (closed) loop.
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        return task
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        # shield(): one caller going away must not cancel the shared run.
+        return await asyncio.shield(self.start(key, factory))
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def tasks(self) -> list[asyncio.Task[T]]:
+        return list(self._tasks.values())
+
+
+_limiter = TokenBucketLimiter()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    return _limiter
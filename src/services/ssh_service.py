@@ -1,8 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
 import math
+import os
+import queue
+import re
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
 
 from services.config_service import Node, SSHSettings
 
@@ -14,8 +28,8 @@ class SSHResult:
     stderr: str
 
 
-_last_logged_node_name: str | None = None
-_has_logged_command_in_current_host_block: bool = False
+# Return code reported when a command exceeds its timeout (as coreutils timeout).
+SSH_TIMEOUT_RETURNCODE = 124
 
 
 def _format_remote_command_for_log(remote_command: str) -> str:
@@ -27,28 +41,67 @@ def _format_remote_command_for_log(remote_command: str) -> str:
     return f"{lines[0]} …"
 
 
-def _log_remote_command(*, node_name: str, remote_command: str) -> None:
-    global _has_logged_command_in_current_host_block
-    global _last_logged_node_name
+class SSHConsoleLog:
+    """Prints commands and their output grouped in per-node blocks.
 
-    formatted = _format_remote_command_for_log(remote_command)
-    if not formatted:
-        return
+    Shared by all callers; a lock keeps blocks from concurrent callers intact.
+    """
 
-    if _last_logged_node_name != node_name:
-        if _last_logged_node_name is not None:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._last_node_name: str | None = None
+        self._has_logged_command_in_current_host_block = False
+
+    def command(self, node_name: str, formatted: str) -> None:
+        with self._lock:
+            if self._last_node_name != node_name:
+                if self._last_node_name is not None:
+                    print()
+                print(f"[{node_name}]:")
+                print()
+                self._last_node_name = node_name
+                self._has_logged_command_in_current_host_block = False
+            elif self._has_logged_command_in_current_host_block:
+                # Separate subsequent commands/output within the same host block.
+                print()
+
+            print(f"$ {formatted}")
             print()
-        print(f"[{node_name}]:")
-        print()
-        _last_logged_node_name = node_name
-        _has_logged_command_in_current_host_block = False
-    elif _has_logged_command_in_current_host_block:
-        # Separate subsequent commands/output within the same host block.
-        print()
+            self._has_logged_command_in_current_host_block = True
+
+    def output(self, node_name: str, lines: list[str]) -> None:
+        # No trailing newline here; spacing between sections is handled when
+        # the next command is logged.
+        with self._lock:
+            for line in lines:
+                print(f"  {line}")
+
+    def write_block(self, events: list[tuple[str, str, Any]]) -> None:
+        with self._lock:
+            for kind, node_name, payload in events:
+                getattr(self, kind)(node_name, payload)
+
+
+class SSHOutputBuffer:
+    """Collects one node's log and writes it to the console as one block."""
+
+    def __init__(self, console: SSHConsoleLog) -> None:
+        self._console = console
+        self._events: list[tuple[str, str, Any]] = []
+
+    def command(self, node_name: str, formatted: str) -> None:
+        self._events.append(("command", node_name, formatted))
+
+    def output(self, node_name: str, lines: list[str]) -> None:
+        self._events.append(("output", node_name, lines))
+
+    def flush(self) -> None:
+        events, self._events = self._events, []
+        if events:
+            self._console.write_block(events)
 
-    print(f"$ {formatted}")
-    print()
-    _has_logged_command_in_current_host_block = True
+
+_console = SSHConsoleLog()
 
 
 def _ssh_base_args(settings: SSHSettings) -> list[str]:
@@ -71,6 +124,160 @@ def _ssh_base_args(settings: SSHSettings) -> list[str]:
     return args
 
 
+# Re-verify an existing master at most this often before reusing it.
+_CONTROL_CHECK_INTERVAL_SECONDS = 30.0
+# `ssh -O check|exit` only talks to the local socket; a wedged master must
+# not hold up the command that asked.
+_CONTROL_CMD_TIMEOUT_SECONDS = 2.0
+
+
+class SSHControlPool:
+    """Shared OpenSSH ControlMaster connections, one per user@host target.
+
+    The first command to a target starts a master in the background
+    (ControlMaster=auto); later commands reuse its socket and skip the TCP and
+    key-exchange handshake. OpenSSH closes a master after ControlPersist idle
+    seconds; the pool re-checks live masters periodically, forgets idle ones,
+    and shuts every master down at interpreter exit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._dir: Path | None = None
+        # target -> (last used, last health check), monotonic seconds
+        self._targets: dict[str, tuple[float, float]] = {}
+
+    def _control_dir(self) -> Path:
+        if self._dir is None:
+            # Unix socket paths are limited to ~104 bytes on macOS, so stay
+            # out of the long per-user $TMPDIR.
+            self._dir = Path(tempfile.mkdtemp(prefix="tf-ssh-", dir="/tmp"))
+            atexit.register(self.close_all)
+        return self._dir
+
+    def _control_path(self) -> str:
+        # %C: hash of local host, remote user, host and port.
+        return str(self._control_dir() / "%C")
+
+    def _control_cmd(self, target: str, operation: str) -> list[str]:
+        return ["ssh", "-o", f"ControlPath={self._control_path()}", "-O", operation, target]
+
+    def _reserve(self, target: str, settings: SSHSettings) -> tuple[list[str], bool]:
+        # Control options for `target`, and whether its master is due a check.
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now, settings)
+            entry = self._targets.get(target)
+            needs_check = entry is not None and (
+                now - entry[1] >= _CONTROL_CHECK_INTERVAL_SECONDS
+            )
+            checked_at = entry[1] if entry is not None and not needs_check else now
+            self._targets[target] = (now, checked_at)
+            control_path = self._control_path()
+
+        args = [
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={control_path}",
+            "-o",
+            f"ControlPersist={settings.control_persist_seconds}",
+        ]
+        return args, needs_check
+
+    def _recheck(self, target: str) -> None:
+        if not self.check(target):
+            # Stale or wedged master: drop it so this command starts a new one.
+            self.close(target)
+
+    def args_for(self, target: str, settings: SSHSettings) -> list[str]:
+        args, needs_check = self._reserve(target, settings)
+        if needs_check:
+            self._recheck(target)
+        return args
+
+    async def args_for_async(self, target: str, settings: SSHSettings) -> list[str]:
+        # Same as args_for, with the socket check off the event loop.
+        args, needs_check = self._reserve(target, settings)
+        if needs_check:
+            await asyncio.to_thread(self._recheck, target)
+        return args
+
+    def _evict_idle(self, now: float, settings: SSHSettings) -> None:
+        # OpenSSH already exits masters after ControlPersist; forget them too.
+        for target, (last_used, _) in list(self._targets.items()):
+            if now - last_used > settings.control_persist_seconds:
+                del self._targets[target]
+
+    def _control(self, target: str, operation: str) -> int | None:
+        try:
+            return subprocess.run(
+                self._control_cmd(target, operation),
+                capture_output=True,
+                timeout=_CONTROL_CMD_TIMEOUT_SECONDS,
+            ).returncode
+        except subprocess.TimeoutExpired:
+            return None
+
+    def check(self, target: str) -> bool:
+        return self._control(target, "check") == 0
+
+    def close(self, target: str) -> None:
+        self._control(target, "exit")
+        with self._lock:
+            self._targets.pop(target, None)
+
+    def close_all(self) -> None:
+        with self._lock:
+            targets = list(self._targets)
+        for target in targets:
+            self.close(target)
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
+_control_pool = SSHControlPool()
+
+
+def get_ssh_control_pool() -> SSHControlPool:
+    return _control_pool
+
+
+def _ssh_target(node: Node) -> str:
+    return f"{node.ssh_user}@{node.ssh_host or node.mgmt_ip}"
+
+
+def _build_ssh_command(
+    *,
+    node: Node,
+    settings: SSHSettings,
+    remote_command: str,
+    allocate_tty: bool = False,
+    control_args: list[str] | None = None,
+) -> tuple[str, list[str]]:
+    # `control_args`: multiplexing options already resolved by the caller
+    # (async callers); otherwise they are looked up here.
+    target = _ssh_target(node)
+    cmd = _ssh_base_args(settings)
+    if allocate_tty:
+        # Insert right after the leading `ssh` binary.
+        cmd.insert(1, "-tt")
+    if settings.multiplex:
+        if control_args is None:
+            control_args = _control_pool.args_for(target, settings)
+        cmd += control_args
+    cmd += [target, remote_command]
+    return target, cmd
+
+
+def _as_text(value: str | bytes | None) -> str:
+    # TimeoutExpired carries bytes even when text=True was requested.
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value or ""
+
+
 def run_ssh(
     *,
     node: Node,
@@ -82,48 +289,542 @@ def run_ssh(
     log_output: bool = True,
     allocate_tty: bool = False,
     capture_output: bool = True,
+    timeout_seconds: float | None = None,
+    log: SSHConsoleLog | SSHOutputBuffer | None = None,
 ) -> SSHResult:
-    host = node.ssh_host or node.mgmt_ip
-    target = f"{node.ssh_user}@{host}"
-    cmd = _ssh_base_args(settings)
-    if allocate_tty:
-        # Insert right after the leading `ssh` binary.
-        cmd.insert(1, "-tt")
-    cmd += [target, remote_command]
+    target, cmd = _build_ssh_command(
+        node=node, settings=settings, remote_command=remote_command, allocate_tty=allocate_tty
+    )
 
+    log = log or _console
     if log_command:
-        _log_remote_command(node_name=node.name, remote_command=remote_command)
+        formatted = _format_remote_command_for_log(remote_command)
+        if formatted:
+            log.command(node.name, formatted)
 
-    if capture_output:
-        proc = subprocess.run(cmd, capture_output=True, text=True, input=input_text)
-        result = SSHResult(proc.returncode, proc.stdout, proc.stderr)
-    else:
-        proc = subprocess.run(cmd)
-        result = SSHResult(proc.returncode, "", "")
+    try:
+        if capture_output:
+            proc = subprocess.run(
+                cmd, capture_output=True, text=True, input=input_text, timeout=timeout_seconds
+            )
+            result = SSHResult(proc.returncode, proc.stdout, proc.stderr)
+        else:
+            proc = subprocess.run(cmd, timeout=timeout_seconds)
+            result = SSHResult(proc.returncode, "", "")
+    except subprocess.TimeoutExpired as exc:
+        # subprocess.run() has already killed the local ssh client.
+        result = SSHResult(
+            SSH_TIMEOUT_RETURNCODE,
+            _as_text(exc.stdout),
+            f"timed out after {timeout_seconds}s\n{_as_text(exc.stderr)}".rstrip("\n"),
+        )
 
     if log_output and capture_output:
         stdout_text = (result.stdout or "").rstrip("\n")
         stderr_text = (result.stderr or "").rstrip("\n")
-        if stdout_text:
-            for line in stdout_text.splitlines():
-                print(f"  {line}")
+        lines = stdout_text.splitlines() if stdout_text else []
         if stderr_text:
-            for line in stderr_text.splitlines():
-                print(f"  {line}")
-        # No trailing newline here; spacing between sections is handled when the
-        # next command is logged.
-    if check and proc.returncode != 0:
-        stderr_text = ""
-        if getattr(proc, "stderr", None):
-            stderr_text = str(proc.stderr).strip()
+            lines += stderr_text.splitlines()
+        if lines:
+            log.output(node.name, lines)
+    if check and result.returncode != 0:
+        stderr_text = (result.stderr or "").strip()
         if not stderr_text and not capture_output:
             stderr_text = "(no captured stderr; see command output above)"
         raise RuntimeError(
-            f"SSH failed for {node.name} ({target}): rc={proc.returncode}\n{stderr_text}"
+            f"SSH failed for {node.name} ({target}): rc={result.returncode}\n{stderr_text}"
+        )
+    return result
+
+
+@dataclass(frozen=True)
+class FanoutResult:
+    # Per-node results in input order (any return code), plus nodes that were
+    # never started because a fail-fast run had already failed.
+    results: dict[str, SSHResult]
+    skipped: tuple[str, ...] = ()
+
+    @property
+    def failed(self) -> list[str]:
+        return [name for name, r in self.results.items() if r.returncode != 0]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+
+def run_ssh_fanout(
+    *,
+    nodes: Iterable[Node],
+    settings: SSHSettings,
+    remote_command: str | Mapping[str, str],
+    max_parallel: int | None = None,
+    timeout_seconds: float | None = None,
+    fail_fast: bool = False,
+    input_text: str | None = None,
+    log_command: bool = True,
+    log_output: bool = True,
+) -> FanoutResult:
+    """Run one command (or a per-node-name command map) across nodes in parallel.
+
+    Each node's log is buffered and printed as one block when it finishes, so
+    output never interleaves. Nodes missing from a command map are skipped.
+    With fail_fast, nodes not yet started when one fails are not run.
+    """
+
+    jobs: list[tuple[Node, str]] = []
+    for node in nodes:
+        if isinstance(remote_command, str):
+            jobs.append((node, remote_command))
+        elif node.name in remote_command:
+            jobs.append((node, remote_command[node.name]))
+    if not jobs:
+        return FanoutResult(results={})
+
+    failed = threading.Event()
+
+    def _run_one(node: Node, command: str) -> SSHResult | None:
+        if fail_fast and failed.is_set():
+            return None
+        buffer = SSHOutputBuffer(_console)
+        try:
+            result = run_ssh(
+                node=node,
+                settings=settings,
+                remote_command=command,
+                check=False,
+                input_text=input_text,
+                log_command=log_command,
+                log_output=log_output,
+                timeout_seconds=timeout_seconds,
+                log=buffer,
+            )
+        finally:
+            buffer.flush()
+        if result.returncode != 0:
+            failed.set()
+        return result
+
+    workers = max(1, min(max_parallel or settings.max_parallel, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ssh-fanout") as pool:
+        futures = [(node.name, pool.submit(_run_one, node, cmd)) for node, cmd in jobs]
+
+    results: dict[str, SSHResult] = {}
+    skipped: list[str] = []
+    for name, future in futures:
+        result = future.result()
+        if result is None:
+            skipped.append(name)
+        else:
+            results[name] = result
+    return FanoutResult(results=results, skipped=tuple(skipped))
+
+
+_EOL = re.compile(rb"\r\n|\r|\n")
+
+
+class _LineSplitter:
+    # Incremental splitter for process output. "\r" ends a line too, so
+    # progress bars (ollama pull, brew) show up as they redraw; over-long lines
+    # are cut into max_line chunks instead of buffering without bound.
+
+    def __init__(self, max_line: int = 65536) -> None:
+        self._buf = b""
+        self._max_line = max_line
+
+    def feed(self, data: bytes) -> list[bytes]:
+        buf = self._buf + data
+        lines: list[bytes] = []
+        pos = 0
+        for m in _EOL.finditer(buf):
+            if m.group() == b"\r" and m.end() == len(buf):
+                break  # may be the first half of a "\r\n" split across reads
+            lines.append(buf[pos : m.start()])
+            pos = m.end()
+        buf = buf[pos:]
+        while len(buf) > self._max_line:
+            lines.append(buf[: self._max_line])
+            buf = buf[self._max_line :]
+        self._buf = buf
+        return lines
+
+    def flush(self) -> list[bytes]:
+        rest, self._buf = self._buf.rstrip(b"\r"), b""
+        return [rest] if rest else []
+
+
+@dataclass(frozen=True)
+class SSHLine:
+    node: str
+    stream: Literal["stdout", "stderr"]
+    text: str
+
+
+@dataclass(frozen=True)
+class _StreamDone:
+    node: str
+    result: SSHResult | None
+    error: BaseException | None = None
+
+
+class SSHStream:
+    """Lines from one or more running ssh commands, yielded as they arrive.
+
+    Iterate to consume `SSHLine`s (lines of different nodes interleave, lines
+    of one stream keep their order). Once exhausted, `results` holds each
+    node's SSHResult with only the last `tail_lines` lines of stdout/stderr
+    retained, for error messages. Output is never accumulated beyond that and
+    a slow consumer applies backpressure to the remote commands. Stopping
+    iteration early kills the commands still running.
+    """
+
+    def __init__(
+        self,
+        jobs: list[tuple[Node, list[str]]],
+        *,
+        max_parallel: int,
+        timeout_seconds: float | None = None,
+        input_text: str | None = None,
+        tail_lines: int = 50,
+    ) -> None:
+        self._jobs = jobs
+        self._max_parallel = max(1, min(max_parallel, len(jobs) or 1))
+        self._timeout_seconds = timeout_seconds
+        self._input_text = input_text
+        self._tail_lines = tail_lines
+        self._queue: queue.Queue[SSHLine | _StreamDone] = queue.Queue(maxsize=1024)
+        self._closed = threading.Event()
+        self._procs: set[subprocess.Popen[bytes]] = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self.results: dict[str, SSHResult] = {}
+
+    def _put(self, item: SSHLine | _StreamDone) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_guarded(self, node: Node, cmd: list[str]) -> None:
+        try:
+            self._run_one(node, cmd)
+        except BaseException as exc:
+            # e.g. ssh binary missing; re-raised in the consuming thread.
+            self._put(_StreamDone(node.name, None, exc))
+
+    def _run_one(self, node: Node, cmd: list[str]) -> None:
+        if self._closed.is_set():
+            return
+        tails: dict[str, deque[str]] = {
+            "stdout": deque(maxlen=self._tail_lines),
+            "stderr": deque(maxlen=self._tail_lines),
+        }
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if self._input_text is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        with self._lock:
+            # The consumer may have stopped (and killed _procs) while this
+            # Popen ran; it sets _closed before taking the lock.
+            cancelled = self._closed.is_set()
+            if not cancelled:
+                self._procs.add(proc)
+        if cancelled:
+            proc.kill()
+            proc.communicate()
+            return
+        timed_out = threading.Event()
+
+        def _expire() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = None
+        if self._timeout_seconds is not None:
+            timer = threading.Timer(self._timeout_seconds, _expire)
+            timer.daemon = True
+            timer.start()
+
+        def _pump(pipe: Any, name: Literal["stdout", "stderr"]) -> None:
+            splitter = _LineSplitter()
+            fd = pipe.fileno()
+            while chunk := os.read(fd, 65536):
+                for raw in splitter.feed(chunk):
+                    text = raw.decode("utf-8", errors="replace")
+                    tails[name].append(text)
+                    if not self._put(SSHLine(node.name, name, text)):
+                        proc.kill()
+            for raw in splitter.flush():
+                text = raw.decode("utf-8", errors="replace")
+                tails[name].append(text)
+                self._put(SSHLine(node.name, name, text))
+
+        try:
+            if self._input_text is not None and proc.stdin is not None:
+                try:
+                    proc.stdin.write(self._input_text.encode("utf-8"))
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            stderr_thread = threading.Thread(
+                target=_pump, args=(proc.stderr, "stderr"), daemon=True
+            )
+            stderr_thread.start()
+            _pump(proc.stdout, "stdout")
+            stderr_thread.join()
+            returncode = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            for pipe in (proc.stdout, proc.stderr):
+                if pipe is not None:
+                    pipe.close()
+            with self._lock:
+                self._procs.discard(proc)
+
+        stderr_lines = list(tails["stderr"])
+        if timed_out.is_set():
+            returncode = SSH_TIMEOUT_RETURNCODE
+            stderr_lines.append(f"timed out after {self._timeout_seconds}s")
+        stdout_text = "".join(line + "\n" for line in tails["stdout"])
+        stderr_text = "".join(line + "\n" for line in stderr_lines)
+        self._put(_StreamDone(node.name, SSHResult(returncode, stdout_text, stderr_text)))
+
+    def __iter__(self) -> Iterator[SSHLine]:
+        if self._started:
+            raise RuntimeError("SSHStream can only be iterated once")
+        self._started = True
+        pool = ThreadPoolExecutor(max_workers=self._max_parallel, thread_name_prefix="ssh-stream")
+        futures = [pool.submit(self._run_guarded, node, cmd) for node, cmd in self._jobs]
+        results: dict[str, SSHResult] = {}
+        try:
+            remaining = len(futures)
+            while remaining:
+                item = self._queue.get()
+                if isinstance(item, _StreamDone):
+                    if item.error is not None:
+                        raise item.error
+                    if item.result is not None:
+                        results[item.node] = item.result
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            self._closed.set()
+            with self._lock:
+                for proc in self._procs:
+                    proc.kill()
+            pool.shutdown(wait=True, cancel_futures=True)
+            # Input order, like run_ssh_fanout.
+            self.results = {
+                node.name: results[node.name] for node, _ in self._jobs if node.name in results
+            }
+
+
+def stream_ssh(
+    *,
+    node: Node,
+    settings: SSHSettings,
+    remote_command: str,
+    input_text: str | None = None,
+    timeout_seconds: float | None = None,
+    tail_lines: int = 50,
+) -> SSHStream:
+    """Run one remote command and stream its output lines (see SSHStream).
+
+    For long-running commands (ollama pull, brew upgrade) where run_ssh would
+    show nothing until exit and hold all output in memory.
+    """
+
+    return stream_ssh_fanout(
+        nodes=[node],
+        settings=settings,
+        remote_command=remote_command,
+        input_text=input_text,
+        timeout_seconds=timeout_seconds,
+        tail_lines=tail_lines,
+    )
+
+
+def stream_ssh_fanout(
+    *,
+    nodes: Iterable[Node],
+    settings: SSHSettings,
+    remote_command: str | Mapping[str, str],
+    max_parallel: int | None = None,
+    input_text: str | None = None,
+    timeout_seconds: float | None = None,
+    tail_lines: int = 50,
+) -> SSHStream:
+    # Same command selection as run_ssh_fanout; lines of all nodes are
+    # multiplexed into one stream tagged with the node name.
+    jobs: list[tuple[Node, list[str]]] = []
+    for node in nodes:
+        if isinstance(remote_command, str):
+            command = remote_command
+        elif node.name in remote_command:
+            command = remote_command[node.name]
+        else:
+            continue
+        _, cmd = _build_ssh_command(node=node, settings=settings, remote_command=command)
+        jobs.append((node, cmd))
+    return SSHStream(
+        jobs,
+        max_parallel=max_parallel or settings.max_parallel,
+        timeout_seconds=timeout_seconds,
+        input_text=input_text,
+        tail_lines=tail_lines,
+    )
+
+
+async def _pump_stream(
+    stream: asyncio.StreamReader,
+    *,
+    name: str,
+    chunks: list[bytes],
+    on_output: Callable[[str, str], None] | None,
+) -> None:
+    # Read in chunks (no line-length limit) and hand complete lines to the
+    # callback as they arrive.
+    splitter = _LineSplitter()
+    while chunk := await stream.read(65536):
+        chunks.append(chunk)
+        if on_output is not None:
+            for line in splitter.feed(chunk):
+                on_output(name, line.decode("utf-8", errors="replace"))
+    if on_output is not None:
+        for line in splitter.flush():
+            on_output(name, line.decode("utf-8", errors="replace"))
+
+
+async def _kill_process(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+
+async def run_ssh_async(
+    *,
+    node: Node,
+    settings: SSHSettings,
+    remote_command: str,
+    check: bool = True,
+    input_text: str | None = None,
+    timeout_seconds: float | None = None,
+    on_output: Callable[[str, str], None] | None = None,
+    log: SSHConsoleLog | SSHOutputBuffer | None = None,
+) -> SSHResult:
+    """Async counterpart of run_ssh for event-loop callers (web app, bot).
+
+    - `on_output(stream, line)` receives stdout/stderr lines as they arrive.
+    - `timeout_seconds` is a deadline for the whole command; on expiry the
+      local ssh client is killed and rc 124 is returned (or raised on check).
+    - Cancelling the awaiting task kills the ssh client too.
+    - Nothing is printed unless a `log` sink is passed.
+    """
+
+    control_args: list[str] = []
+    if settings.multiplex:
+        control_args = await _control_pool.args_for_async(_ssh_target(node), settings)
+    target, cmd = _build_ssh_command(
+        node=node, settings=settings, remote_command=remote_command, control_args=control_args
+    )
+    if log is not None:
+        formatted = _format_remote_command_for_log(remote_command)
+        if formatted:
+            log.command(node.name, formatted)
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if input_text is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout_chunks: list[bytes] = []
+    stderr_chunks: list[bytes] = []
+
+    async def _feed_stdin() -> None:
+        if input_text is None or proc.stdin is None:
+            return
+        try:
+            proc.stdin.write(input_text.encode("utf-8"))
+            await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            proc.stdin.close()
+
+    async def _communicate() -> int:
+        await asyncio.gather(
+            _feed_stdin(),
+            _pump_stream(proc.stdout, name="stdout", chunks=stdout_chunks, on_output=on_output),
+            _pump_stream(proc.stderr, name="stderr", chunks=stderr_chunks, on_output=on_output),
+        )
+        return await proc.wait()
+
+    timed_out = False
+    try:
+        returncode = await asyncio.wait_for(_communicate(), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await _kill_process(proc)
+        returncode = SSH_TIMEOUT_RETURNCODE
+    except asyncio.CancelledError:
+        await asyncio.shield(_kill_process(proc))
+        raise
+
+    stdout_text = b"".join(stdout_chunks).decode("utf-8", errors="replace")
+    stderr_text = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+    if timed_out:
+        stderr_text = f"timed out after {timeout_seconds}s\n{stderr_text}".rstrip("\n")
+    result = SSHResult(returncode, stdout_text, stderr_text)
+
+    if log is not None:
+        lines = (stdout_text.rstrip("\n") + "\n" + stderr_text.rstrip("\n")).strip("\n")
+        if lines:
+            log.output(node.name, lines.splitlines())
+    if check and result.returncode != 0:
+        raise RuntimeError(
+            f"SSH failed for {node.name} ({target}): rc={result.returncode}\n"
+            f"{result.stderr.strip()}"
         )
     return result
 
 
+async def run_ssh_sudo_async(
+    *,
+    node: Node,
+    settings: SSHSettings,
+    remote_command: str,
+    check: bool = True,
+    sudo_password: str | None = None,
+    timeout_seconds: float | None = None,
+    on_output: Callable[[str, str], None] | None = None,
+) -> SSHResult:
+    # Same sudo modes as run_ssh_sudo minus `interactive` (no TTY here).
+    if sudo_password is None:
+        command, input_text = f"sudo -n {remote_command}", None
+    else:
+        command, input_text = f"sudo -S -p '' {remote_command}", f"{sudo_password}\n"
+    return await run_ssh_async(
+        node=node,
+        settings=settings,
+        remote_command=command,
+        check=check,
+        input_text=input_text,
+        timeout_seconds=timeout_seconds,
+        on_output=on_output,
+    )
+
+
 def run_ssh_sudo(
     *,
     node: Node,
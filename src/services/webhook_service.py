@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
+
+from services.metrics_service import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+SubmitOutcome = Literal["queued", "duplicate", "dropped", "rejected"]
+
+
+class UpdateQueue:
+    """Bounded ingestion queue for Telegram webhook updates.
+
+    The webhook only validates and submits; a fixed pool of workers runs the
+    handler. Updates are sharded by key (the chat id), so one chat's updates
+    are always handled by the same worker, in arrival order. Recently seen
+    update_ids are remembered to drop Telegram's redeliveries. When the
+    worker's shard is full the update is either dropped (Telegram sees 200)
+    or rejected (the webhook answers 503 and Telegram retries later).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        *,
+        workers: int = 4,
+        max_pending: int = 1000,
+        dedup_window: int = 10000,
+        overload: Literal["drop", "reject"] = "reject",
+    ) -> None:
+        self._handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.dedup_window = dedup_window
+        self.overload = overload
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._shards: list[asyncio.Queue[Any]] = []
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def depth(self) -> int:
+        return sum(shard.qsize() for shard in self._shards)
+
+    def start(self) -> None:
+        # Bind the workers to the running loop (again, if it changed).
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._tasks[0].get_loop() is loop:
+            return
+        per_shard = self.max_pending // self.workers
+        self._shards = [asyncio.Queue(maxsize=per_shard) for _ in range(self.workers)]
+        self._tasks = [
+            loop.create_task(self._work(shard), name=f"webhook-worker-{i}")
+            for i, shard in enumerate(self._shards)
+        ]
+
+    def submit(
+        self, update_id: int | None, key: int | None, update: Any
+    ) -> SubmitOutcome:
+        self.start()
+        if update_id is not None and update_id in self._seen:
+            return self._count("duplicate")
+        shard_key = key if key is not None else update_id
+        shard = self._shards[hash(shard_key) % self.workers]
+        if shard.full():
+            return self._count("dropped" if self.overload == "drop" else "rejected")
+        if update_id is not None:
+            # Only remember accepted updates: a rejected one must be retryable.
+            self._seen[update_id] = None
+            while len(self._seen) > self.dedup_window:
+                self._seen.popitem(last=False)
+        shard.put_nowait(update)
+        return self._count("queued")
+
+    async def join(self) -> None:
+        for shard in self._shards:
+            await shard.join()
+
+    async def stop(self, *, drain_seconds: float = 5.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout=drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("dropping %d queued webhook updates on shutdown", self.depth)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._shards = []
+
+    async def _work(self, shard: asyncio.Queue[Any]) -> None:
+        metrics = get_metrics_registry()
+        while True:
+            update = await shard.get()
+            started = time.perf_counter()
+            try:
+                await self._handler(update)
+                outcome = "processed"
+            except Exception:
+                logger.exception("webhook update handler failed")
+                outcome = "failed"
+            finally:
+                shard.task_done()
+            metrics.observe_webhook_handler(time.perf_counter() - started)
+            metrics.inc_webhook_updates(outcome)
+
+    @staticmethod
+    def _count(outcome: SubmitOutcome) -> SubmitOutcome:
+        get_metrics_registry().inc_webhook_updates(outcome)
+        return outcome
@@ -1,5 +1,7 @@
 async function loadTranslations() {
-  const res = await fetch('/mini-app/translations.json');
+  // The server pins the URL to the file's content hash in index.html.
+  const url = document.documentElement.dataset.translations || '/mini-app/translations.json';
+  const res = await fetch(url);
   if (!res.ok) return {};
   return await res.json();
 }
@@ -22,12 +24,12 @@ function getInitData() {
   return '';
 }
 
-async function postJson(url, initData) {
+async function postJson(url, authorization) {
   const res = await fetch(url, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
-      'Authorization': 'tma ' + initData,
+      'Authorization': authorization,
     },
     body: JSON.stringify({}),
   });
@@ -43,6 +45,89 @@ async function postJson(url, initData) {
   return data;
 }
 
+// initData is exchanged once for a short-lived Bearer token; renewed shortly
+// before it expires or after the server rejects it.
+let session = null;
+
+async function getSessionToken(initData) {
+  if (session && session.expires_at - 60 > Date.now() / 1000) return session.token;
+  session = await postJson('/api/mini-app/session', 'tma ' + initData);
+  return session.token;
+}
+
+function portCell(port) {
+  if (!port) return '—';
+  return (port.ssh ? '✅' : '❌') + ' / ' + (port.ollama ? '✅' : '❌');
+}
+
+function ollamaCell(ollama) {
+  if (!ollama) return '—';
+  if (!ollama.ok) return '⚠️ ' + (ollama.error || '');
+  const loaded = (ollama.loaded || []).map((m) => m.name);
+  return loaded.length ? loaded.join(', ') : '∅';
+}
+
+function renderNode(tbody, node) {
+  let row = tbody.querySelector('tr[data-node="' + CSS.escape(node.name) + '"]');
+  if (!row) {
+    row = document.createElement('tr');
+    row.dataset.node = node.name;
+    for (let i = 0; i < 4; i++) row.appendChild(document.createElement('td'));
+    tbody.appendChild(row);
+  }
+  const cells = row.children;
+  cells[0].textContent = (node.state === 'up' ? '🟢 ' : node.state === 'down' ? '🔴 ' : '⚪ ') + node.name;
+  cells[0].title = node.since ? new Date(node.since * 1000).toLocaleString() + ' · flaps: ' + node.flaps : '';
+  cells[1].textContent = portCell(node.mgmt);
+  cells[2].textContent = node.fabric_ip ? portCell(node.fabric) : '—';
+  cells[3].textContent = ollamaCell(node.ollama);
+}
+
+function applyStatus(event, data) {
+  const table = document.getElementById('nodes');
+  const tbody = table.querySelector('tbody');
+  if (event === 'snapshot') tbody.textContent = '';
+  for (const node of data.nodes || []) renderNode(tbody, node);
+  for (const name of data.removed || []) {
+    const row = tbody.querySelector('tr[data-node="' + CSS.escape(name) + '"]');
+    if (row) row.remove();
+  }
+  table.hidden = false;
+  document.getElementById('updated').textContent = new Date(data.ts * 1000).toLocaleTimeString();
+}
+
+// Server-Sent Events over fetch (EventSource cannot send the Authorization header).
+async function streamStatus(initData, onEvent) {
+  const token = await getSessionToken(initData);
+  const res = await fetch('/api/mini-app/status/stream', {
+    method: 'POST',
+    headers: { 'Accept': 'text/event-stream', 'Authorization': 'Bearer ' + token },
+  });
+  if (res.status === 401) session = null;
+  if (!res.ok || !res.body) throw new Error(res.status + ' ' + res.statusText);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buf += decoder.decode(value, { stream: true });
+    let idx;
+    while ((idx = buf.indexOf('\n\n')) !== -1) {
+      const frame = buf.slice(0, idx);
+      buf = buf.slice(idx + 2);
+      let event = 'message';
+      const data = [];
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')));
+    }
+  }
+}
+
 (async () => {
   const out = document.getElementById('out');
   const tr = await loadTranslations();
@@ -55,10 +140,20 @@ async function postJson(url, initData) {
   }
 
   try {
-    const me = await postJson('/api/mini-app/me', initData);
-    const status = await postJson('/api/mini-app/status', initData);
-    out.textContent = JSON.stringify({ me, status }, null, 2);
+    await getSessionToken(initData);
+    out.textContent = JSON.stringify({ me: { user: session.user } }, null, 2);
   } catch (e) {
     out.textContent = String(e && e.message ? e.message : e);
+    return;
+  }
+
+  for (;;) {
+    try {
+      await streamStatus(initData, applyStatus);
+    } catch (e) {
+      out.textContent = String(e && e.message ? e.message : e);
+    }
+    // Stream ended (server restart, network change): reconnect shortly.
+    await new Promise((resolve) => setTimeout(resolve, 3000));
   }
 })();
@@ -2,14 +2,90 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
+from typing import TYPE_CHECKING
 
-from services.config_service import load_config
-from services.monitor_service import cluster_status_as_dict
+# Keep module-level imports to the stdlib: each subcommand imports only what
+# it needs, so `--help` and scripted calls do not pay for pydantic, asyncio,
+# httpx or the web stack (see scripts/bench_startup.py).
+if TYPE_CHECKING:
+    from services.config_service import TFConfig
+    from services.monitor_service import ClusterStatus
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _parse_duration(text: str) -> float:
+    # "90", "90s", "30m", "24h", "7d" -> seconds
+    text = text.strip().lower()
+    unit = _DURATION_UNITS.get(text[-1:])
+    if unit is None:
+        return float(text)
+    return float(text[:-1]) * unit
+
+
+async def _sample_status(
+    cfg: TFConfig, *, samples: int, interval: float
+) -> ClusterStatus:
+    import asyncio
+
+    from services.latency_service import LatencyTracker
+    from services.monitor_service import get_cluster_status_async
+    from services.ollama_service import OllamaClientPool
+
+    # Several rounds feed the latency percentiles; the last snapshot is shown.
+    tracker = LatencyTracker()
+    pool = OllamaClientPool()
+    try:
+        for i in range(max(1, samples)):
+            if i:
+                await asyncio.sleep(interval)
+            status = await get_cluster_status_async(cfg, ollama_pool=pool)
+            tracker.observe(status)
+    finally:
+        await pool.aclose()
+    return status
 
 
 def _cmd_status(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from services.config_service import load_config
+
+    cfg = load_config(args.config)
+    status = asyncio.run(
+        _sample_status(cfg, samples=args.samples, interval=args.interval)
+    )
+    print(json.dumps(status.model_dump(), indent=2, sort_keys=True))
+    return 0
+
+
+def _cmd_history(args: argparse.Namespace) -> int:
+    from services.config_service import load_config
+    from services.history_service import load_history
+
     cfg = load_config(args.config)
-    print(json.dumps(cluster_status_as_dict(cfg), indent=2, sort_keys=True))
+    path = cfg.settings.monitor.history_path
+    if not path:
+        print("[error] settings.monitor.history_path is not set")
+        return 2
+    try:
+        history = load_history(path)
+    except FileNotFoundError:
+        print(
+            f"[error] no status history at {path} (is `thunder-forge serve` running?)"
+        )
+        return 2
+
+    until = time.time()
+    result = history.query(
+        since=until - _parse_duration(args.since),
+        until=until,
+        buckets=args.buckets,
+        node=args.node,
+        iface=args.iface,
+    )
+    print(json.dumps(result, indent=2, sort_keys=True))
     return 0
 
 
@@ -30,8 +106,33 @@ def main() -> None:
         default=None,
         help="Config path (default: TF_CONFIG_PATH or tf.yml)",
     )
+    p_status.add_argument(
+        "--samples",
+        type=int,
+        default=1,
+        help="Probe rounds to take for latency percentiles (default: 1)",
+    )
+    p_status.add_argument(
+        "--interval", type=float, default=1.0, help="Seconds between rounds"
+    )
     p_status.set_defaults(func=_cmd_status)
 
+    p_history = sub.add_parser(
+        "history", help="Print downsampled reachability history (saved by serve)"
+    )
+    p_history.add_argument(
+        "--config",
+        default=None,
+        help="Config path (default: TF_CONFIG_PATH or tf.yml)",
+    )
+    p_history.add_argument("--node", default=None, help="Only this node name")
+    p_history.add_argument("--iface", choices=["mgmt", "fabric"], default=None)
+    p_history.add_argument(
+        "--since", default="1h", help="Window length, e.g. 90s, 30m, 24h, 7d"
+    )
+    p_history.add_argument("--buckets", type=int, default=60)
+    p_history.set_defaults(func=_cmd_history)
+
     p_serve = sub.add_parser("serve", help="Start FastAPI server")
     p_serve.set_defaults(func=_cmd_serve)
 
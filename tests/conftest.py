@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_home(monkeypatch: pytest.MonkeyPatch, tmp_path_factory):
+    # Keep the compiled-config cache (config_service) out of the real ~/.cache.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.webhook import app
+from services.config_service import load_config
+
+
+def _write_config(tmp_path: Path, *, allow_ips: list[str]) -> str:
+    path = tmp_path / "tf.yml"
+    lines = [
+        "server:",
+        "  metrics_allow_ips: [" + ", ".join(allow_ips) + "]",
+        "telegram:",
+        "  bot_token: test-token",
+        "nodes:",
+        "  items: []",
+        "",
+    ]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture()
+def client():
+    return TestClient(app)
+
+
+def test_metrics_renders_prometheus_text(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, client: TestClient
+):
+    monkeypatch.setenv("TF_CONFIG_PATH", _write_config(tmp_path, allow_ips=[]))
+    load_config.cache_clear()
+
+    client.get("/health")
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "# TYPE thunder_forge_probe_latency_seconds histogram" in res.text
+    assert (
+        'thunder_forge_http_request_duration_seconds_count{method="GET",'
+        'route="/health",status="200"}'
+    ) in res.text
+
+
+def test_metrics_respects_allow_list(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, client: TestClient
+):
+    monkeypatch.setenv(
+        "TF_CONFIG_PATH", _write_config(tmp_path, allow_ips=["10.0.0.0/8"])
+    )
+    load_config.cache_clear()
+
+    assert client.get("/metrics").status_code == 403
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.webhook import app
+from services import auth_service, config_service, ratelimit_service
+from services.config_service import load_config
+from services.ratelimit_service import TokenBucketLimiter
+
+
+def _make_init_data(*, bot_token: str, user_id: int) -> str:
+    data = {
+        "auth_date": str(int(time.time())),
+        "user": json.dumps({"id": user_id, "username": "admin"}, separators=(",", ":")),
+    }
+    data_check_string = "\n".join(f"{k}={data[k]}" for k in sorted(data.keys()))
+    secret_key = hmac.new(
+        b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256
+    ).digest()
+    data["hash"] = hmac.new(
+        secret_key, data_check_string.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return urlencode(data)
+
+
+def _write_config(path: Path, *, admins: list[int], ttl: int = 3600) -> None:
+    path.write_text(
+        "\n".join(
+            [
+                "telegram:",
+                "  bot_token: test-token",
+                "access:",
+                f"  admin_telegram_ids: {admins}",
+                f"session_ttl_seconds: {ttl}",
+                "nodes:",
+                "  items: []",
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture()
+def cfg_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    path = tmp_path / "tf.yml"
+    _write_config(path, admins=[123])
+    monkeypatch.setenv("TF_CONFIG_PATH", str(path))
+    monkeypatch.setattr(config_service, "_RELOAD_CHECK_SECONDS", 0.0)
+    load_config.cache_clear()
+    return path
+
+
+def test_session_token_replaces_init_data(cfg_path: Path):
+    client = TestClient(app)
+    init_data = _make_init_data(bot_token="test-token", user_id=123)
+
+    res = client.post(
+        "/api/mini-app/session", headers={"Authorization": "tma " + init_data}
+    )
+    assert res.status_code == 200
+    session = res.json()
+    assert session["token_type"] == "Bearer"
+    assert session["user"]["id"] == 123
+    assert session["expires_at"] > time.time()
+
+    bearer = {"Authorization": "Bearer " + session["token"]}
+    # A body that is not JSON proves the Bearer path never reads it.
+    res = client.post("/api/mini-app/me", headers=bearer, content=b"\xff")
+    assert res.status_code == 200
+    assert res.json()["user"]["id"] == 123
+
+    tampered = session["token"].replace(".123.", ".124.")
+    res = client.post(
+        "/api/mini-app/me", headers={"Authorization": "Bearer " + tampered}
+    )
+    assert res.status_code == 401
+
+    # Dropping the admin on config reload revokes the session.
+    _write_config(cfg_path, admins=[999])
+    assert client.post("/api/mini-app/me", headers=bearer).status_code == 403
+
+
+def test_session_token_expires(cfg_path: Path):
+    token, _ = auth_service.issue_session_token(
+        user_id=123,
+        is_admin=True,
+        bot_token="test-token",
+        ttl_seconds=60,
+        now=int(time.time()) - 120,
+    )
+
+    res = TestClient(app).post(
+        "/api/mini-app/me", headers={"Authorization": "Bearer " + token}
+    )
+    assert res.status_code == 401
+    assert res.json()["detail"] == "Session token expired"
+
+
+def test_rate_limit_per_user(cfg_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ratelimit_service, "_limiter", TokenBucketLimiter())
+    _write_config(cfg_path, admins=[123, 456])
+    cfg_path.write_text(
+        cfg_path.read_text(encoding="utf-8")
+        + "server:\n  api_rate_per_second: 0.5\n  api_rate_burst: 2\n",
+        encoding="utf-8",
+    )
+    client = TestClient(app)
+
+    def me(user_id: int):
+        init_data = _make_init_data(bot_token="test-token", user_id=user_id)
+        return client.post(
+            "/api/mini-app/me", headers={"Authorization": "tma " + init_data}
+        )
+
+    assert [me(123).status_code for _ in range(2)] == [200, 200]
+    res = me(123)
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "2"
+    # Buckets are per user.
+    assert me(456).status_code == 200
@@ -11,7 +11,9 @@ import pytest
 from fastapi.testclient import TestClient
 
 from api.webhook import app
+from services import poller_service
 from services.config_service import load_config
+from services.monitor_service import ClusterStatus
 
 
 def _make_init_data(*, bot_token: str, user_id: int) -> str:
@@ -58,6 +60,7 @@ settings:
   monitor:
     ssh_port: 22
     ollama_port: 11434
+    history_path: null
   hosts_sync:
     managed_block_start: '# BEGIN thunder-forge'
     managed_block_end: '# END thunder-forge'
@@ -97,3 +100,44 @@ fabricnet:
     assert body["nodes"][0]["name"] == "node1"
     assert "mgmt" in body["nodes"][0]
     assert "fabric" in body["nodes"][0]
+
+    # Same snapshot: the client's cached copy is still valid.
+    etag = res.headers["ETag"]
+    assert etag.startswith('W/"')
+    res = client.get(
+        "/api/mini-app/status",
+        headers={"Authorization": "tma " + init_data, "If-None-Match": etag},
+    )
+    assert res.status_code == 304
+    assert res.content == b""
+
+
+def test_back_to_back_fresh_requests_probe_once(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, client: TestClient
+):
+    cfg = tmp_path / "tf.yml"
+    cfg.write_text(
+        "telegram:\n  bot_token: test-token\n"
+        "access:\n  admin_telegram_ids: [123]\n"
+        "settings:\n  monitor:\n    history_path: null\n"
+        "nodes:\n  items: []\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("TF_CONFIG_PATH", str(cfg))
+    load_config.cache_clear()
+    monkeypatch.setattr(poller_service, "_poller", poller_service.StatusPoller())
+    rounds: list[float] = []
+
+    async def fake_status(_cfg, **_kwargs) -> ClusterStatus:
+        rounds.append(time.time())
+        return ClusterStatus(ts=time.time(), nodes=[])
+
+    monkeypatch.setattr(poller_service, "get_cluster_status_async", fake_status)
+
+    init_data = _make_init_data(bot_token="test-token", user_id=123)
+    headers = {"Authorization": "tma " + init_data}
+    for _ in range(2):
+        res = client.post("/api/mini-app/status?fresh=1", headers=headers)
+        assert res.status_code == 200
+
+    assert len(rounds) == 1
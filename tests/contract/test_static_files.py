@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import re
+
+from fastapi.testclient import TestClient
+
+from api.webhook import app
+
+
+def test_mini_app_assets_are_pinned_compressed_and_cacheable():
+    client = TestClient(app)
+
+    index = client.get("/mini-app/", headers={"Accept-Encoding": "gzip"})
+    assert index.status_code == 200
+    assert index.headers["Content-Encoding"] == "gzip"
+    assert index.headers["Cache-Control"] == "no-cache"
+    assert "Accept-Encoding" in index.headers["Vary"]
+    pinned = re.search(r'src="(/mini-app/app\.js\?v=[0-9a-f]{16})"', index.text)
+    assert pinned is not None
+    assert re.search(r'data-translations="/mini-app/translations\.json\?v=', index.text)
+
+    res = client.get(pinned.group(1), headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert res.headers["Content-Type"].startswith("text/javascript")
+    # Precompressed on the wire, same bytes once decoded.
+    assert int(res.headers["Content-Length"]) < len(res.content)
+
+    raw = client.get("/mini-app/app.js", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in raw.headers
+    assert raw.headers["Cache-Control"] == "no-cache"
+    assert res.content == raw.content
+
+    # Revalidation of an unchanged file is a body-less 304.
+    res = client.get(
+        "/mini-app/app.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": res.headers["ETag"]},
+    )
+    assert res.status_code == 304
+    assert res.content == b""
+    assert client.get("/mini-app/missing.js").status_code == 404
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import webhook
+from api.webhook import app
+from services.config_service import load_config
+
+
+class _FakeBotApp:
+    bot = None
+
+    def __init__(self) -> None:
+        self.handled: list[int] = []
+        self.gate = asyncio.Event()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def process_update(self, update) -> None:
+        await self.gate.wait()
+        self.handled.append(update.update_id)
+
+
+def _update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": "/help",
+        },
+    }
+
+
+@pytest.fixture()
+def bot_app(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    cfg = tmp_path / "tf.yml"
+    cfg.write_text(
+        "server:\n  metrics_allow_ips: []\n  webhook_workers: 1\n  webhook_max_pending: 2\n"
+        "telegram:\n  bot_token: t\nnodes:\n  items: []\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("TF_CONFIG_PATH", str(cfg))
+    load_config.cache_clear()
+    # Registered first so teardown restores the uninitialized state.
+    monkeypatch.setattr(webhook, "_bot_app", None)
+    monkeypatch.setattr(webhook, "_bot_ready", False)
+    monkeypatch.setattr(webhook, "_update_queue", None)
+    monkeypatch.setattr(webhook, "_outbox", None)
+    fake = _FakeBotApp()
+    webhook.setup_bot_app(fake)
+    return fake
+
+
+def test_webhook_acknowledges_before_handling(bot_app: _FakeBotApp):
+    with TestClient(app) as client:
+        post = client.post
+        # The handler is blocked, yet Telegram gets its 200 immediately.
+        assert post("/webhook/telegram", json=_update(1, 7)).status_code == 200
+        assert post("/webhook/telegram", json=_update(1, 7)).status_code == 200
+        assert post("/webhook/telegram", json=_update(2, 7)).status_code == 200
+        client.portal.call(asyncio.sleep, 0.01)
+
+        assert post("/webhook/telegram", json=_update(3, 7)).status_code == 200
+        res = post("/webhook/telegram", json=_update(4, 7))
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "1"
+        assert post("/webhook/telegram", content=b"nope").status_code == 400
+
+        metrics = client.get("/metrics").text
+        assert "thunder_forge_webhook_queue_depth 2" in metrics
+
+        client.portal.call(bot_app.gate.set)
+    # Shutdown drains the queue; the duplicate was handled once.
+    assert bot_app.handled == [1, 2, 3]
+
+
+def test_bot_init_failure_keeps_the_api_up(
+    bot_app: _FakeBotApp, monkeypatch: pytest.MonkeyPatch
+):
+    async def unreachable() -> None:
+        raise OSError("getMe: network unreachable")
+
+    monkeypatch.setattr(bot_app, "initialize", unreachable)
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        res = client.post("/webhook/telegram", json=_update(1, 7))
+        assert res.status_code == 503
+    assert bot_app.handled == []
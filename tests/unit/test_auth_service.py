@@ -7,9 +7,11 @@ import time
 from urllib.parse import urlencode
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
 from api.webhook import app
+from services import auth_service
 from services.config_service import load_config
 
 
@@ -123,3 +125,66 @@ def test_me_admin_ok(monkeypatch: pytest.MonkeyPatch, tmp_path, client: TestClie
     assert res.status_code == 200
     body = res.json()
     assert body["user"]["id"] == 123
+
+
+def test_verified_init_data_is_cached_per_token_and_age(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    auth_service._verified.clear()
+    init_data = _make_init_data(bot_token="tok", user_id=7)
+
+    user = auth_service.verify_init_data(
+        init_data, bot_token="tok", max_age_seconds=3600
+    )
+    assert user.id == 7
+
+    # A hit neither parses nor re-checks the signature.
+    def fail(*_args, **_kwargs):
+        raise AssertionError("re-verified a cached initData")
+
+    monkeypatch.setattr(auth_service, "_compute_telegram_hash", fail)
+    assert (
+        auth_service.verify_init_data(init_data, bot_token="tok", max_age_seconds=3600)
+        is user
+    )
+    monkeypatch.undo()
+
+    # Age is re-checked against the current max age on every hit.
+    old = _make_init_data(bot_token="tok", user_id=7, auth_date=int(time.time()) - 120)
+    auth_service.verify_init_data(old, bot_token="tok", max_age_seconds=3600)
+    with pytest.raises(HTTPException) as exc:
+        auth_service.verify_init_data(old, bot_token="tok", max_age_seconds=60)
+    assert exc.value.status_code == 401
+
+    # Entries verified with another token never match.
+    with pytest.raises(HTTPException):
+        auth_service.verify_init_data(
+            init_data, bot_token="other", max_age_seconds=3600
+        )
+
+
+def test_verified_init_data_cache_is_bounded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(auth_service, "_verified", auth_service._VerifiedInitData(2))
+    for user_id in range(5):
+        auth_service.verify_init_data(
+            _make_init_data(bot_token="tok", user_id=user_id),
+            bot_token="tok",
+            max_age_seconds=3600,
+        )
+
+    assert len(auth_service._verified._entries) == 2
+
+
+@pytest.mark.parametrize("token", ["v1.1.1.9.\xe9", "v1.1.1.9.\udcff", "v1.x.1.9.sig"])
+def test_malformed_session_tokens_are_401(token: str):
+    with pytest.raises(HTTPException) as exc:
+        auth_service.verify_session_token(token, bot_token="test-token")
+    assert exc.value.status_code == 401
+
+
+def test_signed_session_token_with_bad_fields_is_401():
+    payload = "v1.abc.1.never"
+    token = f"{payload}.{auth_service._session_signature(payload, 'test-token')}"
+    with pytest.raises(HTTPException) as exc:
+        auth_service.verify_session_token(token, bot_token="test-token")
+    assert exc.value.status_code == 401
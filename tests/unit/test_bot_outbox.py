@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from telegram import Bot
+from telegram.error import TimedOut
+
+from bot.outbox import Outbox
+
+
+class FakeBotAPI:
+    """Just enough of the Bot API over HTTP for sendMessage."""
+
+    def __init__(self, *, flood_first: int = 0) -> None:
+        self.flood_first = flood_first
+        self.calls: list[tuple[float, int, str]] = []
+        self.sent: list[tuple[int, str]] = []
+        self.port = 0
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> FakeBotAPI:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        assert self._server is not None
+        self._server.close()
+
+    def bot(self) -> Bot:
+        return Bot("123:test", base_url=f"http://127.0.0.1:{self.port}/bot")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            headers = dict(
+                line.split(": ", 1)
+                for line in head.decode().split("\r\n")[1:]
+                if ": " in line
+            )
+            length = int(
+                headers.get("content-length", headers.get("Content-Length", 0))
+            )
+            form = {
+                k: v[0]
+                for k, v in parse_qs(
+                    (await reader.readexactly(length)).decode()
+                ).items()
+            }
+            chat_id, text = int(form["chat_id"]), form["text"]
+            self.calls.append((time.monotonic(), chat_id, text))
+            if len(self.calls) <= self.flood_first:
+                body = {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                }
+                status = "429 Too Many Requests"
+            else:
+                self.sent.append((chat_id, text))
+                body = {
+                    "ok": True,
+                    "result": {
+                        "message_id": len(self.sent),
+                        "date": 0,
+                        "chat": {"id": chat_id, "type": "private"},
+                        "text": text,
+                    },
+                }
+                status = "200 OK"
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+
+
+async def _drain(outbox: Outbox, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while outbox.depth and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await outbox.stop()
+
+
+def test_outbox_merges_per_chat_and_paces():
+    async def scenario() -> FakeBotAPI:
+        async with FakeBotAPI() as api:
+            outbox = Outbox(per_chat_rate=10.0, per_chat_burst=1, global_rate=100.0)
+            for text in ("a", "b", "c"):
+                outbox.submit(1, text)
+            outbox.submit(2, "x")
+            outbox.start(api.bot())
+            await asyncio.sleep(0.05)
+            # Chat 1 just used its only token: this waits ~0.1s.
+            outbox.submit(1, "d")
+            await _drain(outbox)
+            return api
+
+    api = asyncio.run(scenario())
+
+    assert api.sent == [(1, "a\n\nb\n\nc"), (2, "x"), (1, "d")]
+    first, last = api.calls[0][0], api.calls[-1][0]
+    assert last - first >= 0.09
+
+
+def test_outbox_respects_retry_after():
+    async def scenario() -> FakeBotAPI:
+        async with FakeBotAPI(flood_first=1) as api:
+            outbox = Outbox(per_chat_rate=100.0, per_chat_burst=10)
+            outbox.start(api.bot())
+            outbox.submit(1, "alert")
+            await asyncio.sleep(0.1)
+            # Submitted during the pause: merged into the retried message.
+            outbox.submit(1, "more")
+            await _drain(outbox)
+            return api
+
+    api = asyncio.run(scenario())
+
+    assert api.sent == [(1, "alert\n\nmore")]
+    assert api.calls[1][0] - api.calls[0][0] >= 1.0
+
+
+def test_outbox_network_error_backs_off_only_that_chat():
+    class FlakyBot:
+        def __init__(self) -> None:
+            self.sent: list[tuple[float, int]] = []
+            self.failed = False
+
+        async def send_message(self, *, chat_id: int, text: str, parse_mode=None):
+            if chat_id == 1 and not self.failed:
+                self.failed = True
+                raise TimedOut()
+            self.sent.append((time.monotonic(), chat_id))
+
+    async def scenario() -> tuple[float, FlakyBot]:
+        bot = FlakyBot()
+        outbox = Outbox(per_chat_rate=100.0, per_chat_burst=10)
+        started = time.monotonic()
+        outbox.submit(1, "retried")
+        outbox.submit(2, "other chat")
+        outbox.start(bot)
+        await _drain(outbox)
+        return started, bot
+
+    started, bot = asyncio.run(scenario())
+
+    assert [chat_id for _, chat_id in bot.sent] == [2, 1]
+    assert bot.sent[0][0] - started < 0.5
+    assert bot.sent[1][0] - started >= 1.0
+
+
+def test_outbox_drops_oldest_notice_when_full():
+    outbox = Outbox(max_pending=2)
+
+    assert outbox.submit(1, "old notice")
+    assert outbox.submit(2, "report", critical=True)
+    assert outbox.submit(3, "new notice")
+    assert outbox.depth == 2
+    assert [m.chat_id for q in outbox._pending.values() for m in q] == [2, 3]
+    assert outbox.submit(4, "urgent", critical=True)
+    assert [m.chat_id for q in outbox._pending.values() for m in q] == [2, 4]
+    # Nothing droppable left: notices are refused, critical messages still queue.
+    assert not outbox.submit(5, "notice")
+    assert outbox.submit(6, "urgent", critical=True)
+    assert outbox.depth == 3
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot import app as bot_app
+from bot import status as bot_status
+from bot.status import (
+    StatusWatcher,
+    collapse_transitions,
+    format_status_table,
+    status_transitions,
+)
+from services import poller_service
+from services.config_service import TFConfig
+from services.monitor_service import ClusterStatus, NodeStatus, PortStatus
+
+_CFG = TFConfig.model_validate(
+    {
+        "telegram": {"bot_token": "t"},
+        "access": {"admin_telegram_ids": [7]},
+        "settings": {"monitor": {"alert_debounce_seconds": 0.05}},
+        "nodes": {"items": []},
+    }
+)
+
+
+def _node(name: str, state: str, *, mgmt: bool, fabric: bool = True) -> NodeStatus:
+    return NodeStatus(
+        name=name,
+        mgmt_ip="10.0.0.1",
+        fabric_ip="172.16.0.1",
+        mgmt=PortStatus(ssh=mgmt, ollama=False),
+        fabric=PortStatus(ssh=fabric, ollama=fabric),
+        state=state,
+    )
+
+
+def _status(*nodes: NodeStatus, ts: float = 100.0) -> ClusterStatus:
+    return ClusterStatus(ts=ts, nodes=list(nodes))
+
+
+def test_status_table_is_rendered_from_snapshot():
+    text = format_status_table(
+        _status(
+            _node("b<2>", "down", mgmt=False, fabric=False),
+            _node("a1", "up", mgmt=True),
+        ),
+        now=130.0,
+    )
+
+    assert text.startswith("<b>1/2 up</b>, snapshot 30s old")
+    rows = text.split("<pre>")[1].split("</pre>")[0].splitlines()
+    assert rows[0].split() == ["node", "state", "mgmt", "fabric", "models"]
+    assert rows[1].split() == ["a1", "up", "S-", "SO", "-"]
+    assert rows[2].split() == ["b&lt;2&gt;", "down", "--", "--", "-"]
+    assert "No status yet" in format_status_table(None)
+
+
+def test_transitions_are_netted_per_batch():
+    a = _status(_node("n1", "up", mgmt=True), _node("n2", "unknown", mgmt=False))
+    b = _status(_node("n1", "down", mgmt=False), _node("n2", "up", mgmt=True))
+    c = _status(_node("n1", "down", mgmt=True), _node("n2", "up", mgmt=True))
+
+    assert status_transitions(a, b) == [
+        ("n1", "node", "up", "down"),
+        ("n1", "mgmt", "up", "down"),
+        ("n2", "mgmt", "down", "up"),
+    ]
+    # n1 mgmt went down and came back within the batch: nothing to report.
+    assert collapse_transitions(
+        status_transitions(a, b) + status_transitions(b, c)
+    ) == [
+        ("n1", "node", "up", "down"),
+        ("n2", "mgmt", "down", "up"),
+    ]
+
+
+def test_watcher_batches_changes_into_one_message(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(bot_status, "load_config", lambda: _CFG)
+    monkeypatch.setattr(bot_status, "is_admin_telegram_id", lambda uid: uid == 7)
+    poller = poller_service.StatusPoller()
+    monkeypatch.setattr(bot_status, "get_status_poller", lambda: poller)
+    sent: list[tuple[int, str]] = []
+
+    async def send(chat_id: int, text: str) -> None:
+        sent.append((chat_id, text))
+
+    async def scenario() -> None:
+        watcher = StatusWatcher()
+        watcher.watch(100, 7)
+        watcher.watch(200, 8)  # no longer an admin: dropped on push
+        poller._status = _status(
+            _node("n1", "up", mgmt=True), _node("n2", "up", mgmt=True)
+        )
+        watcher.start(send)
+        await asyncio.sleep(0)
+        poller._publish(
+            _status(_node("n1", "down", mgmt=False), _node("n2", "up", mgmt=True))
+        )
+        await asyncio.sleep(0.01)
+        poller._publish(
+            _status(_node("n1", "down", mgmt=False), _node("n2", "down", mgmt=False))
+        )
+        await asyncio.sleep(0.1)
+        await watcher.stop()
+        assert watcher.chats == {100: 7}
+
+    asyncio.run(scenario())
+
+    assert len(sent) == 1
+    chat_id, text = sent[0]
+    assert chat_id == 100
+    assert text.splitlines() == [
+        "🔴 n1: up → down",
+        "🔴 n1 mgmt: up → down",
+        "🔴 n2: up → down",
+        "🔴 n2 mgmt: up → down",
+    ]
+
+
+def test_unwatch_is_admin_only(monkeypatch: pytest.MonkeyPatch):
+    watcher = StatusWatcher()
+    watcher.watch(100, 7)
+    monkeypatch.setattr(bot_app, "get_status_watcher", lambda: watcher)
+    monkeypatch.setattr(bot_app, "is_admin_telegram_id", lambda uid: uid == 7)
+    replies: list[str] = []
+
+    async def reply_text(text: str, **_kwargs) -> None:
+        replies.append(text)
+
+    def update(user_id: int) -> SimpleNamespace:
+        return SimpleNamespace(
+            effective_user=SimpleNamespace(id=user_id),
+            effective_chat=SimpleNamespace(id=100),
+            effective_message=SimpleNamespace(reply_text=reply_text),
+        )
+
+    asyncio.run(bot_app._unwatch(update(8), None))
+    assert replies == ["Forbidden"]
+    assert watcher.chats == {100: 7}
+
+    asyncio.run(bot_app._unwatch(update(7), None))
+    assert replies[-1] == "Stopped watching."
+    assert watcher.chats == {}
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+# Startup cost is checked by what gets imported, not by wall-clock time
+# (scripts/bench_startup.py measures the timings).
+_CLI = "import sys; from thunder_forge.cli import main; sys.argv[0] = 'thunder-forge'; main()"
+_HEAVY = {"pydantic", "yaml", "httpx", "asyncio", "fastapi", "uvicorn", "telegram"}
+
+
+def _run(args: list[str], env: dict[str, str]) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=False
+    )
+
+
+def _imported(args: list[str], env: dict[str, str]) -> set[str]:
+    proc = _run(["-X", "importtime", *args], env)
+    assert proc.returncode == 0, proc.stderr
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    }
+
+
+def _env(tmp_path) -> dict[str, str]:
+    return {**os.environ, "XDG_CACHE_HOME": str(tmp_path / "cache")}
+
+
+def test_cli_help_imports_no_heavy_modules(tmp_path):
+    env = _env(tmp_path)
+
+    for args in (["--help"], ["status", "--help"], ["history", "--help"]):
+        assert not _imported(["-c", _CLI, *args], env) & _HEAVY
+
+
+def test_status_uses_compiled_config_on_repeat_runs(tmp_path):
+    env = _env(tmp_path)
+    config = tmp_path / "tf.yml"
+    config.write_text(
+        "telegram:\n  bot_token: t\nnodes:\n  items: []\n", encoding="utf-8"
+    )
+    args = ["-c", _CLI, "status", "--config", str(config)]
+
+    first = _imported(args, env)
+    assert "yaml" in first
+    assert not first & {"fastapi", "uvicorn", "telegram"}
+
+    # Same file content: served from the compiled cache, no YAML parsing.
+    assert "yaml" not in _imported(args, env)
+
+    # The cache is plain JSON and keeps the bot token out of it.
+    (entry,) = (tmp_path / "cache" / "thunder-forge").glob("config-*.json")
+    assert "bot_token" not in entry.read_text(encoding="utf-8")
+
+    # A corrupt cache entry is ignored: the config is parsed again.
+    entry.write_bytes(b"\x80\x04garbage")
+    assert "yaml" in _imported(args, env)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import pytest
+
+from services import config_service
+from services.config_service import (
+    TFConfig,
+    get_config_snapshot,
+    get_inventory,
+    load_config,
+)
+
+
+def _write(path, *, admins: str, extra_node: bool = False) -> None:
+    lines = [
+        "telegram:",
+        "  bot_token: t",
+        "access:",
+        f"  admin_telegram_ids: {admins}",
+        "fabricnet:",
+        "  nodes:",
+        "    - name: msm1",
+        "      address: 172.16.10.2",
+        "nodes:",
+        "  defaults:",
+        "    ssh_user: u",
+        "    service_manager: brew",
+        "  items:",
+        "    - name: msm1",
+        "      mgmt_ip: 10.0.0.1",
+    ]
+    if extra_node:
+        lines += ["    - name: msm2", "      mgmt_ip: 10.0.0.2"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.fixture()
+def cfg_path(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    path = tmp_path / "tf.yml"
+    _write(path, admins="[1]")
+    monkeypatch.setenv("TF_CONFIG_PATH", str(path))
+    # Check the file on every read so the test does not have to sleep.
+    monkeypatch.setattr(config_service, "_RELOAD_CHECK_SECONDS", 0.0)
+    load_config.cache_clear()
+    yield path
+    load_config.cache_clear()
+
+
+def test_snapshot_indexes_are_built_once(cfg_path):
+    snapshot = get_config_snapshot()
+
+    assert snapshot.version == 1
+    assert snapshot.inventory.names() == ["msm1"]
+    assert snapshot.inventory.get("msm1").ssh_user == "u"
+    assert snapshot.inventory.fabric_ip("msm1") == "172.16.10.2"
+    assert snapshot.admin_ids == frozenset({1})
+    assert get_config_snapshot() is snapshot
+    assert load_config() is snapshot.config
+
+
+def test_snapshot_reloads_on_change_and_keeps_last_good(cfg_path, caplog):
+    first = get_config_snapshot()
+
+    _write(cfg_path, admins="[1, 2]", extra_node=True)
+    second = get_config_snapshot()
+    assert second.version == 2
+    assert second.admin_ids == frozenset({1, 2})
+    assert second.inventory.names() == ["msm1", "msm2"]
+    # The old snapshot is untouched for readers still holding it.
+    assert first.admin_ids == frozenset({1})
+
+    cfg_path.write_text("telegram: [not, a, mapping]\n", encoding="utf-8")
+    with caplog.at_level("WARNING"):
+        assert get_config_snapshot() is second
+    assert "keeping the last good config" in caplog.text
+
+    _write(cfg_path, admins="[3]")
+    assert get_config_snapshot().admin_ids == frozenset({3})
+
+
+def _fleet_config(count: int) -> TFConfig:
+    return TFConfig.model_validate(
+        {
+            "telegram": {"bot_token": "t"},
+            "nodes": {
+                "defaults": {"ssh_user": "u", "service_manager": "brew"},
+                "items": [
+                    {
+                        "name": f"n{i}",
+                        "mgmt_ip": f"10.0.{i // 256}.{i % 256}",
+                        "groups": ["even" if i % 2 == 0 else "odd"],
+                    }
+                    for i in range(count)
+                ],
+            },
+            "fabricnet": {"nodes": [{"name": "n1", "address": "172.16.0.1"}]},
+        }
+    )
+
+
+def test_inventory_is_resolved_once_per_config():
+    cfg = _fleet_config(2000)
+
+    inventory = get_inventory(cfg)
+    assert get_inventory(cfg) is inventory
+    assert len(inventory) == 2000
+    assert inventory.get("n1999").mgmt_ip == "10.0.7.207"
+    assert inventory.fabric_ip("n1") == "172.16.0.1"
+    assert len(inventory.groups["even"]) == 1000
+
+    # Swapping a source section invalidates the cached index.
+    smaller = cfg.model_copy(update={"nodes": _fleet_config(3).nodes})
+    assert get_inventory(smaller).names() == ["n0", "n1", "n2"]
+    assert get_inventory(cfg) is inventory
+
+
+def test_inventory_select_by_name_and_group():
+    inventory = get_inventory(_fleet_config(5))
+
+    assert [n.name for n in inventory.select("n3, @even")] == ["n0", "n2", "n3", "n4"]
+    assert [n.name for n in inventory.select(["n1"])] == ["n1"]
+    assert len(inventory.select("all")) == len(inventory.select(None)) == 5
+    with pytest.raises(ValueError, match="@gpu, n9"):
+        inventory.select("n1,@gpu,n9")
+
+
+def test_metrics_allow_ips_are_validated_at_load():
+    base = {"telegram": {"bot_token": "t"}, "nodes": {"items": []}}
+    cfg = TFConfig.model_validate(
+        {**base, "server": {"metrics_allow_ips": ["10.0.0.0/8", "::1"]}}
+    )
+    assert cfg.server.metrics_allow_ips == ["10.0.0.0/8", "::1"]
+
+    with pytest.raises(ValueError, match="metrics_allow_ips"):
+        TFConfig.model_validate({**base, "server": {"metrics_allow_ips": ["10.0.0/8"]}})
+
+
+def test_compiled_config_is_rebuilt_without_validation(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    path = tmp_path / "tf.yml"
+    _write(path, admins="[1]")
+    first = config_service._read_config_file(str(path))
+
+    def no_validation(*args, **kwargs):
+        raise AssertionError("cache hit must not validate")
+
+    monkeypatch.setattr(TFConfig, "model_validate", no_validation)
+    cached = config_service._read_config_file(str(path))
+
+    assert get_inventory(cached).nodes == get_inventory(first).nodes
+    assert get_inventory(cached).fabric_ip("msm1") == "172.16.10.2"
+    # Not stored in the cache: read from tf.yml when first needed.
+    assert "bot_token" not in cached.telegram.__dict__
+    assert cached.telegram.bot_token == "t"
+    assert cached.model_dump() == first.model_dump()
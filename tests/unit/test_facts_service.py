@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import subprocess
+
+import pytest
+
+from services import facts_service, ssh_service
+from services.config_service import FabricIPv4Defaults, Node, SSHSettings
+from services.fabricnet_service import fabric_ipv4_matches, parse_service_ipv4
+
+_OUTPUT = """\
+@@tf-fact os_version
+26.2
+@@tf-fact hostname
+msm1.local
+@@tf-fact network_services
+An asterisk (*) denotes that a network service is disabled.
+Ethernet
+*Wi-Fi
+Thunderbolt Bridge
+@@tf-fact ipv4 Ethernet
+DHCP Configuration
+IP address: 192.168.1.20
+Subnet mask: 255.255.255.0
+Router: 192.168.1.1
+Client ID:
+@@tf-fact ipv4 Thunderbolt Bridge
+Manual Configuration
+IP address: 172.16.10.2
+Subnet mask: 255.255.255.252
+Router: (null)
+@@tf-fact ollama_service
+started
+"""
+
+
+def test_parse_facts_splits_sections():
+    facts = facts_service.parse_facts("msm1", _OUTPUT)
+
+    assert facts.os_version == "26.2"
+    assert facts.hostname == "msm1.local"
+    assert facts.network_services == ["Ethernet", "Wi-Fi", "Thunderbolt Bridge"]
+    assert facts.service_address("Thunderbolt Bridge") == "172.16.10.2"
+    bridge = facts.ipv4["Thunderbolt Bridge"]
+    assert bridge.configuration == "Manual Configuration"
+    assert bridge.subnet_mask == "255.255.255.252"
+    assert bridge.router is None
+    assert facts.ipv4["Ethernet"].router == "192.168.1.1"
+    assert facts.ollama_service == "started"
+
+
+def test_parse_facts_missing_sections_are_empty():
+    facts = facts_service.parse_facts(
+        "n", "@@tf-fact os_version\n@@tf-fact ipv4 Wi-Fi\n"
+    )
+
+    assert facts.os_version is None
+    assert facts.network_services == []
+    assert facts.service_address("Wi-Fi") is None
+
+
+def test_build_facts_script_rejects_unknown_facts():
+    script = facts_service.build_facts_script(["hostname"])
+    assert "hostname" in script and "sw_vers" not in script
+
+    with pytest.raises(ValueError, match="Unknown facts: kernel"):
+        facts_service.build_facts_script(["kernel"])
+
+
+def test_fabric_ipv4_matches_requires_every_configured_field():
+    current = parse_service_ipv4(
+        "Manual Configuration\nIP address: 169.254.10.1\n"
+        "Subnet mask: 255.255.255.252\nRouter: (null)\n"
+    )
+    defaults = FabricIPv4Defaults()
+    kwargs = {"address": "169.254.10.1", "ipv4_defaults": defaults}
+
+    assert fabric_ipv4_matches(current, ipv4_mode="manual", **kwargs)
+    assert not fabric_ipv4_matches(
+        current, ipv4_mode="dhcp_with_manual_address", **kwargs
+    )
+    assert not fabric_ipv4_matches(
+        current,
+        ipv4_mode="manual",
+        address="169.254.10.1",
+        ipv4_defaults=FabricIPv4Defaults(router="169.254.10.2"),
+    )
+    assert not fabric_ipv4_matches(None, ipv4_mode="manual", **kwargs)
+
+
+def test_gather_facts_one_round_trip_per_node(monkeypatch: pytest.MonkeyPatch):
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(list(cmd))
+        if cmd[-2].endswith("@10.0.0.2"):
+            return subprocess.CompletedProcess(cmd, 255, "", "Connection refused\n")
+        return subprocess.CompletedProcess(cmd, 0, _OUTPUT, "")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+    nodes = [
+        Node(name="msm1", ssh_user="u", mgmt_ip="10.0.0.1", service_manager="brew"),
+        Node(name="msm2", ssh_user="u", mgmt_ip="10.0.0.2", service_manager="brew"),
+    ]
+
+    result = facts_service.gather_facts(
+        nodes=nodes, settings=SSHSettings(multiplex=False)
+    )
+
+    assert len(calls) == 2
+    assert list(result.facts) == ["msm1"]
+    assert result.facts["msm1"].os_version == "26.2"
+    assert result.failed["msm2"].returncode == 255
+
+
+def test_facts_cache_serves_fresh_facts_across_restarts(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+):
+    scripts: list[str] = []
+
+    def fake_run(cmd, **kwargs):
+        scripts.append(cmd[-1])
+        return subprocess.CompletedProcess(cmd, 0, _OUTPUT, "")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+    node = Node(name="msm1", ssh_user="u", mgmt_ip="10.0.0.1", service_manager="brew")
+    settings = SSHSettings(multiplex=False)
+    ttl = {"os_version": 3600.0, "ipv4": 3600.0}
+    path = tmp_path / "facts.json"
+
+    def gather(cache: facts_service.FactsCache, **kwargs):
+        return facts_service.gather_facts(
+            nodes=[node],
+            settings=settings,
+            facts=("os_version", "ipv4", "ollama_service"),
+            cache=cache,
+            ttl_seconds=ttl,
+            **kwargs,
+        )
+
+    gather(facts_service.FactsCache(path))
+    assert "sw_vers" in scripts[-1]
+
+    # New process: os_version/ipv4 come from disk, ollama_service (no TTL) is re-gathered.
+    cache = facts_service.FactsCache(path)
+    result = gather(cache)
+    assert "sw_vers" not in scripts[-1] and "getinfo" not in scripts[-1]
+    assert "brew services" in scripts[-1]
+    assert result.facts["msm1"].os_version == "26.2"
+    assert result.facts["msm1"].service_address("Thunderbolt Bridge") == "172.16.10.2"
+
+    cache.invalidate("msm1", ("ipv4",))
+    gather(cache)
+    assert "getinfo" in scripts[-1] and "sw_vers" not in scripts[-1]
+
+    gather(cache, refresh=True)
+    assert "sw_vers" in scripts[-1]
+
+    # A node whose SSH target changed never gets the old facts.
+    moved = node.model_copy(update={"mgmt_ip": "10.0.0.9"})
+    assert cache.get(moved, ["os_version"], ttl_seconds=ttl, now=0.0) == {}
+
+
+def test_facts_cache_treats_malformed_entries_as_misses(tmp_path):
+    node = Node(name="msm1", ssh_user="u", mgmt_ip="10.0.0.1", service_manager="brew")
+    path = tmp_path / "facts.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": facts_service._CACHE_VERSION,
+                "nodes": {
+                    "msm1": {
+                        "target": "u@10.0.0.1",
+                        "facts": {
+                            "os_version": {"value": "26.2"},
+                            "hostname": {"ts": "soon", "value": "msm1"},
+                            "ipv4": {"ts": 0.0, "value": {}},
+                        },
+                    },
+                    "msm2": "truncated",
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    cache = facts_service.FactsCache(path)
+    ttl = {"os_version": 60.0, "hostname": 60.0, "ipv4": 60.0}
+
+    facts = ["os_version", "hostname", "ipv4"]
+    assert cache.get(node, facts, ttl_seconds=ttl, now=1.0) == {"ipv4": {}}
+    cache.put(node.model_copy(update={"name": "msm2"}), {"hostname": "x"}, now=1.0)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from services.history_service import StatusHistory, load_history, save_history_bytes
+from services.monitor_service import ClusterStatus, NodeStatus, PortStatus
+
+
+def _status(ts: float, *, fabric_ssh: bool) -> ClusterStatus:
+    return ClusterStatus(
+        ts=ts,
+        nodes=[
+            NodeStatus(
+                name="msm3",
+                mgmt_ip="10.0.0.3",
+                fabric_ip="169.254.10.3",
+                mgmt=PortStatus(ssh=True, ollama=True),
+                fabric=PortStatus(ssh=fabric_ssh, ollama=False),
+            )
+        ],
+    )
+
+
+def test_query_downsamples_window_into_buckets():
+    history = StatusHistory(capacity=1000)
+    for i in range(100):
+        # fabric ssh goes down at t=1050
+        history.record(_status(1000 + i, fabric_ssh=i < 50))
+
+    result = history.query(since=1000, until=1100, buckets=4, iface="fabric")
+
+    [series] = result["series"]
+    assert series["node"] == "msm3"
+    assert [p["samples"] for p in series["points"]] == [25, 25, 25, 25]
+    assert [p["ssh_up"] for p in series["points"]] == [1.0, 1.0, 0.0, 0.0]
+    assert all(p["ollama_up"] == 0.0 for p in series["points"])
+
+
+def test_ring_is_bounded_and_keeps_newest_samples():
+    history = StatusHistory(capacity=10)
+    for i in range(25):
+        history.record(_status(1000 + i, fabric_ssh=True))
+
+    result = history.query(since=0, until=2000, buckets=1, iface="mgmt")
+
+    assert result["series"][0]["points"][0]["samples"] == 10
+    old = history.query(since=0, until=1015, buckets=1, iface="mgmt")
+    assert old["series"][0]["points"][0]["samples"] == 0
+
+
+def test_history_round_trips_through_file(tmp_path, monkeypatch):
+    history = StatusHistory(capacity=8)
+    for i in range(12):
+        history.record(_status(1000 + i, fabric_ssh=i % 2 == 0))
+
+    # "~" is expanded, as in the example config.
+    monkeypatch.setenv("HOME", str(tmp_path))
+    save_history_bytes("~/history.bin", history.to_bytes())
+    assert (tmp_path / "history.bin").exists()
+    loaded = load_history("~/history.bin")
+
+    window = {"since": 0, "until": 2000, "buckets": 3}
+    assert loaded.query(**window) == history.query(**window)
+
+
+def test_wrapped_ring_restores_into_smaller_capacity():
+    history = StatusHistory(capacity=8)
+    for i in range(13):
+        history.record(_status(1000 + i, fabric_ssh=i % 3 == 0))
+
+    loaded = StatusHistory.from_bytes(history.to_bytes(), capacity=5)
+
+    window = {"since": 0, "until": 2000, "buckets": 1}
+    assert loaded.query(**window)["series"][0]["points"][0]["samples"] == 5
+    newest = {"since": 1008, "until": 1013, "buckets": 5}
+    assert loaded.query(**newest) == history.query(**newest)
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import subprocess
+
 from services.config_service import HostsSyncSettings, TFConfig
-from services.hosts_service import build_hosts_block, upsert_managed_hosts_block
+from services.hosts_service import (
+    build_hosts_block,
+    build_hosts_write_command,
+    managed_block_digest,
+    upsert_managed_hosts_block,
+)
 
 
 def test_build_hosts_block_contains_mgmt_line():
@@ -50,3 +57,48 @@ def inv_settings():
         managed_block_start="# BEGIN thunder-forge",
         managed_block_end="# END thunder-forge",
     )
+
+
+def _fleet(mgmt_ip: str) -> TFConfig:
+    return TFConfig.model_validate(
+        {
+            "telegram": {"bot_token": "test-token"},
+            "nodes": {
+                "defaults": {"ssh_user": "u", "service_manager": "brew"},
+                "items": [{"name": "msm1", "mgmt_ip": mgmt_ip}],
+            },
+        }
+    )
+
+
+def test_block_digest_detects_changes():
+    settings = inv_settings()
+    artifacts = build_hosts_block(_fleet("192.168.1.101"))
+    hosts = upsert_managed_hosts_block(
+        hosts_file_text="127.0.0.1 localhost\n",
+        managed_block=artifacts.block,
+        settings=settings,
+    )
+
+    assert managed_block_digest(hosts_file_text=hosts, settings=settings) == (
+        artifacts.digest
+    )
+    assert build_hosts_block(_fleet("192.168.1.102")).digest != artifacts.digest
+    # Hand edits inside the block and pre-hash blocks both count as stale.
+    edited = hosts.replace("192.168.1.101", "192.168.1.1")
+    assert managed_block_digest(hosts_file_text=edited, settings=settings) is None
+    legacy = "# BEGIN thunder-forge\n1.2.3.4 x-mgmt\n# END thunder-forge\n"
+    assert managed_block_digest(hosts_file_text=legacy, settings=settings) is None
+
+
+def test_write_command_replaces_file_atomically(tmp_path):
+    target = tmp_path / "hosts"
+    target.write_text("old\n", encoding="utf-8")
+    content = "127.0.0.1 localhost\n# it's $HOME and `quotes`\n"
+
+    command = build_hosts_write_command(content, path=str(target))
+    subprocess.run(["sh", "-c", command], check=True)
+
+    assert target.read_text(encoding="utf-8") == content
+    assert target.stat().st_mode & 0o777 == 0o644
+    assert [p.name for p in tmp_path.iterdir()] == ["hosts"]
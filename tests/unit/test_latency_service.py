@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from services.latency_service import LatencyHistogram, LatencyTracker
+from services.monitor_service import ClusterStatus, NodeStatus, PortStatus
+
+
+def test_histogram_quantiles_within_bucket_error():
+    hist = LatencyHistogram()
+    for i in range(1, 1001):
+        hist.record(i / 10_000)  # 0.1ms .. 100ms, uniform
+
+    assert abs(hist.quantile(0.5) - 0.05) / 0.05 < 0.05
+    assert abs(hist.quantile(0.99) - 0.099) / 0.099 < 0.05
+    assert hist.count == 1000
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_tracker_attaches_percentiles_per_path():
+    tracker = LatencyTracker()
+    for ms in [0.2] * 95 + [40.0] * 5:
+        status = ClusterStatus(
+            ts=0,
+            nodes=[
+                NodeStatus(
+                    name="msm1",
+                    mgmt_ip="10.0.0.1",
+                    fabric_ip="169.254.10.1",
+                    mgmt=PortStatus(ssh=True, ollama=False, ssh_ms=1.0),
+                    fabric=PortStatus(ssh=True, ollama=False, ssh_ms=ms),
+                )
+            ],
+        )
+        tracker.observe(status)
+
+    latency = status.nodes[0].latency
+    assert set(latency) == {"mgmt.ssh", "fabric.ssh"}
+    fabric = latency["fabric.ssh"]
+    assert fabric.samples == 100
+    assert 0.19 < fabric.p50_ms < 0.21
+    assert 38 < fabric.p99_ms < 42
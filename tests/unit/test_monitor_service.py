@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from services import monitor_service
+from services.config_service import MonitorSettings, TFConfig
+
+
+def _cfg(
+    *, node_count: int, deadline: float | None = None, max_concurrent: int = 64
+) -> TFConfig:
+    return TFConfig.model_validate(
+        {
+            "telegram": {"bot_token": "test-token"},
+            "settings": {
+                "ssh": {"connect_timeout_seconds": 0.2},
+                "monitor": {
+                    "probe_deadline_seconds": deadline,
+                    "max_concurrent_probes": max_concurrent,
+                    "ollama_api": False,
+                },
+            },
+            "nodes": {
+                "defaults": {"ssh_user": "u", "service_manager": "brew"},
+                "items": [
+                    {"name": f"n{i}", "mgmt_ip": f"10.0.0.{i}"}
+                    for i in range(node_count)
+                ],
+            },
+            "fabricnet": {
+                "nodes": [
+                    {"name": f"n{i}", "address": f"169.254.0.{i}"}
+                    for i in range(node_count)
+                ]
+            },
+        }
+    )
+
+
+def test_probes_run_concurrently(monkeypatch: pytest.MonkeyPatch):
+    async def fake_probe(host: str, port: int, timeout_seconds: float):
+        await asyncio.sleep(timeout_seconds)
+        return timeout_seconds if port == 22 else None
+
+    monkeypatch.setattr(monitor_service, "_tcp_probe_async", fake_probe)
+
+    started = time.monotonic()
+    status = monitor_service.get_cluster_status(_cfg(node_count=20))
+    elapsed = time.monotonic() - started
+
+    # 20 nodes x 4 probes at 0.2s each would take 16s in series.
+    assert elapsed < 1.0
+    assert len(status.nodes) == 20
+    assert all(n.mgmt.ssh and n.fabric.ssh for n in status.nodes)
+    assert not any(n.mgmt.ollama or n.fabric.ollama for n in status.nodes)
+    assert status.nodes[0].mgmt.ssh_ms == 200.0
+
+
+def test_deadline_reports_pending_probes_as_down(monkeypatch: pytest.MonkeyPatch):
+    async def hanging_probe(host: str, port: int, timeout_seconds: float):
+        await asyncio.sleep(30)
+        return 0.001
+
+    monkeypatch.setattr(monitor_service, "_tcp_probe_async", hanging_probe)
+
+    started = time.monotonic()
+    status = monitor_service.get_cluster_status(_cfg(node_count=3, deadline=0.1))
+
+    assert time.monotonic() - started < 1.0
+    assert not any(n.mgmt.ssh for n in status.nodes)
+
+
+def test_deadline_bounds_the_whole_round(monkeypatch: pytest.MonkeyPatch):
+    async def slow_probe(host: str, port: int, timeout_seconds: float):
+        await asyncio.sleep(0.1)
+        return 0.1
+
+    monkeypatch.setattr(monitor_service, "_tcp_probe_async", slow_probe)
+
+    # 3 nodes x 4 probes through 2 slots would take six waves (0.6s); the
+    # round still ends at its deadline, with unfinished probes down.
+    started = time.monotonic()
+    status = monitor_service.get_cluster_status(
+        _cfg(node_count=3, deadline=0.15, max_concurrent=2)
+    )
+
+    assert time.monotonic() - started < 0.5
+    assert status.nodes[0].mgmt.ssh and status.nodes[0].mgmt.ollama
+    assert not any(n.fabric.ssh or n.fabric.ollama for n in status.nodes)
+
+
+def test_diff_cluster_status_reports_only_changed_nodes():
+    def node(name: str, *, ssh: bool) -> monitor_service.NodeStatus:
+        return monitor_service.NodeStatus(
+            name=name,
+            mgmt_ip="10.0.0.1",
+            fabric_ip=None,
+            mgmt=monitor_service.PortStatus(ssh=ssh, ollama=True),
+            fabric=monitor_service.PortStatus(ssh=False, ollama=False),
+        )
+
+    prev = monitor_service.ClusterStatus(
+        ts=1.0, nodes=[node("a", ssh=True), node("b", ssh=True), node("c", ssh=True)]
+    )
+    cur = monitor_service.ClusterStatus(
+        ts=2.0, nodes=[node("a", ssh=True), node("b", ssh=False)]
+    )
+
+    delta = monitor_service.diff_cluster_status(prev, cur)
+
+    assert delta is not None
+    assert [n["name"] for n in delta["nodes"]] == ["b"]
+    assert delta["removed"] == ["c"]
+    assert monitor_service.diff_cluster_status(cur, cur) is None
+
+
+def _observation(*, up: bool, ts: float) -> monitor_service.NodeStatus:
+    return monitor_service.NodeStatus(
+        name="msm1",
+        mgmt_ip="10.0.0.1",
+        fabric_ip=None,
+        mgmt=monitor_service.PortStatus(ssh=up, ollama=False),
+        fabric=monitor_service.PortStatus(ssh=False, ollama=False),
+        checked_at=ts,
+    )
+
+
+def test_scheduler_hysteresis_and_backoff():
+    settings = MonitorSettings(
+        poll_interval_seconds=5,
+        probe_jitter_ratio=0,
+        down_after=3,
+        up_after=2,
+        recheck_seconds=1,
+        backoff_max_seconds=40,
+    )
+    scheduler = monitor_service.ProbeScheduler(random.Random(0))
+    assert scheduler.due(["msm1"], now=0) == {"msm1"}
+
+    first = _observation(up=True, ts=100)
+    scheduler.observe(first, now=0, settings=settings)
+    assert (first.state, first.since, first.flaps) == ("up", 100, 0)
+
+    # One or two dropped probes keep the node (and its ports) up but trigger
+    # quick re-checks.
+    for i in (1, 2):
+        obs = _observation(up=False, ts=100 + i)
+        scheduler.observe(obs, now=i, settings=settings)
+        assert obs.state == "up"
+        assert obs.mgmt.ssh is True
+        assert scheduler.next_due() == i + 1
+
+    down = _observation(up=False, ts=103)
+    scheduler.observe(down, now=3, settings=settings)
+    assert (down.state, down.since, down.flaps) == ("down", 103, 1)
+    assert down.mgmt.ssh is False
+
+    # Staying down backs off exponentially from the flip (5s * 2^(rounds
+    # down - 1)), capped.
+    assert scheduler.next_due() == 3 + 5
+    for now, wait in ((8, 10), (18, 20), (38, 40), (78, 40)):
+        scheduler.observe(
+            _observation(up=False, ts=100 + now), now=now, settings=settings
+        )
+        assert scheduler.next_due() == now + wait
+
+    # Recovery needs two agreeing observations.
+    back = _observation(up=True, ts=218)
+    scheduler.observe(back, now=118, settings=settings)
+    assert back.state == "down"
+    assert back.mgmt.ssh is False
+    assert scheduler.next_due() == 119
+    back = _observation(up=True, ts=219)
+    scheduler.observe(back, now=119, settings=settings)
+    assert (back.state, back.since, back.flaps) == ("up", 219, 2)
+    assert back.mgmt.ssh is True
+
+
+def test_scheduler_smooths_single_port_flaps():
+    settings = MonitorSettings(probe_jitter_ratio=0, down_after=2, recheck_seconds=1)
+    scheduler = monitor_service.ProbeScheduler(random.Random(0))
+
+    def obs(*, ollama: bool) -> monitor_service.NodeStatus:
+        status = _observation(up=True, ts=0)
+        status.mgmt.ollama = ollama
+        return status
+
+    scheduler.observe(obs(ollama=True), now=0, settings=settings)
+    blip = obs(ollama=False)
+    scheduler.observe(blip, now=1, settings=settings)
+    assert (blip.state, blip.mgmt.ollama) == ("up", True)
+    assert scheduler.next_due() == 2
+    gone = obs(ollama=False)
+    scheduler.observe(gone, now=2, settings=settings)
+    assert (gone.state, gone.mgmt.ollama) == ("up", False)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.config_service import TFConfig
+from services.monitor_service import get_cluster_status_async
+from services.ollama_service import OllamaClientPool
+
+_RESPONSES = {
+    "/api/version": {"version": "0.12.0"},
+    "/api/tags": {"models": [{"name": "qwen3:8b"}, {"name": "llama3.2:3b"}]},
+    "/api/ps": {
+        "models": [
+            {
+                "name": "qwen3:8b",
+                "size_vram": 6_000_000_000,
+                "expires_at": "2026-01-01T00:05:00Z",
+            }
+        ]
+    },
+}
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set[int] = set()
+    delay = 0.0
+
+    def do_GET(self):  # noqa: N802
+        _FakeOllama.connections.add(self.client_address[1])
+        time.sleep(_FakeOllama.delay)
+        body = json.dumps(_RESPONSES.get(self.path, {})).encode()
+        self.send_response(200 if self.path in _RESPONSES else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_ollama_port():
+    _FakeOllama.connections = set()
+    _FakeOllama.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def _cfg(ollama_port: int, *, api_timeout: float = 2.0) -> TFConfig:
+    return TFConfig.model_validate(
+        {
+            "telegram": {"bot_token": "test-token"},
+            "settings": {
+                "ssh": {"connect_timeout_seconds": 0.5},
+                "monitor": {
+                    "ssh_port": 1,
+                    "ollama_port": ollama_port,
+                    "ollama_api_timeout_seconds": api_timeout,
+                },
+            },
+            "nodes": {
+                "defaults": {"ssh_user": "u", "service_manager": "brew"},
+                "items": [{"name": "node1", "mgmt_ip": "127.0.0.1"}],
+            },
+        }
+    )
+
+
+def test_status_includes_ollama_models_over_one_pooled_connection(
+    fake_ollama_port: int,
+):
+    cfg = _cfg(fake_ollama_port)
+
+    async def scenario():
+        pool = OllamaClientPool()
+        try:
+            first = await get_cluster_status_async(cfg, ollama_pool=pool)
+            second = await get_cluster_status_async(cfg, ollama_pool=pool)
+        finally:
+            await pool.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    [node] = second.nodes
+    assert node.mgmt.ollama is True
+    assert node.ollama is not None and node.ollama.ok
+    assert node.ollama.version == "0.12.0"
+    assert node.ollama.models == ["qwen3:8b", "llama3.2:3b"]
+    assert [m.name for m in node.ollama.loaded] == ["qwen3:8b"]
+    assert first.nodes[0].ollama == node.ollama
+    # Six API requests across two rounds, one keep-alive connection.
+    assert len(_FakeOllama.connections) == 1
+
+
+def test_unreachable_ollama_reports_error():
+    # Port 1 on localhost refuses connections.
+    status = asyncio.run(get_cluster_status_async(_cfg(1)))
+
+    [node] = status.nodes
+    assert node.ollama is not None
+    assert node.ollama.ok is False
+    assert node.ollama.error
+
+
+def test_slow_ollama_times_out_within_the_probe_deadline(fake_ollama_port: int):
+    # Each request fits the timeout, the three together do not.
+    _FakeOllama.delay = 0.15
+    status = asyncio.run(
+        get_cluster_status_async(_cfg(fake_ollama_port, api_timeout=0.3))
+    )
+
+    [node] = status.nodes
+    assert node.ollama is not None and node.ollama.ok is False
+    assert node.ollama.error == "timed out after 0.3s"
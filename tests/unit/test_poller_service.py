@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from services import poller_service
+from services.config_service import TFConfig
+from services.monitor_service import (
+    ClusterStatus,
+    NodeStatus,
+    PortStatus,
+    ProbeScheduler,
+)
+
+
+def _cfg(*, poll_interval: float) -> TFConfig:
+    return TFConfig.model_validate(
+        {
+            "telegram": {"bot_token": "test-token"},
+            "settings": {
+                "monitor": {
+                    "history_path": None,
+                    "poll_interval_seconds": poll_interval,
+                }
+            },
+            "nodes": {
+                "defaults": {"ssh_user": "u", "service_manager": "brew"},
+                "items": [{"name": "n1", "mgmt_ip": "10.0.0.1"}],
+            },
+        }
+    )
+
+
+# First sightings settle on a random phase within the poll interval, so a
+# short interval makes n1 due again almost at once.
+_CFG = _cfg(poll_interval=0.01)
+
+
+@pytest.fixture()
+def probe_calls(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    calls: list[float] = []
+
+    async def fake_status(_cfg, *, only=None, **_kwargs) -> ClusterStatus:
+        calls.append(time.time())
+        await asyncio.sleep(0.05)
+        node = NodeStatus(
+            name="n1",
+            mgmt_ip="10.0.0.1",
+            fabric_ip=None,
+            mgmt=PortStatus(ssh=True, ollama=False),
+            fabric=PortStatus(ssh=False, ollama=False),
+            checked_at=time.time(),
+        )
+        nodes = [node] if only is None or "n1" in only else []
+        return ClusterStatus(ts=time.time(), nodes=nodes)
+
+    monkeypatch.setattr(poller_service, "load_config", lambda: _CFG)
+    monkeypatch.setattr(poller_service, "get_cluster_status_async", fake_status)
+    return calls
+
+
+def test_concurrent_refreshes_share_one_round(probe_calls: list[float]):
+    poller = poller_service.StatusPoller()
+
+    async def scenario():
+        return await asyncio.gather(*(poller.refresh() for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert len(probe_calls) == 1
+    assert all(r is results[0] for r in results)
+    assert poller.version == 1
+
+
+def test_stale_snapshot_is_served_while_revalidating(probe_calls: list[float]):
+    poller = poller_service.StatusPoller()
+
+    async def scenario():
+        first = await poller.get()
+        first.ts -= 60  # pretend the snapshot is a minute old
+        await asyncio.sleep(0.02)
+        stale = await poller.get(max_age=10)
+        assert stale is first
+        assert len(probe_calls) == 1
+        await asyncio.sleep(0.1)
+        return await poller.get(max_age=10)
+
+    fresh = asyncio.run(scenario())
+
+    assert len(probe_calls) == 2
+    assert poller.age_seconds() < 10
+    assert fresh.ts > time.time() - 10
+
+
+def test_stale_reads_only_probe_due_nodes(
+    monkeypatch: pytest.MonkeyPatch, probe_calls: list[float]
+):
+    # n1 is next due within a 60s interval, e.g. a down node backing off.
+    cfg = _cfg(poll_interval=60)
+    monkeypatch.setattr(poller_service, "load_config", lambda: cfg)
+    poller = poller_service.StatusPoller()
+    poller.scheduler = ProbeScheduler(random.Random(0))
+
+    async def scenario():
+        first = await poller.get()
+        first.ts -= 600
+        for _ in range(3):
+            assert await poller.get(max_age=10) is first
+            await asyncio.sleep(0.06)
+
+    asyncio.run(scenario())
+
+    assert len(probe_calls) == 1
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+
+from services.ratelimit_service import Coalescer, TokenBucketLimiter
+
+
+def test_token_bucket_burst_then_refill():
+    limiter = TokenBucketLimiter()
+
+    assert [limiter.check(1, rate=2.0, burst=3, now=0.0) for _ in range(3)] == [0.0] * 3
+    assert limiter.check(1, rate=2.0, burst=3, now=0.0) == 0.5
+    # Other users have their own bucket.
+    assert limiter.check(2, rate=2.0, burst=3, now=0.0) == 0.0
+    # Half a second refills one token.
+    assert limiter.check(1, rate=2.0, burst=3, now=0.5) == 0.0
+    assert limiter.check(1, rate=0.0, burst=3, now=0.5) == 0.0
+
+
+def test_token_bucket_memory_is_bounded():
+    limiter = TokenBucketLimiter(max_keys=100)
+
+    for user_id in range(1000):
+        limiter.check(user_id, rate=1.0, burst=5, now=0.0)
+    assert len(limiter) == 100
+
+    # Buckets idle long enough to be full again are dropped lazily.
+    limiter.check("late", rate=1.0, burst=5, now=10.0)
+    assert len(limiter) == 1
+
+
+def test_coalescer_shares_one_run():
+    calls = 0
+
+    async def expensive() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario() -> None:
+        coalescer: Coalescer[int] = Coalescer()
+        results = await asyncio.gather(
+            *(coalescer.run("status", expensive) for _ in range(50))
+        )
+        assert results == [1] * 50
+        assert not coalescer.in_flight("status")
+        # A finished run is not cached.
+        assert await coalescer.run("status", expensive) == 2
+
+        # A cancelled caller does not cancel the shared run.
+        waiter = asyncio.ensure_future(coalescer.run("status", expensive))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        assert await coalescer.run("status", expensive) == 3
+
+    asyncio.run(scenario())
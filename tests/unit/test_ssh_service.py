@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import time
+
+import pytest
+
+from services import ssh_service
+from services.config_service import Node, SSHSettings
+
+
+@pytest.fixture()
+def recorded(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(list(cmd))
+        return subprocess.CompletedProcess(cmd, 0, "ok\n", "")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+    return calls
+
+
+def _node() -> Node:
+    return Node(name="msm1", ssh_user="u", mgmt_ip="10.0.0.1", service_manager="brew")
+
+
+def test_run_ssh_reuses_control_master(
+    monkeypatch: pytest.MonkeyPatch, recorded: list[list[str]]
+):
+    pool = ssh_service.SSHControlPool()
+    monkeypatch.setattr(ssh_service, "_control_pool", pool)
+    settings = SSHSettings(control_persist_seconds=90)
+
+    for _ in range(2):
+        ssh_service.run_ssh(
+            node=_node(), settings=settings, remote_command="true", log_command=False
+        )
+
+    assert len(recorded) == 2
+    for cmd in recorded:
+        assert "ControlMaster=auto" in cmd
+        assert "ControlPersist=90" in cmd
+        assert cmd[-2:] == ["u@10.0.0.1", "true"]
+    control_paths = {a for cmd in recorded for a in cmd if a.startswith("ControlPath=")}
+    assert len(control_paths) == 1
+
+    pool.close_all()
+    assert recorded[-1][-3:] == ["-O", "exit", "u@10.0.0.1"]
+
+
+def test_async_control_check_runs_off_the_loop(monkeypatch: pytest.MonkeyPatch):
+    pool = ssh_service.SSHControlPool()
+    settings = SSHSettings()
+    pool.args_for("u@10.0.0.1", settings)
+    monkeypatch.setattr(ssh_service, "_CONTROL_CHECK_INTERVAL_SECONDS", 0.0)
+    timeouts: list[float | None] = []
+
+    def slow_check(cmd, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        time.sleep(0.2)
+        return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", slow_check)
+
+    async def scenario() -> int:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pool.args_for_async("u@10.0.0.1", settings)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+    assert timeouts == [ssh_service._CONTROL_CMD_TIMEOUT_SECONDS]
+    pool.close_all()
+
+
+def test_run_ssh_without_multiplexing(recorded: list[list[str]]):
+    ssh_service.run_ssh(
+        node=_node(),
+        settings=SSHSettings(multiplex=False),
+        remote_command="true",
+        log_command=False,
+    )
+
+    assert not any(a.startswith("ControlPath=") for a in recorded[0])
+
+
+def _fleet(count: int) -> list[Node]:
+    return [
+        Node(name=f"n{i}", ssh_user="u", mgmt_ip=f"10.0.0.{i}", service_manager="brew")
+        for i in range(count)
+    ]
+
+
+def test_fanout_runs_nodes_in_parallel_with_grouped_output(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    def fake_run(cmd, **kwargs):
+        time.sleep(0.2)
+        host = cmd[-2].split("@", 1)[1]
+        return subprocess.CompletedProcess(cmd, 0, f"{host} line1\n{host} line2\n", "")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+    settings = SSHSettings(multiplex=False, max_parallel=8)
+
+    started = time.monotonic()
+    fanout = ssh_service.run_ssh_fanout(
+        nodes=_fleet(8), settings=settings, remote_command="uptime"
+    )
+
+    assert time.monotonic() - started < 1.0
+    assert fanout.ok
+    assert list(fanout.results) == [f"n{i}" for i in range(8)]
+    out = capsys.readouterr().out
+    for i in range(8):
+        block = f"[n{i}]:\n\n$ uptime\n\n  10.0.0.{i} line1\n  10.0.0.{i} line2\n"
+        assert block in out
+
+
+def test_fanout_per_node_commands_and_fail_fast(
+    monkeypatch: pytest.MonkeyPatch, recorded: list[list[str]]
+):
+    def fake_run(cmd, **kwargs):
+        recorded.append(list(cmd))
+        rc = 1 if cmd[-1] == "false" else 0
+        return subprocess.CompletedProcess(cmd, rc, "", "boom" if rc else "")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+    settings = SSHSettings(multiplex=False)
+    commands = {"n0": "false", "n1": "true", "n2": "true"}
+
+    fanout = ssh_service.run_ssh_fanout(
+        nodes=_fleet(4),
+        settings=settings,
+        remote_command=commands,
+        max_parallel=1,
+        fail_fast=True,
+        log_command=False,
+    )
+
+    assert fanout.failed == ["n0"]
+    assert fanout.skipped == ("n1", "n2")
+    assert not fanout.ok
+    assert len(recorded) == 1
+
+
+def test_run_ssh_timeout_reports_result(monkeypatch: pytest.MonkeyPatch):
+    def fake_run(cmd, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"], output=b"partial")
+
+    monkeypatch.setattr(ssh_service.subprocess, "run", fake_run)
+
+    result = ssh_service.run_ssh(
+        node=_node(),
+        settings=SSHSettings(multiplex=False),
+        remote_command="sleep 60",
+        check=False,
+        timeout_seconds=0.5,
+        log_command=False,
+        log_output=False,
+    )
+
+    assert result.returncode == ssh_service.SSH_TIMEOUT_RETURNCODE
+    assert result.stdout == "partial"
+    assert "timed out" in result.stderr
+
+
+@pytest.fixture()
+def local_shell(monkeypatch: pytest.MonkeyPatch) -> None:
+    # `sh -c 'eval "$2"' fake-ssh <target> <remote_command>` runs the command locally.
+    monkeypatch.setattr(
+        ssh_service,
+        "_ssh_base_args",
+        lambda settings: ["sh", "-c", 'eval "$2"', "fake-ssh"],
+    )
+
+
+def test_run_ssh_async_streams_lines_and_feeds_stdin(local_shell: None):
+    seen: list[tuple[str, str]] = []
+
+    result = asyncio.run(
+        ssh_service.run_ssh_async(
+            node=_node(),
+            settings=SSHSettings(multiplex=False),
+            remote_command="cat; echo oops >&2",
+            input_text="one\ntwo\n",
+            on_output=lambda stream, line: seen.append((stream, line)),
+        )
+    )
+
+    assert result == ssh_service.SSHResult(0, "one\ntwo\n", "oops\n")
+    assert seen == [("stdout", "one"), ("stdout", "two"), ("stderr", "oops")]
+
+
+def test_run_ssh_async_deadline_and_cancellation(local_shell: None):
+    settings = SSHSettings(multiplex=False)
+
+    started = time.monotonic()
+    result = asyncio.run(
+        ssh_service.run_ssh_async(
+            node=_node(),
+            settings=settings,
+            remote_command="echo partial; exec sleep 5",
+            check=False,
+            timeout_seconds=0.3,
+        )
+    )
+    assert time.monotonic() - started < 3
+    assert result.returncode == ssh_service.SSH_TIMEOUT_RETURNCODE
+    assert result.stdout == "partial\n"
+
+    async def cancel_midway() -> None:
+        task = asyncio.create_task(
+            ssh_service.run_ssh_async(
+                node=_node(), settings=settings, remote_command="exec sleep 5"
+            )
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    started = time.monotonic()
+    asyncio.run(cancel_midway())
+    assert time.monotonic() - started < 3
+
+
+def test_stream_ssh_fanout_multiplexes_lines_and_keeps_tails(local_shell: None):
+    nodes = _fleet(2)
+    commands = {
+        nodes[0].name: "for i in 1 2 3 4; do echo $i; done; echo boom >&2; exit 3",
+        nodes[1].name: "printf 'pulling 10%%\\rpulling 100%%\\n'",
+    }
+
+    stream = ssh_service.stream_ssh_fanout(
+        nodes=nodes,
+        settings=SSHSettings(multiplex=False),
+        remote_command=commands,
+        tail_lines=2,
+    )
+    lines = list(stream)
+
+    first = [ln for ln in lines if ln.node == nodes[0].name]
+    assert [ln.text for ln in first if ln.stream == "stdout"] == ["1", "2", "3", "4"]
+    assert [ln.text for ln in first if ln.stream == "stderr"] == ["boom"]
+    second = [ln.text for ln in lines if ln.node == nodes[1].name]
+    assert second == ["pulling 10%", "pulling 100%"]
+    assert list(stream.results) == [n.name for n in nodes]
+    assert stream.results[nodes[0].name] == ssh_service.SSHResult(3, "3\n4\n", "boom\n")
+
+
+def test_stream_ssh_stops_and_kills_on_early_exit_or_timeout(local_shell: None):
+    settings = SSHSettings(multiplex=False)
+
+    started = time.monotonic()
+    stream = ssh_service.stream_ssh(
+        node=_node(), settings=settings, remote_command="echo ready; exec sleep 5"
+    )
+    for line in stream:
+        assert line.text == "ready"
+        break
+    assert time.monotonic() - started < 3
+
+    stream = ssh_service.stream_ssh(
+        node=_node(),
+        settings=settings,
+        remote_command="echo partial; exec sleep 5",
+        timeout_seconds=0.3,
+    )
+    assert [line.text for line in stream] == ["partial"]
+    assert time.monotonic() - started < 5
+    result = stream.results[_node().name]
+    assert result.returncode == ssh_service.SSH_TIMEOUT_RETURNCODE
+    assert "timed out" in result.stderr
+
+
+def test_stream_kills_commands_started_after_the_consumer_stopped(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stream = ssh_service.SSHStream([], max_parallel=1)
+    real_popen = subprocess.Popen
+    started: list[subprocess.Popen[bytes]] = []
+
+    def popen_while_stopping(*args, **kwargs):
+        # The consumer's cleanup runs while this worker is inside Popen.
+        stream._closed.set()
+        started.append(real_popen(*args, **kwargs))
+        return started[-1]
+
+    monkeypatch.setattr(ssh_service.subprocess, "Popen", popen_while_stopping)
+
+    t0 = time.monotonic()
+    stream._run_one(_node(), ["sleep", "30"])
+
+    assert time.monotonic() - t0 < 5
+    assert started[0].returncode is not None
+    assert not stream._procs
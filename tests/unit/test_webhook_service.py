@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+
+from services.metrics_service import get_metrics_registry
+from services.webhook_service import UpdateQueue
+
+
+def test_update_queue_orders_per_chat_and_dedups():
+    handled: list[tuple[int, int]] = []
+
+    async def handler(update: tuple[int, int]) -> None:
+        # Later updates finish first unless ordering is enforced per chat.
+        await asyncio.sleep(0.001 * (10 - update[1]))
+        handled.append(update)
+
+    async def scenario() -> None:
+        queue = UpdateQueue(handler, workers=4, max_pending=100)
+        outcomes = []
+        for seq in range(10):
+            for chat in (1, 2, 3):
+                update_id = chat * 100 + seq
+                outcomes.append(queue.submit(update_id, chat, (chat, seq)))
+        assert set(outcomes) == {"queued"}
+        # Telegram redelivering an update is acknowledged but not handled twice.
+        assert queue.submit(105, 1, (1, 5)) == "duplicate"
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    for chat in (1, 2, 3):
+        assert [seq for c, seq in handled if c == chat] == list(range(10))
+    assert len(handled) == 30
+
+
+def test_update_queue_overload_policy():
+    async def scenario(overload: str) -> list[str]:
+        gate = asyncio.Event()
+
+        async def handler(_: object) -> None:
+            await gate.wait()
+
+        queue = UpdateQueue(handler, workers=1, max_pending=2, overload=overload)
+        outcomes = [queue.submit(i, 1, i) for i in range(4)]
+        await asyncio.sleep(0)
+        # The worker took update 0, freeing one slot.
+        outcomes.append(queue.submit(4, 1, 4))
+        # A rejected update was never recorded, so its retry is not a duplicate.
+        outcomes.append(queue.submit(3, 1, 3))
+        gate.set()
+        await queue.stop()
+        return outcomes
+
+    registry = get_metrics_registry()
+    before = dict(registry._webhook_updates)
+    assert asyncio.run(scenario("reject")) == [
+        "queued",
+        "queued",
+        "rejected",
+        "rejected",
+        "queued",
+        "rejected",
+    ]
+    assert asyncio.run(scenario("drop"))[2:4] == ["dropped", "dropped"]
+    assert registry._webhook_updates["rejected"] - before.get("rejected", 0) == 3